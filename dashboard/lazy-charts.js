@@ -0,0 +1,62 @@
+// Lazy chart bootstrap — draws the charts exported in lazy mode
+// (src/dashboard/lazy.py) as they approach the viewport.
+//
+// Each lazy chart is an empty <div data-lazy-chart> and a JSON block
+// "<id>-spec" holding its data, layout, config and any arrays shared between
+// traces. On small screens, charts that scroll far out of view are purged and
+// drawn again on return. Without IntersectionObserver every chart is drawn at
+// once, as in inline mode.
+(function () {
+  var NEAR = '400px 0px';   // draw a chart once it is this close to the viewport
+  var FAR = '2000px 0px';   // small screens: purge a chart once it is further away
+  var small = window.matchMedia('(max-width: 767px)');
+
+  function spec(div) {
+    var s = JSON.parse(document.getElementById(div.id + '-spec').textContent);
+    s.refs.forEach(function (r) { s.data[r[0]][r[1]] = s.shared[r[2]]; });
+    return s;
+  }
+
+  function draw(div) {
+    var state = div.getAttribute('data-state');
+    if (state === 'drawing' || state === 'drawn') return;
+    div.setAttribute('data-state', 'drawing');
+    var s = spec(div);
+    if (small.matches) s.layout.hovermode = 'closest';
+    Plotly.newPlot(div, s.data, s.layout, s.config).then(function () {
+      div.setAttribute('data-state', 'drawn');
+      div.style.minHeight = '';
+    });
+  }
+
+  function purge(div) {
+    if (div.getAttribute('data-state') !== 'drawn') return;
+    div.style.minHeight = div.offsetHeight + 'px';  // keep the page from shifting
+    Plotly.purge(div);
+    div.setAttribute('data-state', 'purged');
+  }
+
+  function init() {
+    var divs = Array.prototype.slice.call(document.querySelectorAll('[data-lazy-chart]'));
+    if (!('IntersectionObserver' in window)) {
+      divs.forEach(draw);
+      return;
+    }
+    var near = new IntersectionObserver(function (entries) {
+      entries.forEach(function (e) { if (e.isIntersecting) draw(e.target); });
+    }, { rootMargin: NEAR });
+    var far = new IntersectionObserver(function (entries) {
+      entries.forEach(function (e) { if (!e.isIntersecting && small.matches) purge(e.target); });
+    }, { rootMargin: FAR });
+    divs.forEach(function (div) {
+      near.observe(div);
+      far.observe(div);
+    });
+  }
+
+  if (document.readyState === 'loading') {
+    document.addEventListener('DOMContentLoaded', init);
+  } else {
+    init();
+  }
+})();
@@ -4,7 +4,10 @@ Observable Framework data loader — emits the migration payload to stdout.
 Framework runs this at build time and caches the result as
 src/.observablehq/cache/data/migration.json, which the page then reads via
 FileAttachment. Reuses build_payload() from the shared export so all three
-prototypes are guaranteed identical numbers.
+prototypes are guaranteed identical numbers. When the shared export's file
+(written by prototypes/export_prototype_data.py or src/build_all.py) is newer
+than the pkl and the code it is built from, that file is emitted instead of
+loading the data again.
 
 Note: nothing may be printed to stdout except the JSON, hence quiet=True.
 """
@@ -18,11 +21,28 @@ from pathlib import Path
 PROTOTYPES_DIR = Path(__file__).resolve().parents[3]
 sys.path.insert(0, str(PROTOTYPES_DIR))
 
-from export_prototype_data import build_payload  # noqa: E402
+import export_prototype_data  # noqa: E402
+from export_prototype_data import OUTPUT_PATH, REPO_ROOT, build_payload  # noqa: E402
+from src.dashboard import data_loader  # noqa: E402
+from src.dashboard.data_loader import DataLoader  # noqa: E402
+
+
+def _export_is_current() -> bool:
+    """Whether OUTPUT_PATH was written after its pkl and the code that builds it last changed."""
+    source = DataLoader(base_path=REPO_ROOT).latest_path("df_citizenship_direction")
+    if source is None or not OUTPUT_PATH.exists():
+        return False
+    # The payload is built from DataLoader's rolling panel, so its module counts too
+    inputs = [source, Path(export_prototype_data.__file__), Path(data_loader.__file__)]
+    return OUTPUT_PATH.stat().st_mtime >= max(path.stat().st_mtime for path in inputs)
 
 
 def main() -> None:
-    json.dump(build_payload(quiet=True), sys.stdout)
+    if _export_is_current():
+        payload = json.loads(OUTPUT_PATH.read_text(encoding="utf-8"))
+    else:
+        payload = build_payload(quiet=True)
+    json.dump(payload, sys.stdout)
 
 
 if __name__ == "__main__":
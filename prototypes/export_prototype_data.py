@@ -27,7 +27,7 @@ import sys
 from contextlib import redirect_stdout
 from datetime import date
 from pathlib import Path
-from typing import Any, Dict, List
+from typing import Any, Dict, List, Optional
 
 import pandas as pd
 
@@ -59,31 +59,24 @@ SOURCE = "Statistics NZ ITM552301 - migrant arrivals and departures by citizensh
 
 # ── Data transforms ────────────────────────────────────────────────────────────
 
-def _build_series(df: pd.DataFrame) -> pd.DataFrame:
-    """Pivot to one row per month with total / nz / non_nz annual net migration.
+def _build_series(rolling: pd.DataFrame) -> pd.DataFrame:
+    """One row per month with total / nz / non_nz annual net migration.
 
     Args:
-        df: Long-format frame with Month, Count, Direction, Citizenship.
+        rolling: DataLoader.load_citizenship_rolling(ROLLING_WINDOW), the
+            rolling sums of every Direction × Citizenship series.
 
     Returns:
         Frame indexed by Month with columns total, nz, non_nz — each a
         12-month rolling sum of monthly net migration.
     """
-    net = df[df["Direction"] == "Net"]
-
-    wide = (
-        net[net["Citizenship"].isin([CIT_TOTAL, CIT_NZ, CIT_NON_NZ])]
-        .pivot_table(index="Month", columns="Citizenship", values="Count")
-        .rename(columns={CIT_TOTAL: "total", CIT_NZ: "nz", CIT_NON_NZ: "non_nz"})
-        .sort_index()
-    )
+    wide = rolling["Net"].rename(columns={CIT_TOTAL: "total", CIT_NZ: "nz", CIT_NON_NZ: "non_nz"})
 
     missing = {"total", "nz", "non_nz"} - set(wide.columns)
     if missing:
         raise ValueError(f"Missing expected citizenship series: {sorted(missing)}")
 
-    rolling = wide[["total", "nz", "non_nz"]].rolling(ROLLING_WINDOW).sum()
-    return rolling.dropna()
+    return wide[["total", "nz", "non_nz"]].dropna()
 
 
 def _annotations(series: pd.DataFrame) -> Dict[str, Any]:
@@ -190,7 +183,7 @@ def _steps(annotations: Dict[str, Any]) -> List[Dict[str, Any]]:
 
 # ── Main ───────────────────────────────────────────────────────────────────────
 
-def build_payload(quiet: bool = False) -> Dict[str, Any]:
+def build_payload(quiet: bool = False, loader: Optional[DataLoader] = None) -> Dict[str, Any]:
     """Build the full JSON payload from the latest interim pkl.
 
     Exposed as a function so Observable Framework's Python data loader can
@@ -199,17 +192,18 @@ def build_payload(quiet: bool = False) -> Dict[str, Any]:
     Args:
         quiet: Suppress DataLoader's stdout chatter. Required when the caller
             is writing JSON to stdout, as Framework data loaders do.
+        loader: Shared loader, e.g. src/build_all.py's; a new one by default.
     """
-    loader = DataLoader(base_path=REPO_ROOT)
+    loader = loader or DataLoader(base_path=REPO_ROOT)
 
     if quiet:
         buffer = io.StringIO()
         with redirect_stdout(buffer):
-            df = loader.load_citizenship_direction()
+            rolling = loader.load_citizenship_rolling(ROLLING_WINDOW)
     else:
-        df = loader.load_citizenship_direction()
+        rolling = loader.load_citizenship_rolling(ROLLING_WINDOW)
 
-    series = _build_series(df)
+    series = _build_series(rolling)
     annotations = _annotations(series)
 
     return {
@@ -233,11 +227,11 @@ def build_payload(quiet: bool = False) -> Dict[str, Any]:
     }
 
 
-def main() -> None:
+def main(loader: Optional[DataLoader] = None) -> None:
     print("Building scrollytelling prototype data")
     print("-" * 60)
 
-    payload = build_payload()
+    payload = build_payload(loader=loader)
     annotations = payload["annotations"]
 
     OUTPUT_PATH.parent.mkdir(parents=True, exist_ok=True)
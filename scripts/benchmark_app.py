@@ -0,0 +1,288 @@
+"""
+Headless performance benchmark for the Streamlit app.
+
+Drives src/visualization/streamlit_app_plotly.py through Streamlit's AppTest:
+every breakdown, every time-series transform and, for the region breakdown,
+every area level (Regional Councils, TAs, Auckland local boards) on each tab.
+For each interaction it records:
+
+    cold_ms       best-of-N rerun wall time with the shared figure cache emptied
+    warm_ms       rerun wall time straight after, served from the cache
+    alloc_kib     memory one cold rerun leaves allocated by the app's own code,
+                  pandas and plotly (tracemalloc snapshots either side of it)
+    payload_kib   figure JSON sent to the browser, per tab
+
+The report is written as JSON and, if a baseline exists, compared against it.
+Any interaction whose cold time or allocated memory grows by more than the
+tolerance, or whose payload grows by more than PAYLOAD_TOLERANCE, is a
+regression and the script exits 1, as is an interaction in the baseline that
+the run no longer measures. Any interaction that makes the app raise also
+fails the run: it stops there, as every later step would start from a broken
+page, and a failed run is never saved as the baseline. Timings are
+machine-dependent: refresh the baseline with --save-baseline when the deploy
+hardware changes.
+
+Usage:
+    python scripts/benchmark_app.py
+    python scripts/benchmark_app.py --repeat 5 --tolerance 0.3
+    python scripts/benchmark_app.py --save-baseline
+"""
+
+from __future__ import annotations
+
+import argparse
+import gc
+import json
+import logging
+import os
+import sys
+import time
+import tracemalloc
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+
+_REPO_ROOT = Path(__file__).parent.parent
+sys.path.insert(0, str(_REPO_ROOT))
+
+import pandas
+import plotly
+from streamlit.testing.v1 import AppTest
+
+from src.visualization.catalog import DATASET_PATTERNS
+from src.visualization.result_cache import shared_result_cache
+
+# ── Paths ──────────────────────────────────────────────────────────────────────
+
+_APP_PATH = _REPO_ROOT / "src" / "visualization" / "streamlit_app_plotly.py"
+_REPORT_PATH = _REPO_ROOT / "output" / "benchmark_app.json"
+_BASELINE_PATH = Path(__file__).parent / "benchmark_app_baseline.json"
+
+# ── Constants ──────────────────────────────────────────────────────────────────
+
+RUN_TIMEOUT = 120  # seconds per rerun
+DEFAULT_REPEAT = 5
+DEFAULT_TOLERANCE = 0.5  # relative growth in cold time / allocated memory
+PAYLOAD_TOLERANCE = 0.05  # payload is deterministic, so a tighter bound
+# Best-of-5 cold times of one unchanged view moved by up to ~185 ms between
+# runs on a shared one-CPU container; smaller growth is not a regression
+MIN_REGRESSION_MS = 250
+# Frames kept per allocation: enough to attribute what numpy and json allocate
+# on pandas' or plotly's behalf (5 catch ~98% of what 10 do), while keeping a
+# traced rerun to seconds
+TRACE_FRAMES = 5
+
+# Allocations are counted when any of their frames is in one of these
+_TRACE_FILTERS = [
+    tracemalloc.Filter(True, os.path.join(str(root), "*"), all_frames=True)
+    for root in (
+        _REPO_ROOT / "src",
+        Path(pandas.__file__).parent,
+        Path(plotly.__file__).parent,
+    )
+]
+
+_REGION_BREAKDOWN = "Direction, Region, Citizenship"
+_LEVEL_KEYS = ["level_t1_region", "level_t2_region", "level_t3_region"]
+
+Step = Tuple[str, Callable[[AppTest], None]]
+
+
+# ── Helpers ────────────────────────────────────────────────────────────────────
+
+
+def _set(kind: str, key: str, value) -> Callable[[AppTest], None]:
+    """Return a step that sets a keyed selectbox or radio to value."""
+    return lambda at: getattr(at, kind)(key=key).set_value(value)
+
+
+def _steps(at: AppTest) -> Iterator[Step]:
+    """Yield (name, apply) for every interaction, reading options from the app.
+
+    Steps are applied in order to one AppTest, so each starts from the state
+    the previous one left. The caller stops at the first step that raises, so
+    each step's widgets are read from a page that rendered.
+    """
+    for breakdown in DATASET_PATTERNS:
+        yield breakdown, lambda at, b=breakdown: at.selectbox[0].set_value(b)
+
+        transforms = at.selectbox(key="transform_select").options
+        for transform in transforms[1:]:
+            yield f"{breakdown} | transform={transform}", _set(
+                "selectbox", "transform_select", transform
+            )
+        yield f"{breakdown} | transform={transforms[0]}", _set(
+            "selectbox", "transform_select", transforms[0]
+        )
+
+        if breakdown != _REGION_BREAKDOWN:
+            continue
+        # Back on the untransformed series, every tab of the region breakdown
+        # renders; each level radio ends on its first option again, so the
+        # next radio starts from that same page
+        for key in _LEVEL_KEYS:
+            levels = at.radio(key=key).options
+            for level in levels[1:] + levels[:1]:
+                yield f"{breakdown} | {key}={level}", _set("radio", key, level)
+
+
+def _payload_kib(at: AppTest) -> Dict[str, float]:
+    """Figure JSON size per tab, in KiB."""
+    return {
+        tab.label: round(sum(len(c.proto.spec) for c in tab.get("plotly_chart")) / 1024, 1)
+        for tab in at.tabs
+    }
+
+
+def _measure(at: AppTest, repeat: int) -> Dict:
+    """Time and profile the rerun for the app's current widget state."""
+    cache = shared_result_cache()
+    cold = []
+    for _ in range(repeat):
+        cache.clear()
+        start = time.perf_counter()
+        at.run()
+        cold.append((time.perf_counter() - start) * 1000)
+    if at.exception:
+        return {"error": at.exception[0].message}
+
+    # What the rerun leaves behind: its cached figures and any frames it holds.
+    # A global peak would mostly measure AppTest itself, the same for every view.
+    cache.clear()
+    gc.collect()
+    tracemalloc.start(TRACE_FRAMES)
+    before = tracemalloc.take_snapshot().filter_traces(_TRACE_FILTERS)
+    at.run()
+    after = tracemalloc.take_snapshot().filter_traces(_TRACE_FILTERS)
+    tracemalloc.stop()
+    allocated = sum(stat.size_diff for stat in after.compare_to(before, "filename"))
+
+    start = time.perf_counter()
+    at.run()
+    warm = (time.perf_counter() - start) * 1000
+
+    return {
+        "cold_ms": round(min(cold), 1),  # the least noisy estimate
+        "warm_ms": round(warm, 1),
+        "alloc_kib": round(allocated / 1024, 1),
+        "payload_kib": _payload_kib(at),
+    }
+
+
+def _grew(new: float, old: float, tolerance: float) -> bool:
+    return old > 0 and new > old * (1 + tolerance)
+
+
+def compare(report: Dict, baseline: Dict, tolerance: float) -> List[str]:
+    """Return one line per regression of report against baseline."""
+    problems = []
+    old_results = baseline["results"]
+    for name, new in report["results"].items():
+        old = old_results.get(name)
+        if old is None:
+            continue
+        if "error" in new:
+            problems.append(f"{name}: now fails — {new['error']}")
+            continue
+        if (
+            _grew(new["cold_ms"], old["cold_ms"], tolerance)
+            and new["cold_ms"] - old["cold_ms"] >= MIN_REGRESSION_MS
+        ):
+            problems.append(f"{name}: cold {old['cold_ms']} -> {new['cold_ms']} ms")
+        if _grew(new["alloc_kib"], old["alloc_kib"], tolerance):
+            problems.append(f"{name}: allocated {old['alloc_kib']} -> {new['alloc_kib']} KiB")
+        for tab, kib in new["payload_kib"].items():
+            if _grew(kib, old["payload_kib"].get(tab, 0), PAYLOAD_TOLERANCE):
+                problems.append(f"{name}: {tab} payload {old['payload_kib'][tab]} -> {kib} KiB")
+    for name in sorted(old_results.keys() - report["results"].keys()):
+        problems.append(f"{name}: in the baseline but no longer measured")
+    return problems
+
+
+# ── Main ───────────────────────────────────────────────────────────────────────
+
+
+def run(repeat: int = DEFAULT_REPEAT, quiet: bool = False) -> Dict:
+    """Drive every interaction and return the report.
+
+    The report's "failed" names the first interaction that made the app
+    raise, after which nothing more is driven; it is None for a clean run.
+    """
+    # AppTest has no server, so Streamlit warns about the missing runtime
+    logging.getLogger("streamlit").setLevel(logging.ERROR)
+
+    at = AppTest.from_file(str(_APP_PATH), default_timeout=RUN_TIMEOUT)
+    start = time.perf_counter()
+    at.run()
+    boot_ms = (time.perf_counter() - start) * 1000
+
+    results: Dict[str, Dict] = {}
+    failed = "boot" if at.exception else None
+    steps = _steps(at) if failed is None else iter(())
+    for name, apply in steps:
+        apply(at)
+        results[name] = r = _measure(at, repeat)
+        if "error" in r:
+            failed = name
+            print(f"  {name:<72} ERROR {r['error']}")
+            break
+        if not quiet:
+            print(
+                f"  {name:<72} cold {r['cold_ms']:>7.1f} ms  warm {r['warm_ms']:>6.1f} ms"
+                f"  alloc {r['alloc_kib']:>7.0f} KiB  payload {sum(r['payload_kib'].values()):>6.0f} KiB"
+            )
+
+    return {
+        "generated": datetime.now().isoformat(timespec="seconds"),
+        "python": sys.version.split()[0],
+        "repeat": repeat,
+        "boot_ms": round(boot_ms, 1),
+        "failed": failed,
+        "results": results,
+    }
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--repeat", type=int, default=DEFAULT_REPEAT,
+                        help="cold reruns per interaction; the fastest is reported")
+    parser.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE,
+                        help="relative growth in cold time or allocated memory that fails")
+    parser.add_argument("--out", type=Path, default=_REPORT_PATH)
+    parser.add_argument("--baseline", type=Path, default=_BASELINE_PATH)
+    parser.add_argument("--save-baseline", action="store_true",
+                        help="write this run as the new baseline instead of comparing")
+    args = parser.parse_args(argv)
+
+    report = run(repeat=args.repeat)
+    args.out.parent.mkdir(parents=True, exist_ok=True)
+    args.out.write_text(json.dumps(report, indent=2) + "\n", encoding="utf-8")
+    print(f"\n  Saved report: {args.out}")
+
+    if report["failed"]:
+        # The steps after a failure were never measured: not a usable baseline
+        print(f"  The app raised at: {report['failed']}")
+        if args.save_baseline:
+            print(f"  Not saved as the baseline: {args.baseline}")
+        return 1
+    if args.save_baseline:
+        args.baseline.write_text(json.dumps(report, indent=2) + "\n", encoding="utf-8")
+        print(f"  Saved baseline: {args.baseline}")
+        return 0
+    if not args.baseline.exists():
+        print("  No baseline to compare against; run with --save-baseline")
+        return 0
+
+    baseline = json.loads(args.baseline.read_text(encoding="utf-8"))
+    problems = compare(report, baseline, args.tolerance)
+    if problems:
+        print(f"\n  {len(problems)} regression(s) against {args.baseline.name}:")
+        for line in problems:
+            print(f"    {line}")
+        return 1
+    print(f"  No regressions against {args.baseline.name}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
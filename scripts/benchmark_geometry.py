@@ -0,0 +1,171 @@
+"""
+Benchmark of the scrolly map geometry rounding pass at higher map resolutions.
+
+scrolly/data/build.py rounds every ring of every simplified map feature to
+COORD_DP places and drops points that collapse onto each other. At TA level
+that is ~18,000 points; SA2-level boundaries (~2,300 areas) or a finer
+simplify tolerance multiply it by one to two orders of magnitude. This script
+densifies the TA boundaries (dashboard/assets/nz_ta.geojson) by inserting
+points along every edge, then times the vectorised rounding against the
+per-point Python loop it replaced, at each resolution.
+
+The two must agree: the same rings kept and dropped, and the same points in
+each, up to the rewinding of rings not wound the way _clean_geometry winds
+them (the loop never checked; here that includes the few source rings wound
+the other way, as the benchmark skips simplify and clean). Any other
+difference fails the benchmark and the script exits 1.
+
+Usage:
+    python scripts/benchmark_geometry.py
+    python scripts/benchmark_geometry.py --densify 1 16 64 --repeat 5
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import sys
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+
+_REPO_ROOT = Path(__file__).parent.parent
+sys.path.insert(0, str(_REPO_ROOT / "scrolly" / "data"))
+
+from build import COORD_DP, _round_geometry  # noqa: E402
+
+# ── Constants ──────────────────────────────────────────────────────────────────
+
+_SOURCE = _REPO_ROOT / "dashboard" / "assets" / "nz_ta.geojson"
+DEFAULT_DENSIFY = [1, 8, 32]  # points per source edge
+DEFAULT_REPEAT = 3
+
+
+# ── Reference implementation ───────────────────────────────────────────────────
+
+
+def _loop_round_ring(ring: List[Any], dp: int) -> List[List[float]] | None:
+    """The per-point loop that _round_rings replaced."""
+    out: List[List[float]] = []
+    for x, y in ring:
+        point = [round(float(x), dp), round(float(y), dp)]
+        if not out or point != out[-1]:
+            out.append(point)
+    return out if len(out) >= 4 else None
+
+
+def _loop_round_geometry(geom: Dict[str, Any], dp: int) -> Dict[str, Any] | None:
+    if geom["type"] == "Polygon":
+        rings = [r for r in (_loop_round_ring(r, dp) for r in geom["coordinates"]) if r]
+        return {"type": "Polygon", "coordinates": rings} if rings else None
+
+    polygons = []
+    for polygon in geom["coordinates"]:
+        rings = [r for r in (_loop_round_ring(r, dp) for r in polygon) if r]
+        if rings:
+            polygons.append(rings)
+    return {"type": "MultiPolygon", "coordinates": polygons} if polygons else None
+
+
+# ── Helpers ────────────────────────────────────────────────────────────────────
+
+
+def _densify_ring(ring: List[List[float]], factor: int) -> List[List[float]]:
+    """ring with factor - 1 evenly spaced points inserted along every edge."""
+    points = np.asarray(ring, dtype=float)[:, :2]
+    if factor <= 1 or len(points) < 2:
+        return points.tolist()
+    steps = np.arange(factor) / factor
+    start, end = points[:-1], points[1:]
+    dense = start[:, None, :] + (end - start)[:, None, :] * steps[None, :, None]
+    return np.vstack([dense.reshape(-1, 2), points[-1:]]).tolist()
+
+
+def densified(geometries: List[Dict[str, Any]], factor: int) -> List[Dict[str, Any]]:
+    """Every geometry with its rings densified by factor."""
+    out = []
+    for geom in geometries:
+        if geom["type"] == "Polygon":
+            coords = [_densify_ring(r, factor) for r in geom["coordinates"]]
+        else:
+            coords = [[_densify_ring(r, factor) for r in p] for p in geom["coordinates"]]
+        out.append({"type": geom["type"], "coordinates": coords})
+    return out
+
+
+def _rings(geom: Optional[Dict[str, Any]]) -> List[List[List[float]]]:
+    if geom is None:
+        return []
+    if geom["type"] == "Polygon":
+        return list(geom["coordinates"])
+    return [ring for polygon in geom["coordinates"] for ring in polygon]
+
+
+def compare(loop: List[Any], vectorised: List[Any]) -> Tuple[int, int]:
+    """(rings rewound, rings that differ otherwise) between the two outputs."""
+    rewound = differ = 0
+    for a, b in zip(loop, vectorised):
+        rings_a, rings_b = _rings(a), _rings(b)
+        if len(rings_a) != len(rings_b):
+            differ += abs(len(rings_a) - len(rings_b)) or 1
+            continue
+        for ring_a, ring_b in zip(rings_a, rings_b):
+            if ring_a == ring_b:
+                continue
+            if ring_a == ring_b[::-1]:
+                rewound += 1
+            else:
+                differ += 1
+    return rewound, differ
+
+
+def best_of(fn: Callable[[], Any], repeat: int) -> Tuple[float, Any]:
+    """Fastest of repeat runs of fn in ms, and its result."""
+    best, result = float("inf"), None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - start)
+    return best * 1000, result
+
+
+# ── Main ───────────────────────────────────────────────────────────────────────
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--densify", type=int, nargs="+", default=DEFAULT_DENSIFY,
+                        help="points per source edge, one run each")
+    parser.add_argument("--repeat", type=int, default=DEFAULT_REPEAT,
+                        help="runs per implementation; the fastest is reported")
+    args = parser.parse_args(argv)
+
+    source = [f["geometry"] for f in json.loads(_SOURCE.read_text(encoding="utf-8"))["features"]]
+
+    print(f"  {'densify':>7} {'rings':>7} {'points':>10} {'loop ms':>9} "
+          f"{'numpy ms':>9} {'speedup':>8} {'rewound':>8} {'differ':>7}")
+    failed = False
+    for factor in args.densify:
+        geometries = densified(source, factor)
+        rings = [ring for geom in geometries for ring in _rings(geom)]
+        points = sum(len(ring) for ring in rings)
+        loop_ms, loop = best_of(
+            lambda: [_loop_round_geometry(g, COORD_DP) for g in geometries], args.repeat)
+        numpy_ms, vectorised = best_of(
+            lambda: [_round_geometry(g, COORD_DP) for g in geometries], args.repeat)
+        rewound, differ = compare(loop, vectorised)
+        failed |= differ > 0
+        print(f"  {factor:>7} {len(rings):>7,} {points:>10,} {loop_ms:>9.1f} "
+              f"{numpy_ms:>9.1f} {loop_ms / numpy_ms:>7.1f}x {rewound:>8} {differ:>7}")
+
+    if failed:
+        print("\n  Vectorised rounding differs from the loop beyond rewinding")
+        return 1
+    print("\n  Vectorised rounding matches the loop")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
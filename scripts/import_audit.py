@@ -0,0 +1,232 @@
+"""
+Import-time audit for the app and the build entry points.
+
+For each entry point, runs only its module-level imports in a fresh
+interpreter under `python -X importtime`, the same imports the real process
+pays for before it does any work. Reports the total and the slowest top-level
+imports. Imports deferred into functions are not counted, which is the point:
+they are paid only by the code paths that need them.
+
+Each target's total is the median of N fresh interpreters, compared against
+a recorded baseline: a target more than the tolerance slower than its
+baseline fails the audit and the script exits 1. Each target also lists heavy
+modules that must stay deferred, and one whose module-level imports pull in
+such a module at any depth fails as well. Timings are machine-dependent:
+refresh the baseline with --save-baseline when the deploy hardware changes.
+The deferred lists are exact.
+
+tests/test_import_audit.py runs the same check.
+
+Usage:
+    python scripts/import_audit.py
+    python scripts/import_audit.py --repeat 9 --top 15
+    python scripts/import_audit.py --save-baseline
+    python scripts/import_audit.py --budget 1500          # fixed budget in ms for all
+"""
+
+from __future__ import annotations
+
+import argparse
+import ast
+import json
+import os
+import re
+import subprocess
+import sys
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+_REPO_ROOT = Path(__file__).parent.parent
+_BASELINE_PATH = Path(__file__).parent / "import_audit_baseline.json"
+
+# ── Constants ──────────────────────────────────────────────────────────────────
+
+# target -> (entry-point script, modules that must stay deferred)
+TARGETS: Dict[str, Tuple[Path, List[str]]] = {
+    "app": (
+        _REPO_ROOT / "src" / "visualization" / "streamlit_app_plotly.py",
+        ["plotly.express", "psutil", "pyarrow.parquet"],
+    ),
+    "dashboard build": (
+        _REPO_ROOT / "src" / "build_dashboard.py",
+        ["geopandas", "shapely"],
+    ),
+    "scrolly build": (
+        _REPO_ROOT / "scrolly" / "data" / "build.py",
+        ["geopandas", "shapely"],
+    ),
+}
+
+DEFAULT_REPEAT = 5
+DEFAULT_TOP = 10
+# Relative growth over the baseline that fails. Single runs of the app's
+# imports spread by about 20% on an idle machine, so the median gets twice that.
+DEFAULT_TOLERANCE = 0.4
+
+# "import time:      1234 |       5678 |   package.module"
+_LINE = re.compile(r"^import time:\s+(\d+) \|\s+(\d+) \| (\s*)(\S+)")
+
+
+# ── Helpers ────────────────────────────────────────────────────────────────────
+
+
+def module_imports(script: Path) -> str:
+    """Source of the import statements at the top level of script.
+
+    Only statements directly in the module body count; imports inside
+    functions, and under `if TYPE_CHECKING:`, are deferred by design.
+    """
+    tree = ast.parse(script.read_text(encoding="utf-8"))
+    nodes = [node for node in tree.body if isinstance(node, (ast.Import, ast.ImportFrom))]
+    return "\n".join(ast.unparse(node) for node in nodes)
+
+
+def measure(source: str, script: Optional[Path] = None) -> Tuple[Dict[str, float], List[str]]:
+    """Run source under -X importtime.
+
+    script's directory goes first on the path, as running script puts it, so
+    the script's own sibling modules resolve.
+
+    Returns:
+        Top-level imports in ms, and every module loaded at any depth. The
+        value of each top-level import is its cumulative time, so the values
+        add up to the whole import cost of source.
+    """
+    paths = ([str(script.parent)] if script else []) + [str(_REPO_ROOT)]
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join(paths))
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", source],
+        cwd=_REPO_ROOT, env=env, capture_output=True, text=True,
+    )
+    if proc.returncode != 0:
+        raise RuntimeError(proc.stderr.strip().splitlines()[-1])
+    modules: Dict[str, float] = {}
+    loaded = []
+    for line in proc.stderr.splitlines():
+        match = _LINE.match(line)
+        if not match:
+            continue
+        name = match.group(4)
+        loaded.append(name)
+        if not match.group(3):  # no indent: imported by source itself
+            modules[name] = modules.get(name, 0.0) + int(match.group(2)) / 1000
+    return modules, loaded
+
+
+def startup_modules() -> List[str]:
+    """Modules a bare interpreter imports before running any code (site, ...)."""
+    return measure("pass")[1]
+
+
+def audit(script: Path, repeat: int, exclude: List[str]) -> Tuple[Dict[str, float], List[str]]:
+    """Median import profile of script's module-level imports.
+
+    Returns:
+        Top-level imports in ms, less the interpreter's own startup imports,
+        from the run with the median total, and every module loaded.
+    """
+    source = module_imports(script)
+    runs = []
+    for _ in range(repeat):
+        modules, loaded = measure(source, script)
+        runs.append(({n: ms for n, ms in modules.items() if n not in exclude}, loaded))
+    runs.sort(key=lambda run: sum(run[0].values()))
+    return runs[len(runs) // 2]
+
+
+def run(repeat: int = DEFAULT_REPEAT, top: int = DEFAULT_TOP, quiet: bool = False) -> Dict:
+    """Audit every target and return the report.
+
+    Returns:
+        {"targets": {name: {"ms": median total, "eager": deferred modules
+        imported at startup}}} plus when and where it was measured.
+    """
+    exclude = startup_modules()
+    targets = {}
+    for name, (script, deferred) in TARGETS.items():
+        modules, loaded = audit(script, repeat, exclude)
+        targets[name] = {
+            "ms": round(sum(modules.values()), 1),
+            "eager": [module for module in deferred if module in loaded],
+        }
+        if quiet:
+            continue
+        print(f"\n  {name} ({script.relative_to(_REPO_ROOT)}): {targets[name]['ms']:.0f} ms")
+        slowest = sorted(modules.items(), key=lambda item: item[1], reverse=True)
+        for module, ms in slowest[:top]:
+            print(f"    {ms:>8.1f} ms  {module}")
+    return {
+        "generated": datetime.now().isoformat(timespec="seconds"),
+        "python": sys.version.split()[0],
+        "repeat": repeat,
+        "targets": targets,
+    }
+
+
+def budgets(baseline: Dict, tolerance: float = DEFAULT_TOLERANCE) -> Dict[str, float]:
+    """Budget in ms per target: its baseline median plus the tolerance."""
+    return {name: entry["ms"] * (1 + tolerance) for name, entry in baseline["targets"].items()}
+
+
+def compare(report: Dict, limits: Dict[str, float]) -> List[str]:
+    """Return one line per target over its budget or importing a deferred module."""
+    problems = []
+    for name, entry in report["targets"].items():
+        if name not in limits:
+            problems.append(f"{name}: no budget; run with --save-baseline")
+        elif entry["ms"] > limits[name]:
+            problems.append(f"{name}: {entry['ms']:.0f} ms, over its {limits[name]:.0f} ms budget")
+        if entry["eager"]:
+            problems.append(f"{name}: imported at startup but should be deferred: "
+                            + ", ".join(entry["eager"]))
+    return problems
+
+
+# ── Main ───────────────────────────────────────────────────────────────────────
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--repeat", type=int, default=DEFAULT_REPEAT,
+                        help="fresh interpreters per target; the fastest is reported")
+    parser.add_argument("--top", type=int, default=DEFAULT_TOP,
+                        help="slowest top-level imports listed per target")
+    parser.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE,
+                        help="relative growth over the baseline that fails")
+    parser.add_argument("--budget", type=float, default=None,
+                        help="budget in ms for every target, instead of the baseline")
+    parser.add_argument("--baseline", type=Path, default=_BASELINE_PATH)
+    parser.add_argument("--save-baseline", action="store_true",
+                        help="write this run's medians as the new baseline")
+    args = parser.parse_args(argv)
+
+    report = run(repeat=args.repeat, top=args.top)
+    if args.save_baseline:
+        args.baseline.write_text(json.dumps(report, indent=2) + "\n", encoding="utf-8")
+        print(f"\n  Saved baseline: {args.baseline}")
+
+    if args.budget is not None:
+        limits = {name: args.budget for name in TARGETS}
+    elif args.baseline.exists():
+        baseline = json.loads(args.baseline.read_text(encoding="utf-8"))
+        limits = budgets(baseline, args.tolerance)
+    else:
+        print("\n  No baseline to compare against; run with --save-baseline")
+        limits = {name: float("inf") for name in TARGETS}
+
+    print()
+    for name, entry in report["targets"].items():
+        print(f"  {name:<16} {entry['ms']:>7.0f} ms of {limits.get(name, 0):>7.0f} ms")
+    problems = compare(report, limits)
+    if problems:
+        print("\n  Failed:")
+        for line in problems:
+            print(f"    {line}")
+        return 1
+    print("\n  All targets within budget")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
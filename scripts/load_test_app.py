@@ -0,0 +1,226 @@
+"""
+Concurrent-session load generator for the Streamlit app.
+
+Streamlit runs every session's script in its own thread of one process, so
+sessions contend for the GIL and share the app's caches. This script
+reproduces that in-process: N threads each drive their own AppTest session
+through realistic interaction traces (landing, switching breakdowns,
+changing transforms, preparing a download), all against the same app
+process. It does this for each N given and reports, per level:
+
+    p50/p95/p99   rerun latency, in ms
+    throughput    reruns completed per second across all sessions
+    rss_growth    process RSS growth over the level, in MiB
+
+The shared figure cache is emptied before each level (use --keep-cache to let
+it carry over), so every level starts from the same cold state. Driving a live
+server over websockets is out of scope; AppTest exercises the same script,
+threads and caches without the network layer.
+
+Usage:
+    python scripts/load_test_app.py
+    python scripts/load_test_app.py --sessions 1 4 16 --iterations 3
+    python scripts/load_test_app.py --out output/load_test_app.json
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import logging
+import random
+import statistics
+import sys
+import threading
+import time
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+import psutil
+
+_REPO_ROOT = Path(__file__).parent.parent
+sys.path.insert(0, str(_REPO_ROOT))
+
+from streamlit import config
+from streamlit.runtime import Runtime
+from streamlit.testing.v1 import AppTest
+from streamlit.testing.v1.util import build_mock_config_get_option
+
+from src.visualization.result_cache import shared_result_cache
+
+# ── Paths ──────────────────────────────────────────────────────────────────────
+
+_APP_PATH = _REPO_ROOT / "src" / "visualization" / "streamlit_app_plotly.py"
+
+# ── Constants ──────────────────────────────────────────────────────────────────
+
+RUN_TIMEOUT = 300  # seconds per rerun; generous, since reruns queue on the GIL
+DEFAULT_SESSIONS = [1, 2, 4, 8]
+DEFAULT_ITERATIONS = 2  # traces replayed per session per level
+
+# (kind, key, value): set a widget and rerun. kind "button" clicks key;
+# key None means the breakdown selectbox, which has no key.
+Action = Tuple[str, Optional[str], object]
+
+TRACES: Dict[str, List[Action]] = {
+    "browse_transforms": [
+        ("selectbox", "transform_select", "12-month moving sum"),
+        ("selectbox", "transform_select", "Cumulative from base year"),
+        ("selectbox", "transform_select", "3-month moving average"),
+        ("selectbox", "transform_select", "None"),
+    ],
+    "compare_breakdowns": [
+        ("selectbox", None, "Direction, Visa"),
+        ("selectbox", None, "Citizenship, Visa"),
+        ("selectbox", None, "Direction, Age, Sex"),
+        ("selectbox", None, "Direction, Citizenship"),
+    ],
+    "download": [
+        ("selectbox", None, "Direction, Visa"),
+        ("button", "download_timeseries_prepare", None),
+        ("selectbox", None, "Direction, Citizenship"),
+    ],
+}
+
+_MIB = 1024 * 1024
+
+
+# ── Helpers ────────────────────────────────────────────────────────────────────
+
+
+def _allow_concurrent_sessions() -> None:
+    """Let AppTest sessions run in parallel threads.
+
+    For each run AppTest installs a mock Runtime singleton and patches the
+    config to test mode, and undoes both when the run ends, which breaks any
+    session still running in another thread. Put the config in test mode for
+    the whole process, and keep the last mock Runtime available (they are
+    interchangeable) instead of none.
+    """
+    config.get_option = build_mock_config_get_option({"global.appTest": True})
+
+    last: Dict[str, Runtime] = {}
+
+    def instance(cls) -> Runtime:
+        if cls._instance is not None:
+            last["runtime"] = cls._instance
+        return cls._instance or last["runtime"]
+
+    Runtime.instance = classmethod(instance)
+
+
+def _apply(at: AppTest, action: Action) -> None:
+    """Set up one action on the session; the caller reruns."""
+    kind, key, value = action
+    if kind == "button":
+        at.button(key=key).click()
+    elif key is None:
+        at.selectbox[0].set_value(value)
+    else:
+        getattr(at, kind)(key=key).set_value(value)
+
+
+def _session(seed: int, iterations: int, latencies: List[float], errors: List[str]) -> None:
+    """Land on the app, then replay randomly chosen traces, timing each rerun."""
+    rng = random.Random(seed)
+    at = AppTest.from_file(str(_APP_PATH), default_timeout=RUN_TIMEOUT)
+    start = time.perf_counter()
+    at.run()
+    latencies.append((time.perf_counter() - start) * 1000)
+
+    for _ in range(iterations):
+        name = rng.choice(sorted(TRACES))
+        for action in TRACES[name]:
+            try:
+                _apply(at, action)
+            except KeyError as exc:  # widget missing after a failed rerun
+                errors.append(f"{name} {action}: no widget {exc}")
+                break
+            start = time.perf_counter()
+            at.run()
+            latencies.append((time.perf_counter() - start) * 1000)
+            if at.exception:
+                errors.append(f"{name} {action}: {at.exception[0].message}")
+
+
+def _percentile(values: List[float], pct: float) -> float:
+    """Nearest-rank percentile."""
+    ordered = sorted(values)
+    rank = max(0, min(len(ordered) - 1, round(pct / 100 * len(ordered)) - 1))
+    return ordered[rank]
+
+
+def run_level(sessions: int, iterations: int, keep_cache: bool = False) -> Dict:
+    """Run `sessions` concurrent sessions and summarise their reruns."""
+    if not keep_cache:
+        shared_result_cache().clear()
+    process = psutil.Process()
+    rss_before = process.memory_info().rss
+
+    latencies: List[float] = []  # list.append is atomic under the GIL
+    errors: List[str] = []
+    threads = [
+        threading.Thread(target=_session, args=(seed, iterations, latencies, errors))
+        for seed in range(sessions)
+    ]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - start
+
+    return {
+        "sessions": sessions,
+        "reruns": len(latencies),
+        "errors": len(errors),
+        "p50_ms": round(_percentile(latencies, 50), 1),
+        "p95_ms": round(_percentile(latencies, 95), 1),
+        "p99_ms": round(_percentile(latencies, 99), 1),
+        "mean_ms": round(statistics.fmean(latencies), 1),
+        "throughput_rps": round(len(latencies) / elapsed, 2),
+        "rss_growth_mib": round((process.memory_info().rss - rss_before) / _MIB, 1),
+        "rss_mib": round(process.memory_info().rss / _MIB, 1),
+        "first_errors": errors[:3],
+    }
+
+
+# ── Main ───────────────────────────────────────────────────────────────────────
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--sessions", type=int, nargs="+", default=DEFAULT_SESSIONS,
+                        help="concurrent session counts to run, in order")
+    parser.add_argument("--iterations", type=int, default=DEFAULT_ITERATIONS,
+                        help="traces each session replays per level")
+    parser.add_argument("--keep-cache", action="store_true",
+                        help="let the shared figure cache carry over between levels")
+    parser.add_argument("--out", type=Path, help="also write the results as JSON")
+    args = parser.parse_args(argv)
+
+    # AppTest has no server, so Streamlit warns about the missing runtime
+    logging.getLogger("streamlit").setLevel(logging.ERROR)
+    _allow_concurrent_sessions()
+
+    print(f"  {'N':>3} {'reruns':>7} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} "
+          f"{'rerun/s':>8} {'RSS MiB':>8} {'growth':>7}")
+    results = []
+    for n in args.sessions:
+        r = run_level(n, args.iterations, keep_cache=args.keep_cache)
+        results.append(r)
+        print(f"  {n:>3} {r['reruns']:>7} {r['p50_ms']:>8.0f} {r['p95_ms']:>8.0f} "
+              f"{r['p99_ms']:>8.0f} {r['throughput_rps']:>8.2f} {r['rss_mib']:>8.0f} "
+              f"{r['rss_growth_mib']:>+7.1f}")
+        for error in r["first_errors"]:
+            print(f"      error: {error}", file=sys.stderr)
+
+    if args.out:
+        args.out.parent.mkdir(parents=True, exist_ok=True)
+        args.out.write_text(json.dumps(results, indent=2) + "\n", encoding="utf-8")
+        print(f"\n  Saved report: {args.out}")
+    return 1 if any(r["errors"] for r in results) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,9 +1,9 @@
-"""Build the scrollytelling data contract (story.json) for the NZ migration story.
+"""Build the scrollytelling data contract for the NZ migration story.
 
 Purpose:
-    Turn the repo's processed Stats NZ pkl files into the single JSON file the
-    Svelte front end reads. Every transform stays in Python; the front end only
-    ever sees story.json.
+    Turn the repo's processed Stats NZ pkl files into the JSON the Svelte front
+    end reads. Every transform stays in Python; the front end only ever sees
+    the contract's manifest and chunks.
 
 Inputs:
     data/interim/df_citizenship_direction_*.pkl  (via src.dashboard.DataLoader)
@@ -12,10 +12,19 @@ Inputs:
     data/interim/df_clpr_china_visa_*.pkl
     data/interim/df_clpr_philippines_visa_*.pkl
     data/raw/mbie_w3_work_occupations_nationality_skill_level_may_years.csv
+    data/raw/subnational_pop_2018_2025.csv  (via DataLoader.load_subnational)
 
 Outputs:
-    scrolly/src/data/story.json — meta + colors + labels + charts + steps + series.
+    scrolly/src/data/story.manifest.json + scrolly/public/chunks/ — the story
+    (meta + colors + labels + charts + steps + series) and the geometry split
+    into one chunk per chart, which the front end loads.
+    A map chart's chunk holds its map as TopoJSON, validated against the
+    geometry before it is written.
+    Each chunk also gets .gz (and with brotli installed .br) siblings, listed
+    with their hashes in public/chunks/precompressed.json.
     See scrolly/data/story.schema.md for the shape.
+    data/processed/scrolly_geometry/ — simplified map geometry, reused while
+    the source GeoJSON and simplify settings are unchanged.
 
 Run from the repo root:
     .venv/Scripts/python scrolly/data/build.py
@@ -23,14 +32,19 @@ Run from the repo root:
 
 from __future__ import annotations
 
+import hashlib
 import io
 import json
+import os
 import sys
+import time
 from contextlib import redirect_stdout
 from datetime import date
+from itertools import chain
 from pathlib import Path
-from typing import Any, Dict, List
+from typing import Any, Dict, List, Optional
 
+import numpy as np
 import pandas as pd
 
 SCROLLY_ROOT = Path(__file__).resolve().parent.parent
@@ -38,18 +52,29 @@ REPO_ROOT = SCROLLY_ROOT.parent
 sys.path.insert(0, str(REPO_ROOT))
 
 from src.dashboard.data_loader import DataLoader  # noqa: E402
+from src.dashboard.precompress import MANIFEST_NAME, precompress_dir  # noqa: E402
 from src.dashboard.stories.regional_map import RegionalMapStory  # noqa: E402
+from topology import to_topology, validate_topology  # noqa: E402
 
 # ── Paths and constants ───────────────────────────────────────────────────────
 
-OUT_JSON = SCROLLY_ROOT / "src" / "data" / "story.json"
-OUT_MAPS = SCROLLY_ROOT / "src" / "data" / "maps.json"
+# The story split for progressive loading: a manifest bundled with the app, and
+# one content-hashed chunk per chart that the front end fetches as it nears it.
+OUT_MANIFEST = SCROLLY_ROOT / "src" / "data" / "story.manifest.json"
+OUT_CHUNKS = SCROLLY_ROOT / "public" / "chunks"
+
+# Contract layout version, bumped whenever the front end must decode it
+# differently; see story.schema.md. 2: columnar series. 3: chunked manifest.
+SCHEMA_VERSION = 3
+# Series columns store month-on-month differences: rolling sums move slowly, so
+# the differences are short numbers and compress far better than the levels.
+SERIES_DELTA = True
 
 ROLLING_WINDOW = 12  # months — annual running total, the standard presentation
 START = "2005"       # first year shown on the x-axis
 
-# Geometry lives in a second file rather than story.json: it is two orders of
-# magnitude larger than the time series and never read by eye.
+# Geometry is kept out of the story and ships only in the map charts' chunks: it
+# is two orders of magnitude larger than the time series and never read by eye.
 ASSETS = REPO_ROOT / "dashboard" / "assets"
 COORD_DP = 4  # ~11 m, well under a pixel at either map's scale
 
@@ -59,6 +84,12 @@ MAP_SOURCES: Dict[str, Dict[str, Any]] = {
     "auckland": {"path": ASSETS / "auckland_albs.geojson", "key": "alb_name_ascii", "tolerance": 0.001},
 }
 
+# Simplified geometry is cached by (source hash, join key, tolerance, COORD_DP):
+# the source files change only with boundary revisions. Bump the version when
+# the simplify/clean/round pipeline itself changes.
+GEOMETRY_CACHE = REPO_ROOT / "data" / "processed" / "scrolly_geometry"
+GEOMETRY_CACHE_VERSION = 2
+
 # MBIE's occupation-level work visa dataset, same file the Quarto dashboard's
 # skill-level charts read (src/dashboard/stories/india_surge.py).
 MBIE_SKILL_PATH = (
@@ -322,24 +353,23 @@ CIT_NON_NZ = "Non-New Zealand"
 # ── Transforms ────────────────────────────────────────────────────────────────
 
 
+def _trim(rolled: pd.DataFrame) -> pd.DataFrame:
+    """Rolling sums trimmed to the months they cover and the display window."""
+    return rolled.dropna(how="all").loc[START:]
+
+
 def _rolling(frame: pd.DataFrame) -> pd.DataFrame:
     """Rolling 12-month sum, sorted by month and trimmed to the display window."""
-    return (
-        frame.sort_index()
-        .rolling(ROLLING_WINDOW, min_periods=ROLLING_WINDOW)
-        .sum()
-        .dropna(how="all")
-        .loc[START:]
-    )
+    return _trim(frame.sort_index().rolling(ROLLING_WINDOW, min_periods=ROLLING_WINDOW).sum())
 
 
-def _flows(df: pd.DataFrame) -> pd.DataFrame:
-    """Chart 1 — non-NZ arrivals, departures (negative) and net migration."""
-    wide = (
-        df[(df["Citizenship"] == CIT_NON_NZ) & (df["Direction"].isin(["Arrivals", "Departures"]))]
-        .pivot_table(index="Month", columns="Direction", values="Count")
-    )
-    out = _rolling(wide)
+def _flows(rolling: pd.DataFrame) -> pd.DataFrame:
+    """Chart 1 — non-NZ arrivals, departures (negative) and net migration.
+
+    Args:
+        rolling: DataLoader.load_citizenship_rolling(ROLLING_WINDOW).
+    """
+    out = _trim(rolling.xs(CIT_NON_NZ, axis=1, level="Citizenship")[["Arrivals", "Departures"]])
     return pd.DataFrame(
         {
             "flow_arrivals": out["Arrivals"],
@@ -366,16 +396,19 @@ def _age_arrivals(df_age: pd.DataFrame) -> pd.DataFrame:
     return _rolling(wide)[list(_AGE_BINS)]
 
 
-def _nationality(df: pd.DataFrame) -> pd.DataFrame:
+def _nationality(rolling: pd.DataFrame) -> pd.DataFrame:
     """Chart 3 — non-NZ arrivals for the top five source countries, plus Other.
 
     `cit_other` is the non-NZ total minus the five named countries, so the stack
     sums to total non-NZ arrivals. Taking the residual this way sidesteps the
     region aggregates (Asia, Europe, ...) that sit alongside countries in the
-    raw Stats NZ table.
+    raw Stats NZ table. The counts are whole numbers, so the residual of the
+    rolling sums is exactly the rolling sum of the residual.
+
+    Args:
+        rolling: DataLoader.load_citizenship_rolling(ROLLING_WINDOW).
     """
-    arrivals = df[df["Direction"] == "Arrivals"]
-    wide = arrivals.pivot_table(index="Month", columns="Citizenship", values="Count")
+    wide = rolling["Arrivals"]
 
     missing = [c for c in list(_COUNTRIES.values()) + [CIT_NON_NZ] if c not in wide.columns]
     if missing:
@@ -383,7 +416,7 @@ def _nationality(df: pd.DataFrame) -> pd.DataFrame:
 
     named = pd.DataFrame({key: wide[name] for key, name in _COUNTRIES.items()})
     named["cit_other"] = wide[CIT_NON_NZ] - named.sum(axis=1)
-    return _rolling(named)
+    return _trim(named)
 
 
 def _clpr_visa(df_clpr: pd.DataFrame, prefix: str) -> pd.DataFrame:
@@ -400,41 +433,100 @@ def _clpr_visa(df_clpr: pd.DataFrame, prefix: str) -> pd.DataFrame:
     return out.rename(columns={band: prefix + band for band in _VISA_BANDS})
 
 
-def _records(wide: pd.DataFrame) -> List[Dict[str, Any]]:
-    """Convert the wide frame to compact JSON records, oldest first."""
-    return [
-        {"month": month.strftime("%Y-%m"),
-         **{key: int(round(float(value))) for key, value in row.items()}}
-        for month, row in wide.iterrows()
-    ]
+def _columns(wide: pd.DataFrame, delta: bool = SERIES_DELTA) -> Dict[str, Any]:
+    """Encode the wide frame as one integer array per series key, oldest first.
+
+    Months are not stored one by one: they run without gaps from start, which
+    is checked here.
+
+    Raises:
+        ValueError: If the months are not consecutive.
+    """
+    months = wide.index.to_period("M")
+    if len(months) and (months != pd.period_range(months[0], periods=len(months), freq="M")).any():
+        raise ValueError("Series months are not consecutive")
+    values = wide.to_numpy(dtype=float).round().astype(np.int64)
+    if delta:
+        values = np.diff(values, axis=0, prepend=np.zeros((1, values.shape[1]), dtype=np.int64))
+    return {
+        "start": months[0].strftime("%Y-%m"),
+        "months": len(months),
+        "encoding": "delta" if delta else "plain",
+        "columns": {key: values[:, i].tolist() for i, key in enumerate(wide.columns)},
+    }
+
+
+def _decode_series(series: Dict[str, Any]) -> pd.DataFrame:
+    """The frame _columns encoded, indexed by YYYY-MM month string."""
+    frame = pd.DataFrame(series["columns"])
+    if series["encoding"] == "delta":
+        frame = frame.cumsum()
+    frame.index = pd.period_range(series["start"], periods=series["months"], freq="M").strftime("%Y-%m")
+    frame.index.name = "month"
+    return frame
 
 
 # ── Map geometry ──────────────────────────────────────────────────────────────
 
 
-def _round_ring(ring: List[Any], dp: int) -> List[List[float]] | None:
-    """Round a ring's coordinates, dropping points that collapse onto each other."""
-    out: List[List[float]] = []
-    for x, y in ring:
-        point = [round(float(x), dp), round(float(y), dp)]
-        if not out or point != out[-1]:
-            out.append(point)
-    # A ring needs three distinct corners plus the closing point to enclose area.
-    return out if len(out) >= 4 else None
+def _round_rings(rings: List[Any], dp: int, exterior: List[bool]) -> List[List[List[float]] | None]:
+    """Round rings' coordinates, dropping points that collapse onto each other.
+
+    All the rings of a geometry are rounded as one array, with each point
+    tagged by its ring: a point is kept if it is the first of its ring or
+    differs from the one before it. Rounding can flip the winding of a thin
+    ring, so the winding _clean_geometry set (exteriors clockwise, holes
+    anticlockwise) is checked on the rounded points and restored if needed.
+
+    Returns one entry per ring, None for a ring that collapsed.
+    """
+    lengths = np.array([len(ring) for ring in rings])
+    points = np.fromiter(
+        chain.from_iterable(chain.from_iterable(rings)), dtype=float, count=2 * lengths.sum()
+    ).reshape(-1, 2)
+    points = np.round(points, dp)
+    ring_of = np.repeat(np.arange(len(rings)), lengths)
+
+    keep = np.ones(len(points), dtype=bool)
+    keep[1:] = (np.diff(points, axis=0) != 0).any(axis=1) | (np.diff(ring_of) != 0)
+    points, ring_of = points[keep], ring_of[keep]
+    counts = np.bincount(ring_of, minlength=len(rings))
+
+    # Twice each ring's signed area, from the cross products of its edges
+    same = ring_of[:-1] == ring_of[1:]
+    x, y = points[:, 0], points[:, 1]
+    cross = (x[:-1] * y[1:] - x[1:] * y[:-1])[same]
+    area = np.bincount(ring_of[:-1][same], weights=cross, minlength=len(rings))
+    flip = np.where(exterior, area > 0, area < 0)
+
+    coords = points.tolist()
+    ends = np.cumsum(counts).tolist()
+    out: List[List[List[float]] | None] = []
+    for i, end in enumerate(ends):
+        # A ring needs three distinct corners plus the closing point to enclose area.
+        if counts[i] < 4:
+            out.append(None)
+            continue
+        ring = coords[end - counts[i]:end]
+        out.append(ring[::-1] if flip[i] else ring)
+    return out
 
 
 def _round_geometry(geom: Dict[str, Any], dp: int) -> Dict[str, Any] | None:
     """Round every ring of a Polygon or MultiPolygon, dropping any that collapse."""
-    if geom["type"] == "Polygon":
-        rings = [r for r in (_round_ring(r, dp) for r in geom["coordinates"]) if r]
-        return {"type": "Polygon", "coordinates": rings} if rings else None
+    polygons = [geom["coordinates"]] if geom["type"] == "Polygon" else geom["coordinates"]
+    rings = [ring for polygon in polygons for ring in polygon]
+    if not rings:
+        return None
+    rounded = iter(_round_rings(
+        rings, dp, [i == 0 for polygon in polygons for i in range(len(polygon))]
+    ))
+    kept = [[r for r in (next(rounded) for _ in polygon) if r] for polygon in polygons]
 
-    polygons = []
-    for polygon in geom["coordinates"]:
-        rings = [r for r in (_round_ring(r, dp) for r in polygon) if r]
-        if rings:
-            polygons.append(rings)
-    return {"type": "MultiPolygon", "coordinates": polygons} if polygons else None
+    if geom["type"] == "Polygon":
+        return {"type": "Polygon", "coordinates": kept[0]} if kept[0] else None
+    kept = [polygon for polygon in kept if polygon]
+    return {"type": "MultiPolygon", "coordinates": kept} if kept else None
 
 
 def _clean_geometry(geometry: Any, tolerance: float) -> Any:
@@ -474,14 +566,16 @@ def _clean_geometry(geometry: Any, tolerance: float) -> Any:
     return geometry
 
 
-def _load_map(name: str) -> Dict[str, Any]:
+def _simplify_map(name: str) -> tuple[Dict[str, Any], List[str]]:
     """Read one GeoJSON asset, simplify it and strip it to a single join key.
 
     The dashboard's assets carry 17 decimal places and properties the map does not
     need. Simplifying and rounding takes the pair from 1.1 MB to under 300 KB with
     no visible change at these scales.
+
+    Returns the FeatureCollection and the keys of features lost to simplifying.
     """
-    import geopandas as gpd  # imported here: only the map step needs it
+    import geopandas as gpd  # imported here: only an uncached map needs it
 
     source = MAP_SOURCES[name]
     frame = gpd.read_file(source["path"])
@@ -502,9 +596,54 @@ def _load_map(name: str) -> Dict[str, Any]:
             "properties": {"key": row[source["key"]]},
             "geometry": geometry,
         })
+    return {"type": "FeatureCollection", "features": features}, dropped
+
+
+def _geometry_cache_path(name: str) -> Path:
+    """Cache file for one map, named by the hash of everything that shapes it."""
+    source = MAP_SOURCES[name]
+    key = {
+        "source": hashlib.sha1(Path(source["path"]).read_bytes()).hexdigest(),
+        "key": source["key"],
+        "tolerance": source["tolerance"],
+        "dp": COORD_DP,
+        "version": GEOMETRY_CACHE_VERSION,
+    }
+    digest = hashlib.sha1(json.dumps(key, sort_keys=True).encode("utf-8")).hexdigest()[:12]
+    return GEOMETRY_CACHE / f"{name}_{digest}.json"
+
+
+def _load_map(name: str) -> Dict[str, Any]:
+    """One map's simplified FeatureCollection, from the cache when it is current.
+
+    A cache hit reports the time it saved: the recorded simplify time, less the
+    time spent reading the cache.
+    """
+    start = time.perf_counter()
+    path = _geometry_cache_path(name)
+    if path.exists():
+        cached = json.loads(path.read_text(encoding="utf-8"))
+        geometry, dropped = cached["geometry"], cached["dropped"]
+        saved = cached["seconds"] - (time.perf_counter() - start)
+        print(f"  [maps] {name}: cached geometry, {saved:.2f}s saved")
+    else:
+        geometry, dropped = _simplify_map(name)
+        seconds = time.perf_counter() - start
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_name(path.name + f".{os.getpid()}.tmp")
+        tmp.write_text(
+            json.dumps({"seconds": seconds, "dropped": dropped, "geometry": geometry},
+                       separators=(",", ":")),
+            encoding="utf-8",
+        )
+        os.replace(tmp, path)
+        for stale in path.parent.glob(f"{name}_*.json"):
+            if stale != path:
+                stale.unlink(missing_ok=True)
+        print(f"  [maps] {name}: simplified in {seconds:.2f}s, cached")
     if dropped:
         print("  [maps] " + name + ": dropped after simplify: " + ", ".join(dropped))
-    return {"type": "FeatureCollection", "features": features}
+    return geometry
 
 
 # ── Map data ──────────────────────────────────────────────────────────────────
@@ -518,18 +657,18 @@ def _shorten(name: str) -> str:
     return name
 
 
-def _nz_map_values() -> pd.DataFrame:
+def _nz_map_values(loader: DataLoader) -> pd.DataFrame:
     """Net international migration per 1,000 residents by territorial authority."""
-    net_by_ta, pop_by_ta = RegionalMapStory._load_subnational()
+    net_by_ta, pop_by_ta = RegionalMapStory._load_subnational(loader)
     frame = RegionalMapStory._build_ta_df(net_by_ta, pop_by_ta)
     frame["key"] = frame["ta_name"]
     frame["label"] = frame["ta_name"].apply(_shorten)
     return frame[["key", "label", "net", "value_per1k"]]
 
 
-def _auckland_map_values() -> pd.DataFrame:
+def _auckland_map_values(loader: DataLoader) -> pd.DataFrame:
     """The same measure for Auckland local board areas."""
-    frame = RegionalMapStory._load_albs()
+    frame = RegionalMapStory._load_albs(loader)
     return frame.rename(columns={"alb_name_ascii": "key", "display_name": "label"})[
         ["key", "label", "net", "value_per1k"]
     ]
@@ -906,13 +1045,13 @@ def _steps(wide: pd.DataFrame) -> List[Dict[str, Any]]:
 # ── Assemble and write ────────────────────────────────────────────────────────
 
 
-def build_wide(quiet: bool = False) -> pd.DataFrame:
+def build_wide(quiet: bool = False, loader: Optional[DataLoader] = None) -> pd.DataFrame:
     """Join all six charts into one month-indexed frame of 30 series."""
-    loader = DataLoader(base_path=REPO_ROOT)
+    loader = loader or DataLoader(base_path=REPO_ROOT)
 
     def _load() -> tuple[pd.DataFrame, ...]:
         return (
-            loader.load_citizenship_direction(),
+            loader.load_citizenship_rolling(ROLLING_WINDOW),
             loader.load_direction_age_sex(),
             loader.load_clpr_india_visa(),
             loader.load_clpr_china_visa(),
@@ -921,14 +1060,14 @@ def build_wide(quiet: bool = False) -> pd.DataFrame:
 
     if quiet:
         with redirect_stdout(io.StringIO()):
-            df_cit, df_age, df_india, df_china, df_philippines = _load()
+            rolling, df_age, df_india, df_china, df_philippines = _load()
     else:
-        df_cit, df_age, df_india, df_china, df_philippines = _load()
+        rolling, df_age, df_india, df_china, df_philippines = _load()
 
     parts = [
-        _flows(df_cit),
+        _flows(rolling),
         _age_arrivals(df_age),
-        _nationality(df_cit),
+        _nationality(rolling),
         _clpr_visa(df_india, "in_"),
         _clpr_visa(df_china, "cn_"),
         _clpr_visa(df_philippines, "ph_"),
@@ -942,15 +1081,18 @@ def build_wide(quiet: bool = False) -> pd.DataFrame:
     return wide[expected]
 
 
-def build_maps() -> tuple[Dict[str, Any], Dict[str, Any], List[Dict[str, Any]]]:
+def build_maps(
+    loader: Optional[DataLoader] = None,
+) -> tuple[Dict[str, Any], Dict[str, Any], List[Dict[str, Any]]]:
     """Build the two map charts, their geometry, and the four map steps.
 
     Returns (geometries, chart definitions, steps). Geometry is written to its own
     file; the chart definitions carry only the values and colour scale.
     """
+    loader = loader or DataLoader(base_path=REPO_ROOT)
     geometries = {name: _load_map(name) for name in MAP_SOURCES}
-    nz_values = _nz_map_values()
-    akl_values = _auckland_map_values()
+    nz_values = _nz_map_values(loader)
+    akl_values = _auckland_map_values(loader)
 
     charts = {
         "nz-map": _map_chart(
@@ -977,14 +1119,18 @@ def build_maps() -> tuple[Dict[str, Any], Dict[str, Any], List[Dict[str, Any]]]:
     return geometries, charts, _map_steps(nz_values, akl_values)
 
 
-def build_story(quiet: bool = False) -> tuple[Dict[str, Any], Dict[str, Any]]:
-    """Assemble the story.json contract and the map geometry alongside it."""
-    wide = build_wide(quiet=quiet)
-    geometries, map_charts, map_steps = build_maps()
+def build_story(
+    quiet: bool = False, loader: Optional[DataLoader] = None
+) -> tuple[Dict[str, Any], Dict[str, Any]]:
+    """Assemble the story contract and the map geometry alongside it."""
+    loader = loader or DataLoader(base_path=REPO_ROOT)
+    wide = build_wide(quiet=quiet, loader=loader)
+    geometries, map_charts, map_steps = build_maps(loader)
 
     charts = {**CHARTS, **map_charts}
     today = date.today()
     story = {
+        "schema": SCHEMA_VERSION,
         "meta": {
             "title": TITLE,
             "standfirst": _standfirst(wide),
@@ -1004,18 +1150,74 @@ def build_story(quiet: bool = False) -> tuple[Dict[str, Any], Dict[str, Any]]:
         "annotations": {},
         "charts": charts,
         "steps": _steps(wide) + map_steps,
-        "series": _records(wide),
+        "series": _columns(wide),
     }
     return story, geometries
 
 
+def split_story(
+    story: Dict[str, Any], geometries: Dict[str, Any]
+) -> tuple[Dict[str, Any], Dict[str, str]]:
+    """Split the story into a manifest and one content-hashed chunk per chart.
+
+    The manifest keeps everything but the charts: meta, colours, labels and the
+    steps, so the page and its narrative render without waiting on data. Each
+    chart becomes a chunk holding its definition and only its own data, the
+    series columns it draws or its map as TopoJSON; the manifest maps every
+    chart to its chunk's file name and the steps that show it.
+
+    Returns (manifest, {file name: chunk JSON}).
+
+    Raises:
+        ValueError: If a map chunk's TopoJSON does not decode to its geometry.
+    """
+    series = story["series"]
+    manifest = {key: value for key, value in story.items() if key not in ("charts", "series")}
+    manifest["charts"] = {}
+    chunks: Dict[str, str] = {}
+    for name, chart in story["charts"].items():
+        if chart.get("kind") == "map":
+            geometry = {chart["map"]: geometries[chart["map"]]}
+            topology = to_topology(geometry, COORD_DP)
+            problems = validate_topology(topology, geometry, COORD_DP)
+            if problems:
+                raise ValueError(f"{name}: TopoJSON does not decode to the map geometry:\n  "
+                                 + "\n  ".join(problems))
+            chunk = {"chart": chart, "topology": topology}
+        else:
+            keys = list(chart["keys"]) + ([chart["line"]] if chart.get("line") else [])
+            chunk = {"chart": chart,
+                     "series": {**series, "columns": {key: series["columns"][key] for key in keys}}}
+        text = json.dumps(chunk, separators=(",", ":"))
+        file_name = f"{name}.{hashlib.sha1(text.encode('utf-8')).hexdigest()[:12]}.json"
+        chunks[file_name] = text
+        manifest["charts"][name] = {
+            "kind": chart.get("kind", "series"),
+            "chunk": file_name,
+            "steps": [i for i, step in enumerate(story["steps"]) if step["chart"] == name],
+        }
+    return manifest, chunks
+
+
+def write_chunks(manifest: Dict[str, Any], chunks: Dict[str, str]) -> None:
+    """Write the manifest and chunks, removing chunks it no longer lists."""
+    OUT_CHUNKS.mkdir(parents=True, exist_ok=True)
+    OUT_MANIFEST.parent.mkdir(parents=True, exist_ok=True)
+    for file_name, text in chunks.items():
+        (OUT_CHUNKS / file_name).write_text(text, encoding="utf-8")
+    for stale in OUT_CHUNKS.glob("*.json"):
+        if stale.name not in chunks and stale.name != MANIFEST_NAME:
+            stale.unlink()
+    OUT_MANIFEST.write_text(json.dumps(manifest, separators=(",", ":")), encoding="utf-8")
+
+
 def _print_summary(story: Dict[str, Any]) -> None:
     """Per-chart drawn range, so the fixed y-domains can be checked each run.
 
     Stacked charts are measured on the stack total; the mirrored chart is
     measured on its widest single band in each direction, plus the net line.
     """
-    frame = pd.DataFrame(story["series"]).set_index("month")
+    frame = _decode_series(story["series"])
     print("Chart               drawn min   drawn max   y-domain")
     print("-" * 62)
     for name, chart in CHARTS.items():
@@ -1044,14 +1246,14 @@ def _print_map_summary(story: Dict[str, Any], geometries: Dict[str, Any]) -> Non
               f"{min(rates):>6.1f} to {max(rates):<6.1f}")
 
 
-def main() -> None:
+def main(loader: Optional[DataLoader] = None) -> None:
     print("Building the NZ migration scrollytelling contract")
     print("-" * 60)
 
-    story, geometries = build_story()
-    OUT_JSON.parent.mkdir(parents=True, exist_ok=True)
-    OUT_JSON.write_text(json.dumps(story, indent=1), encoding="utf-8")
-    OUT_MAPS.write_text(json.dumps(geometries, separators=(",", ":")), encoding="utf-8")
+    story, geometries = build_story(loader=loader)
+    manifest, chunks = split_story(story, geometries)
+    write_chunks(manifest, chunks)
+    precompress_dir(OUT_CHUNKS, "*.json")
 
     print()
     _print_summary(story)
@@ -1061,10 +1263,10 @@ def main() -> None:
     print(f"Months: {meta['months']:,} ({meta['start']} to {meta['end']})")
     print(f"Series: {len(story['colors'])}   Charts: {len(story['charts'])}   "
           f"Steps: {len(story['steps'])}")
-    print(f"Wrote {OUT_JSON.relative_to(REPO_ROOT)} "
-          f"({OUT_JSON.stat().st_size / 1024:,.0f} KB)")
-    print(f"Wrote {OUT_MAPS.relative_to(REPO_ROOT)} "
-          f"({OUT_MAPS.stat().st_size / 1024:,.0f} KB)")
+    print(f"Wrote {OUT_MANIFEST.relative_to(REPO_ROOT)} "
+          f"({OUT_MANIFEST.stat().st_size / 1024:,.0f} KB) and {len(chunks)} chunks in "
+          f"{OUT_CHUNKS.relative_to(REPO_ROOT)} "
+          f"({sum(len(t) for t in chunks.values()) / 1024:,.0f} KB)")
 
 
 if __name__ == "__main__":
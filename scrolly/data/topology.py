@@ -0,0 +1,251 @@
+"""TopoJSON encoding of the scrolly map geometry, with a decoder and a validator.
+
+GeoJSON stores every border between two areas twice, once per side, and every
+coordinate as a decimal. TopoJSON stores each border once, as an arc both
+areas reference (a negative index ~i means arc i reversed), and quantises the
+coordinates to integers on a grid, each point written as the delta from the
+one before it, which keeps most numbers to a few digits.
+
+The map geometry is already rounded to COORD_DP places, so a grid of
+10^-COORD_DP is exact: decoding gives back the same coordinates. Rings are cut
+into arcs at junctions, the points where the areas on either side change.
+A ring with no junction (an island, or an enclave and the hole it fills) is
+one closed arc, started at its smallest point so both sides find the same arc.
+
+validate_topology decodes the result and checks it against the source: every
+ring's arcs join end to end and close, every ring has the same points in the
+same order (up to where it starts) and the same signed area, so winding
+survives, and every arc is used.
+
+Usage:
+    topology = to_topology(geometries, dp=COORD_DP)
+    problems = validate_topology(topology, geometries, dp=COORD_DP)
+"""
+
+from __future__ import annotations
+
+from typing import Any, Dict, List, Set, Tuple
+
+Point = Tuple[int, int]
+
+# ── Encoding ──────────────────────────────────────────────────────────────────
+
+
+def _polygons(geometry: Dict[str, Any]) -> List[List[List[List[float]]]]:
+    return [geometry["coordinates"]] if geometry["type"] == "Polygon" else geometry["coordinates"]
+
+
+def _quantise(ring: List[List[float]], factor: int, origin: Point) -> List[Point]:
+    """Grid points of a closed ring, without the closing point."""
+    return [
+        (round(x * factor) - origin[0], round(y * factor) - origin[1]) for x, y in ring[:-1]
+    ]
+
+
+def _junctions(rings: List[List[Point]]) -> Set[Point]:
+    """Points whose neighbours differ between the rings passing through them."""
+    neighbours: Dict[Point, Tuple[Point, Point]] = {}
+    junctions: Set[Point] = set()
+    for ring in rings:
+        n = len(ring)
+        for i, point in enumerate(ring):
+            pair = (ring[i - 1], ring[(i + 1) % n])
+            seen = neighbours.setdefault(point, pair)
+            if seen != pair and seen != pair[::-1]:
+                junctions.add(point)
+    return junctions
+
+
+def _cut(ring: List[Point], junctions: Set[Point]) -> List[List[Point]]:
+    """A ring as the arcs between its junctions, each closed at both ends."""
+    cuts = [i for i, point in enumerate(ring) if point in junctions]
+    if not cuts:
+        start = ring.index(min(ring))
+        rotated = ring[start:] + ring[:start]
+        return [rotated + rotated[:1]]
+    rotated = ring[cuts[0]:] + ring[:cuts[0]]
+    closed = rotated + rotated[:1]
+    ends = [i - cuts[0] for i in cuts] + [len(ring)]
+    return [closed[a:b + 1] for a, b in zip(ends, ends[1:])]
+
+
+def to_topology(geometries: Dict[str, Dict[str, Any]], dp: int) -> Dict[str, Any]:
+    """Encode {name: FeatureCollection} as one quantised, delta-encoded TopoJSON.
+
+    Args:
+        geometries: Polygon and MultiPolygon features, coordinates rounded to
+            dp places, each with the properties to keep.
+        dp: Decimal places of the coordinates; the grid is 10^-dp.
+    """
+    factor = 10 ** dp
+    features = [f for collection in geometries.values() for f in collection["features"]]
+    xs = [x for f in features for p in _polygons(f["geometry"]) for r in p for x, _ in r]
+    ys = [y for f in features for p in _polygons(f["geometry"]) for r in p for _, y in r]
+    origin = (round(min(xs) * factor), round(min(ys) * factor))
+
+    quantised = {
+        name: [
+            [[_quantise(ring, factor, origin) for ring in polygon]
+             for polygon in _polygons(f["geometry"])]
+            for f in collection["features"]
+        ]
+        for name, collection in geometries.items()
+    }
+    junctions = _junctions([
+        ring for shapes in quantised.values() for shape in shapes
+        for polygon in shape for ring in polygon
+    ])
+
+    arcs: List[List[Point]] = []
+    index: Dict[Tuple[Point, ...], int] = {}
+
+    def arc_index(arc: List[Point]) -> int:
+        key = tuple(arc)
+        if key in index:
+            return index[key]
+        reverse = key[::-1]
+        if reverse in index:
+            return ~index[reverse]
+        index[key] = len(arcs)
+        arcs.append(arc)
+        return index[key]
+
+    objects = {}
+    for name, collection in geometries.items():
+        encoded = []
+        for feature, shape in zip(collection["features"], quantised[name]):
+            polygons = [
+                [[arc_index(arc) for arc in _cut(ring, junctions)] for ring in polygon]
+                for polygon in shape
+            ]
+            kind = feature["geometry"]["type"]
+            encoded.append({
+                "type": kind,
+                "arcs": polygons[0] if kind == "Polygon" else polygons,
+                "properties": feature["properties"],
+            })
+        objects[name] = {"type": "GeometryCollection", "geometries": encoded}
+
+    def delta(arc: List[Point]) -> List[List[int]]:
+        out = [list(arc[0])]
+        out += [[x1 - x0, y1 - y0] for (x0, y0), (x1, y1) in zip(arc, arc[1:])]
+        return out
+
+    return {
+        "type": "Topology",
+        "transform": {"scale": [1 / factor, 1 / factor], "translate": [origin[0] / factor, origin[1] / factor]},
+        "objects": objects,
+        "arcs": [delta(arc) for arc in arcs],
+    }
+
+
+# ── Decoding ──────────────────────────────────────────────────────────────────
+
+
+def _absolute_arcs(topology: Dict[str, Any]) -> List[List[List[float]]]:
+    """Every arc in coordinates, as a TopoJSON client computes them."""
+    (sx, sy), (tx, ty) = topology["transform"]["scale"], topology["transform"]["translate"]
+    out = []
+    for arc in topology["arcs"]:
+        x = y = 0
+        points = []
+        for dx, dy in arc:
+            x, y = x + dx, y + dy
+            points.append([x * sx + tx, y * sy + ty])
+        out.append(points)
+    return out
+
+
+def _ring(arcs: List[List[List[float]]], indexes: List[int]) -> List[List[float]]:
+    points: List[List[float]] = []
+    for k, i in enumerate(indexes):
+        arc = arcs[~i][::-1] if i < 0 else arcs[i]
+        points.extend(arc if k == 0 else arc[1:])
+    return points
+
+
+def from_topology(topology: Dict[str, Any]) -> Dict[str, Dict[str, Any]]:
+    """Decode a topology back into {name: FeatureCollection}."""
+    arcs = _absolute_arcs(topology)
+    out = {}
+    for name, collection in topology["objects"].items():
+        features = []
+        for geometry in collection["geometries"]:
+            if geometry["type"] == "Polygon":
+                coordinates = [_ring(arcs, ring) for ring in geometry["arcs"]]
+            else:
+                coordinates = [[_ring(arcs, ring) for ring in polygon] for polygon in geometry["arcs"]]
+            features.append({
+                "type": "Feature",
+                "properties": geometry["properties"],
+                "geometry": {"type": geometry["type"], "coordinates": coordinates},
+            })
+        out[name] = {"type": "FeatureCollection", "features": features}
+    return out
+
+
+# ── Validation ────────────────────────────────────────────────────────────────
+
+
+def _signed_area(ring: List[List[float]]) -> float:
+    return sum(x0 * y1 - x1 * y0 for (x0, y0), (x1, y1) in zip(ring, ring[1:])) / 2
+
+
+def _canonical(ring: List[Point]) -> Tuple[Point, ...]:
+    start = ring.index(min(ring))
+    return tuple(ring[start:] + ring[:start])
+
+
+def validate_topology(
+    topology: Dict[str, Any], geometries: Dict[str, Dict[str, Any]], dp: int
+) -> List[str]:
+    """Problems found decoding topology and comparing it with geometries; [] if none."""
+    problems = []
+    (sx, sy), (tx, ty) = topology["transform"]["scale"], topology["transform"]["translate"]
+    tolerance = sx / 2
+    arcs = _absolute_arcs(topology)
+    used: Set[int] = set()
+
+    decoded = from_topology(topology)
+    factor = 10 ** dp
+    for name, collection in geometries.items():
+        features = collection["features"]
+        encoded = topology["objects"][name]["geometries"]
+        if len(decoded[name]["features"]) != len(features):
+            problems.append(f"{name}: {len(decoded[name]['features'])} features, expected {len(features)}")
+            continue
+        for feature, shape, geometry in zip(features, decoded[name]["features"], encoded):
+            key = feature["properties"].get("key")
+            if shape["properties"] != feature["properties"]:
+                problems.append(f"{name}/{key}: properties differ")
+            ring_arcs = geometry["arcs"] if geometry["type"] == "MultiPolygon" else [geometry["arcs"]]
+            for polygon in ring_arcs:
+                for ring in polygon:
+                    used.update(i if i >= 0 else ~i for i in ring)
+                    for a, b in zip(ring, ring[1:] + ring[:1]):
+                        end = (arcs[~a][0] if a < 0 else arcs[a][-1])
+                        start = (arcs[~b][-1] if b < 0 else arcs[b][0])
+                        if abs(end[0] - start[0]) > tolerance or abs(end[1] - start[1]) > tolerance:
+                            problems.append(f"{name}/{key}: arcs {a} and {b} do not join")
+            source = _polygons(feature["geometry"])
+            result = _polygons(shape["geometry"])
+            if [len(p) for p in source] != [len(p) for p in result]:
+                problems.append(f"{name}/{key}: ring structure differs")
+                continue
+            for ring_s, ring_r in zip(
+                (r for p in source for r in p), (r for p in result for r in p)
+            ):
+                grid_s = [(round(x * factor), round(y * factor)) for x, y in ring_s[:-1]]
+                grid_r = [(round(x * factor), round(y * factor)) for x, y in ring_r[:-1]]
+                if ring_r[0] != ring_r[-1] and grid_r and grid_r[0] != grid_r[-1]:
+                    problems.append(f"{name}/{key}: ring not closed")
+                if _canonical(grid_s) != _canonical(grid_r):
+                    problems.append(f"{name}/{key}: ring points differ")
+                area_s, area_r = _signed_area(ring_s), _signed_area(ring_r)
+                if abs(area_s - area_r) > 1e-9 * max(1.0, abs(area_s)) or (area_s > 0) != (area_r > 0):
+                    problems.append(f"{name}/{key}: area {area_r:.6g}, expected {area_s:.6g}")
+
+    unused = len(topology["arcs"]) - len(used)
+    if unused:
+        problems.append(f"{unused} arcs not used by any ring")
+    return problems
@@ -0,0 +1,49 @@
+// Progressive loading of the story's chart data (schema 3, see
+// data/story.schema.md). The manifest - meta, colours, labels, steps, and which
+// chunk each chart lives in - is bundled with the app; each chart's definition
+// and data is a content-hashed chunk in public/chunks/, fetched when a step
+// needs it. `loaded` is reactive, so components redraw as chunks arrive.
+import manifest from "../data/story.manifest.json";
+import {seriesRecords} from "./series.js";
+import {featureCollections} from "./topology.js";
+
+export const SCHEMA_VERSION = 3;
+
+if (manifest.schema !== SCHEMA_VERSION) {
+  throw new Error(`story manifest schema ${manifest.schema}, expected ${SCHEMA_VERSION}: rerun data/build.py`);
+}
+
+export {manifest};
+
+/** chart id -> {chart, series} or {chart, maps}, once its chunk has arrived. */
+export const loaded = $state({});
+const pending = new Map();
+
+/** Fetch a chart's chunk once; later calls share the same request. */
+export function load(id) {
+  if (!pending.has(id)) {
+    const url = `${import.meta.env.BASE_URL}chunks/${manifest.charts[id].chunk}`;
+    pending.set(id, fetch(url)
+      .then((r) => {
+        if (!r.ok) throw new Error(`${url}: ${r.status}`);
+        return r.json();
+      })
+      .then((chunk) => {
+        loaded[id] = chunk.series
+          ? {chart: chunk.chart, series: seriesRecords(chunk.series)}
+          : {chart: chunk.chart, maps: featureCollections(chunk.topology)};
+      })
+      .catch((err) => {
+        pending.delete(id);  // let the next step retry
+        console.error(err);
+      }));
+  }
+  return pending.get(id);
+}
+
+/** The chart a step shows, and the next step's, so it is ready before it is needed. */
+export function loadAround(step) {
+  load(manifest.steps[step].chart);
+  const next = manifest.steps[step + 1];
+  if (next) load(next.chart);
+}
@@ -0,0 +1,20 @@
+// Decodes a columnar `series` block (data/story.schema.md) into the
+// one-record-per-month array the charts draw from.
+
+/** [{month, date, ...key: value}], oldest first. */
+export function seriesRecords({start, months, encoding, columns}) {
+  const [year, month] = start.split("-").map(Number);
+  const records = Array.from({length: months}, (_, i) => {
+    const m = month - 1 + i;
+    const label = `${year + Math.floor(m / 12)}-${String((m % 12) + 1).padStart(2, "0")}`;
+    return {month: label, date: new Date(`${label}-01`)};
+  });
+  for (const [key, values] of Object.entries(columns)) {
+    let level = 0;
+    values.forEach((v, i) => {
+      level = encoding === "delta" ? level + v : v;
+      records[i][key] = level;
+    });
+  }
+  return records;
+}
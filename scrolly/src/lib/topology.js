@@ -0,0 +1,43 @@
+// Decodes a map chunk's TopoJSON (written by scrolly/data/topology.py) back into
+// one GeoJSON FeatureCollection per map. Only what the build writes is supported:
+// a quantised, delta-encoded topology of Polygon and MultiPolygon geometries.
+// The full topojson-client would do the same job as another dependency.
+
+/** Every arc as absolute lon/lat points. */
+function decodeArcs(topology) {
+  const [sx, sy] = topology.transform.scale;
+  const [tx, ty] = topology.transform.translate;
+  return topology.arcs.map((arc) => {
+    let x = 0, y = 0;
+    return arc.map(([dx, dy]) => [(x += dx) * sx + tx, (y += dy) * sy + ty]);
+  });
+}
+
+/** A ring from its arc indexes; ~i is arc i reversed, and arcs share their ends. */
+function ring(arcs, indexes) {
+  const points = [];
+  indexes.forEach((i, k) => {
+    const arc = i < 0 ? arcs[~i].slice().reverse() : arcs[i];
+    for (let p = k ? 1 : 0; p < arc.length; p++) points.push(arc[p]);
+  });
+  return points;
+}
+
+/** {name: FeatureCollection} for every object in the topology. */
+export function featureCollections(topology) {
+  const arcs = decodeArcs(topology);
+  const polygon = (rings) => rings.map((r) => ring(arcs, r));
+  return Object.fromEntries(
+    Object.entries(topology.objects).map(([name, collection]) => [name, {
+      type: "FeatureCollection",
+      features: collection.geometries.map((g) => ({
+        type: "Feature",
+        properties: g.properties,
+        geometry: {
+          type: g.type,
+          coordinates: g.type === "Polygon" ? polygon(g.arcs) : g.arcs.map(polygon),
+        },
+      })),
+    }]),
+  );
+}
@@ -0,0 +1,240 @@
+"""
+Unified build runner — every output target from one load of the data.
+
+Run from the repository root:
+    python src/build_all.py
+    python src/build_all.py --targets dashboard scrolly
+    python src/build_all.py --serial          # one target after another
+    python src/build_all.py --force           # dashboard: ignore the build manifest
+
+The dashboard, the scrolly and the prototype exports read the same interim pkl
+files, and the scrolly and the prototypes build the same rolling 12-month sums
+of arrivals, departures and net migration by citizenship. Run on their own,
+each target loads the data and derives those panels again. Here one DataLoader
+loads every dataset once and computes the shared panels once, then the targets
+run concurrently in a process pool that forks from that snapshot, as
+build_dashboard --parallel does for its stories. Each target's output is
+captured and printed in target order. A failing target does not stop the
+others; the build reports it and exits 1.
+
+The report gives each target's time and what it reused: the datasets and
+panels it took from the shared snapshot, and any it still had to read or
+compute itself.
+
+Targets:
+    dashboard   src/build_dashboard.py — dashboard/data/, output/fact_check_report.md
+    scrolly     scrolly/data/build.py — scrolly/src/data/, scrolly/public/chunks/
+    prototypes  prototypes/export_prototype_data.py — prototypes/data/
+
+The Observable prototype's data loader emits the prototypes target's file
+when it is current, rather than loading the data itself.
+"""
+
+from __future__ import annotations
+
+import argparse
+import importlib.util
+import io
+import multiprocessing
+import os
+import sys
+import time
+import traceback
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import redirect_stdout
+from dataclasses import dataclass, field
+from pathlib import Path
+from types import ModuleType
+from typing import Callable, Dict, List, Optional
+
+_REPO_ROOT = Path(__file__).parent.parent
+sys.path.insert(0, str(_REPO_ROOT))
+
+from src import build_dashboard  # noqa: E402
+from src.dashboard.data_loader import DataLoader  # noqa: E402
+
+# ── Targets ────────────────────────────────────────────────────────────────────
+
+_ROLLING_WINDOW = 12  # the panel the scrolly and the prototypes share
+
+
+def _script(path: Path, name: str) -> ModuleType:
+    """Import a build script by path, with its directory on sys.path for its siblings."""
+    sys.path.insert(0, str(path.parent))
+    spec = importlib.util.spec_from_file_location(name, path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def _dashboard(loader: DataLoader, force: bool) -> None:
+    if build_dashboard.build(loader, force=force):
+        raise RuntimeError("dashboard: one or more stories failed (see log)")
+
+
+def _scrolly(loader: DataLoader, force: bool) -> None:
+    _script(_REPO_ROOT / "scrolly" / "data" / "build.py", "scrolly_build").main(loader)
+
+
+def _prototypes(loader: DataLoader, force: bool) -> None:
+    _script(_REPO_ROOT / "prototypes" / "export_prototype_data.py",
+            "export_prototype_data").main(loader)
+
+
+TARGETS: Dict[str, Callable[[DataLoader, bool], None]] = {
+    "dashboard": _dashboard,
+    "scrolly": _scrolly,
+    "prototypes": _prototypes,
+}
+
+
+# ── Target runs ────────────────────────────────────────────────────────────────
+
+
+@dataclass
+class TargetResult:
+    """Outcome of one target, with what it took from the shared loader."""
+
+    name: str
+    seconds: float
+    log: str = ""
+    error: Optional[str] = None
+    reused: Dict[str, int] = field(default_factory=dict)
+    loaded: Dict[str, int] = field(default_factory=dict)
+
+
+# Worker-side: the loader every target in this process shares
+_loader: Optional[DataLoader] = None
+
+
+def _init_worker(loader: DataLoader) -> None:
+    global _loader
+    _loader = loader
+
+
+def _run_target(name: str, force: bool, capture: bool = True) -> TargetResult:
+    """Run one target with the process's loader, recording time, reuse and any error."""
+    _loader.reads.clear()
+    _loader.hits.clear()
+    out = io.StringIO() if capture else sys.stdout
+    start = time.perf_counter()
+    error = None
+    with redirect_stdout(out):
+        print(f"\n=== {name} ===")
+        try:
+            TARGETS[name](_loader, force)
+        except Exception:
+            error = traceback.format_exc()
+    return TargetResult(
+        name,
+        time.perf_counter() - start,
+        out.getvalue() if capture else "",
+        error,
+        dict(_loader.hits),
+        dict(_loader.reads),
+    )
+
+
+def preload_shared(loader: DataLoader) -> None:
+    """Load every dataset and compute the panels more than one target uses."""
+    loader.preload()
+    loader.load_subnational()
+    loader.load_citizenship_rolling(_ROLLING_WINDOW)
+
+
+def run_targets(
+    loader: DataLoader,
+    targets: List[str],
+    parallel: bool = True,
+    workers: Optional[int] = None,
+    force: bool = False,
+) -> List[TargetResult]:
+    """Run the given targets on one preloaded loader, returning results in order.
+
+    Args:
+        loader: Preloaded with preload_shared().
+        targets: Names from TARGETS.
+        parallel: Run the targets in a process pool.
+        workers: Pool size. Defaults to one process per target, capped at the
+            CPU count.
+        force: Passed to every target; the dashboard rebuilds every story.
+    """
+    if not parallel or len(targets) < 2:
+        _init_worker(loader)
+        return [_run_target(name, force, capture=False) for name in targets]
+
+    workers = workers or min(len(targets), os.cpu_count() or 1)
+    # fork shares the preloaded frames copy-on-write; spawn (the only option
+    # on some platforms) sends each worker one pickled copy instead
+    methods = multiprocessing.get_all_start_methods()
+    context = multiprocessing.get_context("fork" if "fork" in methods else "spawn")
+    with ProcessPoolExecutor(
+        max_workers=workers,
+        mp_context=context,
+        initializer=_init_worker,
+        initargs=(loader,),
+    ) as pool:
+        futures = [pool.submit(_run_target, name, force) for name in targets]
+        results = [future.result() for future in futures]
+    for result in results:
+        sys.stdout.write(result.log)
+    return results
+
+
+def _counts(counts: Dict[str, int]) -> str:
+    return ", ".join(
+        name if n == 1 else f"{name} ×{n}" for name, n in sorted(counts.items())
+    ) or "none"
+
+
+# ── Main ───────────────────────────────────────────────────────────────────────
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--targets", nargs="+", choices=list(TARGETS), default=list(TARGETS),
+                        help="targets to build (default: all)")
+    parser.add_argument("--serial", action="store_true",
+                        help="run the targets one after another instead of in a process pool")
+    parser.add_argument("--workers", type=int, default=None,
+                        help="pool size (default: one per target, up to the CPU count)")
+    parser.add_argument("--force", action="store_true",
+                        help="dashboard: rebuild every story, even those the manifest says are current")
+    args = parser.parse_args(argv)
+
+    print("NZ Migration — unified build")
+    print("=" * 50)
+
+    start = time.perf_counter()
+    loader = DataLoader()
+    preload_shared(loader)
+    shared_seconds = time.perf_counter() - start
+    shared = dict(loader.reads)
+
+    results = run_targets(loader, args.targets, parallel=not args.serial,
+                          workers=args.workers, force=args.force)
+
+    print("\n--- Timings ---")
+    print(f"  {'shared load':<12} {shared_seconds:>6.2f}s  {len(shared)} datasets and panels")
+    for result in results:
+        status = "FAILED" if result.error else "ok"
+        print(f"  {result.name:<12} {result.seconds:>6.2f}s  {status}")
+        print(f"  {'':<12} reused: {_counts(result.reused)}")
+        if result.loaded:
+            print(f"  {'':<12} loaded itself: {_counts(result.loaded)}")
+    print(f"  {'Total':<12} {time.perf_counter() - start:>6.2f}s")
+
+    failed = [result for result in results if result.error]
+    for result in failed:
+        print(f"\n--- {result.name} failed ---\n{result.error}", file=sys.stderr)
+
+    print("\n" + "=" * 50)
+    if failed:
+        print(f"Build incomplete: {len(failed)} target(s) failed.")
+        return 1
+    print("Build complete.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -3,8 +3,24 @@ Dashboard build script — pre-generates all Plotly chart HTML for the Quarto si
 
 Run from the repository root before `quarto render dashboard/`:
     python src/build_dashboard.py
+    python src/build_dashboard.py --parallel              # one process per story
+    python src/build_dashboard.py --parallel --workers 2
+    python src/build_dashboard.py --force                 # ignore the build manifest
+
+Builds are incremental: a story whose datasets, input files, code and export
+settings are unchanged since its last successful build, and whose fragments are
+intact, is skipped (see src/dashboard/manifest.py). Fragments are only
+rewritten when their content changes, so Quarto re-renders only what changed.
+
+With --parallel, every dataset is loaded once up front and the stories run in a
+process pool that shares that snapshot. Each story's output is captured and
+printed in story order, so the log and the fact-check report are the same
+whichever story finishes first. A failing story does not stop the others; the
+build reports it and exits 1.
 
 Output: dashboard/data/*.html (one file per chart)
+        dashboard/data/geo/*.geojson (map geometry, named by content hash)
+        dashboard/data/geo/*.geojson.gz|.br (pre-compressed for the static host)
 
 Inputs:
     data/interim/df_*.pkl  — processed migration data files
@@ -12,74 +28,249 @@ Inputs:
 
 from __future__ import annotations
 
+import argparse
 import datetime
+import io
+import multiprocessing
+import os
 import sys
+import time
+import traceback
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import redirect_stdout
+from dataclasses import dataclass
 from pathlib import Path
+from typing import List, Optional, Type
 
 # Add repo root to path so src.dashboard imports resolve
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
+from src.dashboard.base import BaseStory
 from src.dashboard.data_loader import DataLoader
+from src.dashboard.export import GEO_DIR, prune_geo_assets, write_if_changed
 from src.dashboard.fact_checker import EvidenceScorer
+from src.dashboard.manifest import BuildManifest, story_fingerprint
+from src.dashboard.precompress import precompress_dir
 from src.dashboard.stories.kiwi_exodus import KiwiExodusStory
 from src.dashboard.stories.india_surge import IndiaSurgeStory
 from src.dashboard.stories.visa_shift import VisaShiftStory
 from src.dashboard.stories.regional_map import RegionalMapStory
 
+# ── Constants ──────────────────────────────────────────────────────────────────
+
+# Build order, which is also the order of the log and the fact-check report
+STORIES: List[Type[BaseStory]] = [
+    KiwiExodusStory,
+    IndiaSurgeStory,
+    VisaShiftStory,
+    RegionalMapStory,
+]
+
+
+# ── Story runs ─────────────────────────────────────────────────────────────────
+
+
+@dataclass
+class StoryResult:
+    """Outcome of one story build."""
+
+    title: str
+    seconds: float
+    log: str = ""
+    error: Optional[str] = None
+    skipped: bool = False
+
+
+# Worker-side: the loader shared by every story this process builds
+_loader: Optional[DataLoader] = None
+
+
+def _init_worker(loader: DataLoader) -> None:
+    global _loader
+    _loader = loader
+
+
+def _run_story(story_cls: Type[BaseStory], capture: bool = True) -> StoryResult:
+    """Build one story with the process's loader, recording time and any error.
+
+    Args:
+        story_cls: Story to build.
+        capture: Collect the story's output into the result instead of printing
+            it, so parallel builds do not interleave their logs.
+    """
+    out = io.StringIO() if capture else sys.stdout
+    start = time.perf_counter()
+    error = None
+    with redirect_stdout(out):
+        try:
+            story_cls(_loader).run()
+        except Exception:
+            error = traceback.format_exc()
+    seconds = time.perf_counter() - start
+    return StoryResult(
+        story_cls.title, seconds, out.getvalue() if capture else "", error
+    )
+
+
+def run_stories(
+    loader: DataLoader,
+    stories: List[Type[BaseStory]] = STORIES,
+    parallel: bool = False,
+    workers: Optional[int] = None,
+) -> List[StoryResult]:
+    """Build the given stories, returning results in the same order.
+
+    Args:
+        loader: Shared by every story. Preloaded first when parallel, so workers
+            inherit the data instead of each reading the pkl files again.
+        stories: Story classes to build.
+        parallel: Run the stories in a process pool.
+        workers: Pool size. Defaults to one process per story, capped at the
+            CPU count.
+    """
+    if not parallel or not stories:
+        _init_worker(loader)
+        return [_run_story(story_cls, capture=False) for story_cls in stories]
+
+    loader.preload(sorted({pattern for cls in stories for pattern in cls.datasets}))
+    workers = workers or min(len(stories), os.cpu_count() or 1)
+    # fork shares the preloaded frames copy-on-write; spawn (the only option
+    # on some platforms) sends each worker one pickled copy instead
+    methods = multiprocessing.get_all_start_methods()
+    context = multiprocessing.get_context("fork" if "fork" in methods else "spawn")
+    with ProcessPoolExecutor(
+        max_workers=workers,
+        mp_context=context,
+        initializer=_init_worker,
+        initargs=(loader,),
+    ) as pool:
+        futures = [pool.submit(_run_story, story_cls) for story_cls in stories]
+        results = [future.result() for future in futures]
+    for result in results:
+        sys.stdout.write(result.log)
+    return results
+
 
 def _write_fact_check_report(stories: list, output_dir: Path) -> None:
     """Write an internal markdown fact-check report for all stories.
 
+    The report is left untouched, generation date included, when no fact
+    check changed.
+
     Args:
         stories: List of BaseStory instances — each must implement get_fact_check().
         output_dir: Directory to write fact_check_report.md into.
     """
-    output_dir.mkdir(parents=True, exist_ok=True)
     scorer = EvidenceScorer()
-    lines: list[str] = [
-        "# NZ Migration — Fact-Check Report\n\n",
-        f"_Generated {datetime.date.today()}_\n\n---\n\n",
-    ]
+    title = "# NZ Migration — Fact-Check Report\n\n"
+    body: list[str] = []
     for story in stories:
         fact = story.get_fact_check()
-        lines.append(f"## {story.title}\n\n")
-        lines.append(scorer.render_markdown(fact))
-        lines.append("\n\n---\n\n")
+        body.append(f"## {story.title}\n\n")
+        body.append(scorer.render_markdown(fact))
+        body.append("\n\n---\n\n")
+    body_text = "".join(body)
+
     path = output_dir / "fact_check_report.md"
-    path.write_text("".join(lines), encoding="utf-8")
+    if path.exists():
+        old = path.read_text(encoding="utf-8")
+        if old.startswith(title) and old.endswith("---\n\n" + body_text):
+            print(f"  Fact-check report unchanged: {path}")
+            return
+    header = f"{title}_Generated {datetime.date.today()}_\n\n---\n\n"
+    write_if_changed(path, header + body_text)
     print(f"  Fact-check report saved: {path}")
 
 
-def main() -> None:
+def build(
+    loader: Optional[DataLoader] = None,
+    force: bool = False,
+    parallel: bool = False,
+    workers: Optional[int] = None,
+) -> int:
     """Run all stories and export chart HTML files to dashboard/data/.
 
     Quarto .qmd files embed these via {{< include >}} shortcodes —
     no Python execution needed during quarto render.
 
     Also writes output/fact_check_report.md for internal review.
-    """
-    print("NZ Migration Dashboard — build script")
-    print("=" * 50)
 
-    loader = DataLoader()
+    Args:
+        loader: Shared loader, e.g. src/build_all.py's; a new one by default.
+        force: Rebuild every story, even those the manifest says are current.
+        parallel: Build the stories in a process pool.
+        workers: Pool size with parallel.
 
-    stories = [
-        KiwiExodusStory(loader),
-        IndiaSurgeStory(loader),
-        VisaShiftStory(loader),
-        RegionalMapStory(loader),
+    Returns:
+        Exit status: 1 if any story failed.
+    """
+    start = time.perf_counter()
+    loader = loader or DataLoader()
+    output_dir = STORIES[0](loader).output_dir
+    manifest = BuildManifest()
+    fingerprints = {cls: story_fingerprint(cls, loader) for cls in STORIES}
+    stale = [
+        cls for cls in STORIES
+        if force or not manifest.is_current(cls.slug, fingerprints[cls], output_dir)
     ]
+    for cls in STORIES:
+        if cls not in stale:
+            print(f"\n[{cls.title}] unchanged — skipped")
 
-    for story in stories:
-        story.run()
+    built = iter(run_stories(loader, stale, parallel=parallel, workers=workers))
+    results = [
+        next(built) if cls in stale else StoryResult(cls.title, 0.0, skipped=True)
+        for cls in STORIES
+    ]
+    for cls, result in zip(STORIES, results):
+        if result.error:
+            manifest.forget(cls.slug)
+        elif not result.skipped:
+            manifest.record(cls.slug, fingerprints[cls], output_dir)
+    manifest.save()
+    prune_geo_assets(output_dir)
+    # The fragments are inlined into the pages by Quarto; the geometry is what
+    # the browser fetches as it is
+    precompress_dir(output_dir / GEO_DIR, "*.geojson")
 
     print("\n--- Fact-check report ---")
     repo_root = Path(__file__).parent.parent
-    _write_fact_check_report(stories, repo_root / "output")
+    # Fact checks are static per story, so they come from fresh instances here
+    # in STORIES order, not from whichever worker finished first
+    _write_fact_check_report([story_cls(loader) for story_cls in STORIES], repo_root / "output")
+
+    print("\n--- Timings ---")
+    for result in results:
+        status = "FAILED" if result.error else "skipped" if result.skipped else "ok"
+        print(f"  {result.title:<28} {result.seconds:>6.2f}s  {status}")
+    print(f"  {'Total':<28} {time.perf_counter() - start:>6.2f}s")
+
+    failed = [result for result in results if result.error]
+    for result in failed:
+        print(f"\n--- {result.title} failed ---\n{result.error}", file=sys.stderr)
 
     print("\n" + "=" * 50)
+    if failed:
+        print(f"Build incomplete: {len(failed)} story(ies) failed.")
+        return 1
     print("Build complete. Run 'quarto render dashboard/' to generate the site.")
+    return 0
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--parallel", action="store_true",
+                        help="build the stories in a process pool")
+    parser.add_argument("--workers", type=int, default=None,
+                        help="pool size with --parallel (default: one per story, up to the CPU count)")
+    parser.add_argument("--force", action="store_true",
+                        help="rebuild every story, even those the manifest says are current")
+    args = parser.parse_args(argv)
+
+    print("NZ Migration Dashboard — build script")
+    print("=" * 50)
+    return build(force=args.force, parallel=args.parallel, workers=args.workers)
 
 
 if __name__ == "__main__":
-    main()
+    sys.exit(main())
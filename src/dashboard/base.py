@@ -110,6 +110,11 @@ class BaseStory(ABC):
 
     title: str = ""
     slug: str = ""
+    datasets: List[str] = []
+    """DataLoader patterns read by build_figures (e.g. 'df_direction_visa')."""
+    input_files: List[Path] = []
+    """Other files read by build_figures. With datasets, these decide when an
+    incremental build must rebuild the story (src/dashboard/manifest.py)."""
 
     def __init__(self, loader: "DataLoader") -> None:
         self.loader = loader
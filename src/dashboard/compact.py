@@ -0,0 +1,359 @@
+"""
+Compact chart fragments — the same figure in fewer bytes.
+
+plotly's to_html writes every number at full float precision, every date with
+a midnight time, the whole template (styles for some forty trace types the
+chart does not use) and the same month axis once per trace. A compact
+fragment draws the same chart:
+
+    rounding     each numeric array is rounded to the precision its trace
+                 displays: the hovertemplate/texttemplate format that shows it
+                 (%{y:,.0f} -> 0 decimals, %{x:.1%} -> 3), and never fewer
+                 than SIGNIFICANT_DIGITS, which keeps positions and colours
+                 sub-pixel. A value is kept whole where rounding it would
+                 change a displayed digit, and arrays shown unformatted
+                 (%{customdata}) are left alone.
+    dates        "2005-01-01T00:00:00" is written "2005-01-01"
+    template     only the template.data entries of trace types in the figure
+    shared axes  an array repeated across traces is written once and assigned
+                 to each of them in the fragment's script
+    typed arrays numeric arrays are written as base64 typed arrays
+                 ({"dtype", "bdata"}) where that is shorter, if the site's
+                 plotly.js can read them (2.28 and later)
+
+Usage:
+    from src.dashboard.compact import compact_fragment
+    html = compact_fragment(fig, div_id="kiwi-exodus_main", config=CHART_CONFIG)
+"""
+
+from __future__ import annotations
+
+import base64
+import json
+import math
+import re
+from decimal import ROUND_HALF_UP, Decimal
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+import plotly.graph_objects as go
+
+# ── Constants ──────────────────────────────────────────────────────────────────
+
+SIGNIFICANT_DIGITS = 6
+
+# Arrays shorter than this are never shared or typed: not worth the indirection
+MIN_ARRAY_LENGTH = 16
+
+# Trace attributes holding data arrays that compaction may rewrite
+DATA_KEYS = ("x", "y", "z", "base", "customdata")
+
+# The plotly.js the site loads (dashboard/_quarto.yml) decides typed array support
+_QUARTO_CONFIG = Path(__file__).parent.parent.parent / "dashboard" / "_quarto.yml"
+TYPED_ARRAYS_SINCE = (2, 28, 0)
+
+# %{y:,.0f}, %{customdata[1]:.1%}, %{x|%b %Y}
+_TEMPLATE_REF = re.compile(r"%\{(\w+)(?:\[(\d+)\])?(?::([^}|]*))?(?:\|[^}]*)?\}")
+# d3-format spec: [[fill]align][sign][symbol][0][width][,][.precision][~][type]
+_D3_FORMAT = re.compile(r"^(?:.?[<>=^])?[-+( ]?[$#]?0?\d*,?(?:\.(\d+))?~?([a-z%]?)$")
+_MIDNIGHT = re.compile(r"^(\d{4}-\d\d-\d\d)T00:00:00(?:\.0+)?$")
+
+_FULL = -1  # display precision of a value shown unformatted
+
+
+# ── plotly.js version ──────────────────────────────────────────────────────────
+
+
+def site_plotlyjs_version(config: Path = _QUARTO_CONFIG) -> Optional[Tuple[int, ...]]:
+    """Version of the plotly.js the site loads from the CDN, or None if not found."""
+    try:
+        match = re.search(r"plotly-(\d+)\.(\d+)\.(\d+)(?:\.min)?\.js", config.read_text(encoding="utf-8"))
+    except FileNotFoundError:
+        return None
+    return tuple(int(part) for part in match.groups()) if match else None
+
+
+def typed_arrays_supported() -> bool:
+    """Whether the site's plotly.js decodes {"dtype", "bdata"} arrays."""
+    version = site_plotlyjs_version()
+    return version is not None and version >= TYPED_ARRAYS_SINCE
+
+
+# ── Display precision ──────────────────────────────────────────────────────────
+
+
+def _format_decimals(spec: Optional[str], positional: bool) -> Optional[int]:
+    """Decimals of the value a d3 format displays, None if it adds no constraint.
+
+    x and y shown without a format are labelled with the axis format, which
+    the significant-digit floor already covers. Any other value shown without
+    a precision, or in a format whose precision is not in decimals (e, g, s,
+    ...), is displayed whole and returns _FULL.
+    """
+    if not spec:
+        return None if positional else _FULL
+    match = _D3_FORMAT.match(spec.strip())
+    if not match:
+        return _FULL
+    precision, kind = match.groups()
+    if kind == "d":
+        return 0
+    if precision is None or kind not in ("f", "%"):
+        return _FULL
+    return int(precision) + (2 if kind == "%" else 0)
+
+
+def display_decimals(trace: Dict[str, Any]) -> Dict[Tuple[str, Optional[int]], int]:
+    """Decimals each data array (or customdata column) of trace is displayed at.
+
+    Returns:
+        (key, column) -> decimals, or _FULL for arrays that must not be rounded.
+        column is None except for indexed customdata references.
+    """
+    templates: List[str] = []
+    for attr in ("hovertemplate", "texttemplate"):
+        value = trace.get(attr)
+        if isinstance(value, str):
+            templates.append(value)
+        elif isinstance(value, list):
+            templates.extend(v for v in value if isinstance(v, str))
+
+    decimals: Dict[Tuple[str, Optional[int]], int] = {}
+    for template in templates:
+        for key, column, spec in _TEMPLATE_REF.findall(template):
+            if key == "value":  # pie, treemap, ... display their values array
+                key = "values"
+            found = _format_decimals(spec, positional=key in ("x", "y"))
+            if found is None:
+                continue
+            ref = (key, int(column) if column else None)
+            previous = decimals.get(ref, found)
+            decimals[ref] = _FULL if _FULL in (previous, found) else max(previous, found)
+    return decimals
+
+
+# ── Rounding ───────────────────────────────────────────────────────────────────
+
+
+def _is_number(value: Any) -> bool:
+    return isinstance(value, (int, float)) and not isinstance(value, bool)
+
+
+def _quantize(value: float, decimals: int) -> Decimal:
+    # d3 formats |x| with toFixed, which rounds the exact binary value half up
+    return Decimal(value).quantize(Decimal(1).scaleb(-decimals), rounding=ROUND_HALF_UP)
+
+
+def _number(value: Decimal) -> int | float:
+    return int(value) if value == value.to_integral_value() else float(value)
+
+
+def round_array(values: List[Any], display: Optional[int]) -> List[Any]:
+    """Round the floats of values, keeping every displayed digit.
+
+    Args:
+        values: One data array; non-numeric entries are kept as they are.
+        display: Decimals the values are displayed at, None if they are only
+            drawn, or _FULL to leave them alone.
+    """
+    numbers = [abs(v) for v in values if _is_number(v) and math.isfinite(v)]
+    if display == _FULL or not numbers or not any(isinstance(v, float) for v in values):
+        return values
+    largest = max(numbers)
+    significant = SIGNIFICANT_DIGITS - 1 - (math.floor(math.log10(largest)) if largest else 0)
+    decimals = max(significant, display or 0, 0)
+
+    out = []
+    for value in values:
+        if not isinstance(value, float) or not math.isfinite(value):
+            out.append(value)
+            continue
+        rounded = _quantize(value, decimals)
+        # Rounding twice (to decimals, then to display in the browser) can
+        # carry a 5 up into a displayed digit; keep those few values whole
+        if display is not None and decimals > display and (
+            _quantize(float(rounded), display) != _quantize(value, display)
+        ):
+            out.append(value)
+        else:
+            out.append(_number(rounded))
+    return out
+
+
+def _round_trace(trace: Dict[str, Any]) -> None:
+    """Round every data array of trace in place."""
+    decimals = display_decimals(trace)
+    for key in (*DATA_KEYS, "values"):
+        values = trace.get(key)
+        if not isinstance(values, list) or not values:
+            continue
+        rows = all(isinstance(row, list) for row in values)
+        if rows and key == "customdata" and len({len(row) for row in values}) == 1:
+            # One column per customdata[i] reference, each at its own precision
+            columns = [
+                round_array(list(column), decimals.get((key, i), decimals.get((key, None))))
+                for i, column in enumerate(zip(*values))
+            ]
+            trace[key] = [list(row) for row in zip(*columns)]
+        elif rows:
+            trace[key] = [round_array(row, decimals.get((key, None))) for row in values]
+        else:
+            trace[key] = round_array(values, decimals.get((key, None)))
+
+
+def _strip_midnight(values: List[Any]) -> List[Any]:
+    out = []
+    for value in values:
+        match = _MIDNIGHT.match(value) if isinstance(value, str) else None
+        out.append(match.group(1) if match else value)
+    return out
+
+
+# ── Typed arrays ───────────────────────────────────────────────────────────────
+
+
+def decode_typed(value: Any) -> Any:
+    """Turn a {"dtype", "bdata"} array (as plotly.py 6 writes) back into a list."""
+    if isinstance(value, dict) and set(value) >= {"dtype", "bdata"}:
+        array = np.frombuffer(base64.b64decode(value["bdata"]), dtype=value["dtype"])
+        if "shape" in value:
+            array = array.reshape([int(n) for n in str(value["shape"]).split(",")])
+        return array.tolist()
+    if isinstance(value, dict):
+        return {k: decode_typed(v) for k, v in value.items()}
+    if isinstance(value, list):
+        return [decode_typed(v) for v in value]
+    return value
+
+
+def encode_typed(values: List[Any]) -> Any:
+    """values as a base64 typed array if that is shorter than JSON, else values."""
+    if len(values) < MIN_ARRAY_LENGTH or not all(_is_number(v) for v in values):
+        return values
+    if all(isinstance(v, int) for v in values):
+        low, high = min(values), max(values)
+        dtype = next(
+            (t for t in ("i1", "u1", "i2", "u2", "i4", "u4")
+             if np.iinfo(t).min <= low and high <= np.iinfo(t).max),
+            None,
+        )
+        if dtype is None:
+            return values
+    else:
+        dtype = "f8"
+    typed = {
+        "dtype": dtype,
+        "bdata": base64.b64encode(np.asarray(values, dtype=dtype).tobytes()).decode("ascii"),
+    }
+    return typed if len(script_json(typed)) < len(script_json(values)) else values
+
+
+# ── Fragment ───────────────────────────────────────────────────────────────────
+
+
+def script_json(value: Any) -> str:
+    """Compact JSON safe to place inside a <script> element."""
+    # </ would end the script element early
+    return json.dumps(value, separators=(",", ":"), ensure_ascii=False).replace("</", "<\\/")
+
+
+def compact_spec(fig: go.Figure, typed_arrays: bool = False) -> Tuple[List[Dict], Dict, List[List], List[Tuple[int, str, int]]]:
+    """The figure's data and layout, compacted.
+
+    Returns:
+        data, layout, the shared arrays, and (trace, key, shared index) for
+        each array to take from them.
+    """
+    spec = decode_typed(json.loads(fig.to_json()))
+    data: List[Dict[str, Any]] = spec.get("data", [])
+    layout: Dict[str, Any] = spec.get("layout", {})
+
+    for trace in data:
+        _round_trace(trace)
+        for key in ("x", "y", "base"):
+            if isinstance(trace.get(key), list):
+                trace[key] = _strip_midnight(trace[key])
+
+    template = layout.get("template")
+    if isinstance(template, dict) and isinstance(template.get("data"), dict):
+        used = {trace.get("type", "scatter") for trace in data}
+        template["data"] = {kind: styles for kind, styles in template["data"].items() if kind in used}
+
+    # Arrays that appear in more than one trace are written once
+    seen: Dict[str, int] = {}
+    counts: Dict[str, int] = {}
+    for trace in data:
+        for key in DATA_KEYS:
+            values = trace.get(key)
+            if isinstance(values, list) and len(values) >= MIN_ARRAY_LENGTH:
+                text = script_json(values)
+                counts[text] = counts.get(text, 0) + 1
+    shared: List[List] = []
+    refs: List[Tuple[int, str, int]] = []
+    for index, trace in enumerate(data):
+        for key in DATA_KEYS:
+            values = trace.get(key)
+            if not isinstance(values, list) or len(values) < MIN_ARRAY_LENGTH:
+                continue
+            text = script_json(values)
+            if counts[text] > 1:
+                if text not in seen:
+                    seen[text] = len(shared)
+                    shared.append(values)
+                refs.append((index, key, seen[text]))
+                del trace[key]
+            elif typed_arrays:
+                trace[key] = encode_typed(values)
+    if typed_arrays:
+        shared = [encode_typed(values) for values in shared]
+    return data, layout, shared, refs
+
+
+_FRAGMENT = """\
+<div>
+<div id="{div_id}" class="plotly-graph-div" style="height:{height}; width:{width};"></div>
+<script type="text/javascript">
+(function() {{
+  var shared = {shared};
+  var data = {data};
+  {refs}.forEach(function(r) {{ data[r[0]][r[1]] = shared[r[2]]; }});
+  if (document.getElementById("{div_id}")) {{
+    Plotly.newPlot("{div_id}", data, {layout}, {config});
+  }}
+}})();
+</script>
+</div>
+"""
+
+
+def compact_fragment(
+    fig: go.Figure,
+    div_id: str,
+    config: Dict[str, Any],
+    typed_arrays: Optional[bool] = None,
+) -> str:
+    """An HTML fragment drawing fig, like fig.to_html(full_html=False) but smaller.
+
+    Args:
+        fig: Figure to draw.
+        div_id: id of the chart div; it keeps the plotly-graph-div class.
+        config: plotly.js config.
+        typed_arrays: Write base64 typed arrays where shorter. Defaults to
+            whether the site's plotly.js supports them.
+    """
+    if typed_arrays is None:
+        typed_arrays = typed_arrays_supported()
+    data, layout, shared, refs = compact_spec(fig, typed_arrays)
+    height = layout.get("height")
+    width = layout.get("width")
+    return _FRAGMENT.format(
+        div_id=div_id,
+        height=f"{height}px" if height else "100%",
+        width=f"{width}px" if width else "100%",
+        shared=script_json(shared),
+        data=script_json(data),
+        refs=script_json([list(ref) for ref in refs]),
+        layout=script_json(layout),
+        config=script_json(config),
+    )
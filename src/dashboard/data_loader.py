@@ -4,18 +4,46 @@ DataLoader — finds and loads the latest processed pkl files from data/interim/
 Resolves the 'latest' file by sorting all matching filenames alphabetically
 (YYYYMMDD suffix means lexicographic sort == chronological sort).
 
+Also serves the subnational population estimates (src/dashboard/subnational.py),
+parsed once per loader from data/raw/, and derived panels several builds share,
+computed once per loader.
+
+Every dataset and panel a loader serves is counted: `reads` when it came from
+disk or was computed, `hits` when it came from the loader's memory. A build
+sharing one loader across outputs reports its reuse from these.
+
 Usage:
     loader = DataLoader()
     df = loader.load_citizenship_direction()
+    table = loader.load_subnational()
+    rolling = loader.load_citizenship_rolling()  # 12-month sums, Direction × Citizenship
+    loader.preload()  # everything, e.g. before forking story builds
 """
 
 from __future__ import annotations
 
+from collections import Counter
 from pathlib import Path
-from typing import Optional
+from typing import Dict, List, Optional
 
 import pandas as pd
 
+from src.dashboard.subnational import SUBNATIONAL_CSV, SubnationalTable, load_subnational
+
+# ── Constants ──────────────────────────────────────────────────────────────────
+
+# Filename prefix of every dataset a loader method reads
+PATTERNS = [
+    "df_citizenship_direction",
+    "df_direction_age_sex",
+    "df_direction_visa",
+    "df_citizenship_visa",
+    "df_direction_region",
+    "df_clpr_india_visa",
+    "df_clpr_china_visa",
+    "df_clpr_philippines_visa",
+]
+
 
 # ── DataLoader class ───────────────────────────────────────────────────────────
 
@@ -31,26 +59,53 @@ class DataLoader:
             base_path = Path(__file__).parent.parent.parent
         self.interim_path = base_path / "data" / "interim"
         self._cache: dict[str, pd.DataFrame] = {}
+        self.raw_path = base_path / "data" / "raw"
+        self.processed_path = base_path / "data" / "processed"
+        self._subnational: Optional[SubnationalTable] = None
+        self._panels: Dict[str, pd.DataFrame] = {}
+        self.reads: Counter[str] = Counter()
+        self.hits: Counter[str] = Counter()
 
     # ── Private helpers ────────────────────────────────────────────────────────
 
     def _load_latest(self, pattern: str) -> pd.DataFrame:
         """Find and load the latest pkl matching pattern."""
         if pattern in self._cache:
+            self.hits[pattern] += 1
             return self._cache[pattern]
-        files = sorted(self.interim_path.glob(f"{pattern}_*.pkl"))
-        if not files:
+        path = self.latest_path(pattern)
+        if path is None:
             raise FileNotFoundError(
                 f"No file matching '{pattern}_*.pkl' in {self.interim_path}"
             )
-        path = files[-1]
         df = pd.read_pickle(path)
         print(f"  Loaded {path.name}  ({len(df):,} rows)")
         self._cache[pattern] = df
+        self.reads[pattern] += 1
         return df
 
     # ── Public loaders ─────────────────────────────────────────────────────────
 
+    def latest_path(self, pattern: str) -> Optional[Path]:
+        """The pkl a loader method for pattern reads, or None if there is none."""
+        files = sorted(self.interim_path.glob(f"{pattern}_*.pkl"))
+        return files[-1] if files else None
+
+    def preload(self, patterns: Optional[List[str]] = None) -> None:
+        """Load datasets now, so copies of this loader share one snapshot.
+
+        Datasets with no file yet (e.g. a CLPR breakdown not processed) are
+        skipped; their loader method still raises FileNotFoundError.
+
+        Args:
+            patterns: Datasets to load. Defaults to all of PATTERNS.
+        """
+        for pattern in PATTERNS if patterns is None else patterns:
+            try:
+                self._load_latest(pattern)
+            except FileNotFoundError:
+                continue
+
     def load_citizenship_direction(self) -> pd.DataFrame:
         """Direction × Citizenship (monthly).
 
@@ -106,3 +161,38 @@ class DataLoader:
         Columns: Month, Count, Direction, CLPR, Visa, Citizenship
         """
         return self._load_latest("df_clpr_philippines_visa")
+
+    def load_subnational(self) -> SubnationalTable:
+        """Subnational population estimates by TA and Auckland local board (annual).
+
+        Index: level, area, measure, year. Column: value
+        """
+        if self._subnational is None:
+            self._subnational = load_subnational(
+                self.raw_path / SUBNATIONAL_CSV.name, self.processed_path
+            )
+            self.reads["subnational"] += 1
+        else:
+            self.hits["subnational"] += 1
+        return self._subnational
+
+    # ── Derived panels ─────────────────────────────────────────────────────────
+
+    def load_citizenship_rolling(self, window: int = 12) -> pd.DataFrame:
+        """Rolling window-month sums of every Direction × Citizenship series.
+
+        Index: Month, sorted. Columns: (Direction, Citizenship). The first
+        window - 1 months are NaN.
+        """
+        name = f"citizenship_rolling_{window}"
+        if name in self._panels:
+            self.hits[name] += 1
+            return self._panels[name]
+        wide = (
+            self.load_citizenship_direction()
+            .pivot_table(index="Month", columns=["Direction", "Citizenship"], values="Count")
+            .sort_index()
+        )
+        self._panels[name] = wide.rolling(window, min_periods=window).sum()
+        self.reads[name] += 1
+        return self._panels[name]
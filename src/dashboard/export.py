@@ -4,18 +4,143 @@ Export utilities — saves Plotly figures as self-contained HTML fragments.
 Each chart is saved with full_html=False so it can be embedded inside a
 Quarto page that already has Plotly.js loaded via the site header.
 
+Output is deterministic (the chart div is named after its file, not a random
+UUID), and a file is only rewritten when its content changes, so an unchanged
+chart keeps its mtime and Quarto has nothing to re-render.
+
+Charts are written compact by default (see src/dashboard/compact.py): numbers
+rounded to their display precision, shared month axes written once, unused
+template entries dropped. Each save reports the fragment's size against
+plotly's plain to_html output.
+
+Fragments come in two modes. "inline" fragments draw their chart as soon as the
+page parses them; "lazy" fragments only register it, and dashboard/lazy-charts.js
+draws it when it nears the viewport (see src/dashboard/lazy.py). The site uses
+lazy mode.
+
+Map geometry is not embedded: each GeoJSON a choropleth uses is written once to
+dashboard/data/geo/ under the hash of its content, and the fragment passes
+plotly.js its URL. Browsers cache the file across pages and rebuilds, and a
+new version of the geometry gets a new URL.
+
 Usage:
     from src.dashboard.export import save_chart_html
     save_chart_html(fig, output_dir / "kiwi_exodus_main.html")
+    save_all_charts("kiwi-exodus", figures, output_dir, mode="inline")
 """
 
 from __future__ import annotations
 
+import hashlib
+import json
+import re
 from pathlib import Path
+from typing import Any, Dict, List
 
+import plotly
 import plotly.graph_objects as go
 import plotly.io as pio
 
+from src.dashboard.compact import compact_fragment, typed_arrays_supported
+from src.dashboard.lazy import lazy_fragment
+from src.dashboard.webgl import WEBGL_THRESHOLD, use_webgl
+
+# ── Constants ──────────────────────────────────────────────────────────────────
+
+CHART_CONFIG = {"displayModeBar": False, "responsive": True, "scrollZoom": False}
+COMPACT_EXPORT = True
+CHART_MODES = ("inline", "lazy")
+CHART_MODE = "lazy"
+GEO_ASSETS = True
+
+# GeoJSON assets, under the output dir; the URL is relative to
+# dashboard/index.qmd, the page that includes the fragments
+GEO_DIR = "geo"
+GEO_URL = "data/geo"
+_GEO_REF = re.compile(re.escape(GEO_URL) + r"/([0-9a-f]{12}\.geojson)")
+
+
+# ── Helpers ────────────────────────────────────────────────────────────────────
+
+
+def write_if_changed(path: Path, text: str) -> bool:
+    """Write text to path unless it already holds exactly that. Returns True if written."""
+    path = Path(path)
+    if path.exists() and path.read_text(encoding="utf-8") == text:
+        return False
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(text, encoding="utf-8")
+    return True
+
+
+def export_settings() -> Dict[str, Any]:
+    """Everything besides figures and code that shapes the exported HTML.
+
+    Part of the incremental build fingerprint (src/dashboard/manifest.py).
+    """
+    return {
+        "config": CHART_CONFIG,
+        "webgl_threshold": WEBGL_THRESHOLD,
+        "plotly": plotly.__version__,
+        "compact": COMPACT_EXPORT,
+        "mode": CHART_MODE,
+        "typed_arrays": COMPACT_EXPORT and typed_arrays_supported(),
+        "geo_assets": GEO_ASSETS,
+    }
+
+
+def _kb(text: str) -> str:
+    return f"{len(text.encode('utf-8')) / 1024:.1f} KB"
+
+
+# ── GeoJSON assets ─────────────────────────────────────────────────────────────
+
+
+def save_geo_asset(geojson: Dict[str, Any], asset_dir: Path) -> str:
+    """Write geojson to asset_dir under its content hash. Returns its URL."""
+    text = json.dumps(geojson, separators=(",", ":"), ensure_ascii=False)
+    name = hashlib.sha1(text.encode("utf-8")).hexdigest()[:12] + ".geojson"
+    if write_if_changed(Path(asset_dir) / name, text):
+        print(f"  Saved geometry: {name} ({_kb(text)})")
+    return f"{GEO_URL}/{name}"
+
+
+def externalise_geojson(fig: go.Figure, asset_dir: Path) -> go.Figure:
+    """A copy of fig whose traces reference their GeoJSON by URL instead of inline."""
+    if not any(isinstance(getattr(trace, "geojson", None), dict) for trace in fig.data):
+        return fig
+    fig = go.Figure(fig)
+    for trace in fig.data:
+        geojson = getattr(trace, "geojson", None)
+        if isinstance(geojson, dict):
+            # Traces sharing a geometry (a map and its inset) share one file
+            trace.geojson = save_geo_asset(geojson, asset_dir)
+    return fig
+
+
+def referenced_assets(html: str) -> List[str]:
+    """Filenames of the GeoJSON assets a fragment fetches."""
+    return sorted(set(_GEO_REF.findall(html)))
+
+
+def prune_geo_assets(output_dir: Path) -> None:
+    """Delete GeoJSON assets no fragment in output_dir references any more."""
+    asset_dir = Path(output_dir) / GEO_DIR
+    if not asset_dir.is_dir():
+        return
+    used = {
+        name
+        for path in Path(output_dir).glob("*.html")
+        for name in referenced_assets(path.read_text(encoding="utf-8"))
+    }
+    for path in asset_dir.glob("*.geojson"):
+        if path.name not in used:
+            path.unlink()
+            print(f"  Removed unused geometry: {path.name}")
+
+
+# ── Fragments ──────────────────────────────────────────────────────────────────
+
 
 def save_fact_check_html(html: str, path: Path) -> None:
     """Save a fact-check HTML callout to a file for Quarto include.
@@ -24,16 +149,20 @@ def save_fact_check_html(html: str, path: Path) -> None:
         html: HTML string from EvidenceScorer.render_html().
         path: Destination file path.
     """
-    path = Path(path)
-    path.parent.mkdir(parents=True, exist_ok=True)
-    path.write_text(html, encoding="utf-8")
-    print(f"  Saved fact-check: {path.name}")
+    if write_if_changed(path, html):
+        print(f"  Saved fact-check: {Path(path).name}")
+    else:
+        print(f"  Unchanged fact-check: {Path(path).name}")
 
 
 def save_chart_html(
     fig: go.Figure,
     path: Path,
     include_plotlyjs: str | bool = False,
+    webgl_threshold: int = WEBGL_THRESHOLD,
+    compact: bool = COMPACT_EXPORT,
+    geo_assets: bool = GEO_ASSETS,
+    mode: str = CHART_MODE,
 ) -> None:
     """Save a Plotly figure as an HTML fragment (no <html>/<body> wrapper).
 
@@ -42,19 +171,51 @@ def save_chart_html(
         path: Destination file path (should end in .html).
         include_plotlyjs: Passed to plotly write_html. False = assume Plotly.js
             is already loaded on the page (set in _quarto.yml header).
+        webgl_threshold: Scatter point count above which eligible traces are
+            drawn with WebGL (see src.dashboard.webgl). Keep it high: browsers
+            cap live WebGL contexts per page, and the site has 13 charts.
+        compact: Write a compact fragment (src.dashboard.compact) instead of
+            plotly's to_html output. Ignored when include_plotlyjs is set.
+        geo_assets: Write inline GeoJSON to content-hashed files under
+            geo/ beside path, and have the fragment fetch them by URL.
+        mode: "inline" to draw the chart on load, "lazy" to leave it to
+            dashboard/lazy-charts.js. A fragment that brings its own
+            plotly.js (include_plotlyjs) is always inline.
+
+    Raises:
+        ValueError: If mode is not one of CHART_MODES.
     """
+    if mode not in CHART_MODES:
+        raise ValueError(f"Unknown chart mode {mode!r} — expected one of {CHART_MODES}")
     path = Path(path)
-    path.parent.mkdir(parents=True, exist_ok=True)
-    fig.write_html(
-        str(path),
+    fig = use_webgl(fig, threshold=webgl_threshold)
+    if geo_assets:
+        fig = externalise_geojson(fig, path.parent / GEO_DIR)
+    html = fig.to_html(
         full_html=False,
         include_plotlyjs=include_plotlyjs,
-        config={"displayModeBar": False, "responsive": True, "scrollZoom": False},
+        config=CHART_CONFIG,
+        div_id=path.stem,  # unique per page, and stable across builds
     )
-    print(f"  Saved chart: {path.name}")
+    size = _kb(html)
+    if mode == "lazy" and not include_plotlyjs:
+        html = lazy_fragment(fig, div_id=path.stem, config=CHART_CONFIG, compact=compact)
+        size = f"{size} → {_kb(html)}, lazy"
+    elif compact and not include_plotlyjs:
+        html = compact_fragment(fig, div_id=path.stem, config=CHART_CONFIG)
+        size = f"{size} → {_kb(html)}"
+    if write_if_changed(path, html):
+        print(f"  Saved chart: {path.name} ({size})")
+    else:
+        print(f"  Unchanged chart: {path.name} ({size})")
 
 
-def save_all_charts(story_slug: str, figures: dict[str, go.Figure], output_dir: Path) -> None:
+def save_all_charts(
+    story_slug: str,
+    figures: dict[str, go.Figure],
+    output_dir: Path,
+    mode: str = CHART_MODE,
+) -> None:
     """Save all figures for a story to output_dir.
 
     Filenames follow the pattern: {story_slug}_{key}.html
@@ -64,7 +225,8 @@ def save_all_charts(story_slug: str, figures: dict[str, go.Figure], output_dir:
         story_slug: Story identifier string (e.g. 'kiwi-exodus').
         figures: Dict mapping figure key to Figure object.
         output_dir: Directory to save into.
+        mode: "inline" or "lazy" (see save_chart_html).
     """
     for key, fig in figures.items():
         filename = f"{story_slug}_{key}.html"
-        save_chart_html(fig, output_dir / filename)
+        save_chart_html(fig, output_dir / filename, mode=mode)
@@ -0,0 +1,77 @@
+"""
+Lazy chart fragments — charts drawn when they near the viewport, not on load.
+
+An inline fragment runs Plotly.newPlot as soon as the page parses it, so a page
+of 13 charts (three of them maps) draws all 13 before it is usable. A lazy
+fragment is only data: an empty chart div of the chart's height, and its
+figure as a <script type="application/json"> block, which the browser neither
+parses nor runs. Together the fragments on a page form its figure registry.
+
+dashboard/lazy-charts.js, loaded by every page (dashboard/_quarto.yml), is the
+bootstrap: it draws each registered chart as it comes within a screen or so of
+the viewport, and on small screens purges charts that have scrolled far away,
+redrawing them on return, so memory and WebGL contexts stay bounded.
+
+Usage:
+    from src.dashboard.lazy import lazy_fragment
+    html = lazy_fragment(fig, div_id="kiwi-exodus_main", config=CHART_CONFIG)
+"""
+
+from __future__ import annotations
+
+import json
+from typing import Any, Dict
+
+import plotly.graph_objects as go
+
+from src.dashboard.compact import compact_spec, script_json, typed_arrays_supported
+
+# ── Constants ──────────────────────────────────────────────────────────────────
+
+# plotly.js's height for a figure that does not set one; the placeholder
+# reserves it so the page does not shift when the chart is drawn
+DEFAULT_HEIGHT = 450
+
+_FRAGMENT = """\
+<div>
+<div id="{div_id}" class="plotly-graph-div" data-lazy-chart style="height:{height}px; width:{width};"></div>
+<script type="application/json" id="{div_id}-spec">{spec}</script>
+</div>
+"""
+
+
+# ── Fragment ───────────────────────────────────────────────────────────────────
+
+
+def lazy_fragment(
+    fig: go.Figure,
+    div_id: str,
+    config: Dict[str, Any],
+    compact: bool = True,
+) -> str:
+    """An HTML fragment registering fig for dashboard/lazy-charts.js to draw.
+
+    Args:
+        fig: Figure to draw.
+        div_id: id of the chart div; the spec block is "{div_id}-spec".
+        config: plotly.js config.
+        compact: Compact the figure first (src.dashboard.compact).
+    """
+    if compact:
+        data, layout, shared, refs = compact_spec(fig, typed_arrays_supported())
+    else:
+        spec = json.loads(fig.to_json())
+        data, layout, shared, refs = spec.get("data", []), spec.get("layout", {}), [], []
+    width = layout.get("width")
+    return _FRAGMENT.format(
+        div_id=div_id,
+        height=layout.get("height") or DEFAULT_HEIGHT,
+        width=f"{width}px" if width else "100%",
+        spec=script_json({
+            "data": data,
+            "layout": layout,
+            "config": config,
+            "shared": shared,
+            "refs": [list(ref) for ref in refs],
+        }),
+    )
@@ -0,0 +1,146 @@
+"""
+Build manifest — lets build_dashboard skip stories whose inputs have not changed.
+
+For each story the manifest records a fingerprint of everything its charts
+depend on, and the hash of every fragment it wrote and of every GeoJSON asset
+those fragments fetch:
+
+    inputs    SHA-1 of each dataset pkl (the latest release, as DataLoader
+              resolves it) and each other input file the story declares
+    code      SHA-1 of the story module and the shared dashboard modules
+    settings  SHA-1 of the export settings (chart config, WebGL threshold,
+              plotly version, compact export, chart mode)
+
+A story is current when its fingerprint matches and every fragment it wrote is
+still on disk with the recorded content. Current stories are skipped.
+
+Usage:
+    manifest = BuildManifest()
+    fingerprint = story_fingerprint(KiwiExodusStory, loader)
+    if not manifest.is_current("kiwi-exodus", fingerprint, output_dir):
+        ...  # build it
+        manifest.record("kiwi-exodus", fingerprint, output_dir)
+    manifest.save()
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import sys
+from pathlib import Path
+from typing import Dict, List, Type
+
+from src.dashboard.base import BaseStory
+from src.dashboard.data_loader import DataLoader
+from src.dashboard.export import GEO_DIR, export_settings, referenced_assets
+
+# ── Constants ──────────────────────────────────────────────────────────────────
+
+MANIFEST_PATH = (
+    Path(__file__).parent.parent.parent / "data" / "processed" / "build_manifest.json"
+)
+
+# Modules every story's output depends on, besides its own
+_DASHBOARD_DIR = Path(__file__).parent
+SHARED_CODE: List[Path] = [
+    _DASHBOARD_DIR / "base.py",
+    _DASHBOARD_DIR / "compact.py",
+    _DASHBOARD_DIR / "data_loader.py",
+    _DASHBOARD_DIR / "export.py",
+    _DASHBOARD_DIR / "lazy.py",
+    _DASHBOARD_DIR / "subnational.py",
+    _DASHBOARD_DIR / "webgl.py",
+]
+
+
+# ── Fingerprints ───────────────────────────────────────────────────────────────
+
+
+def file_hash(path: Path) -> str:
+    """SHA-1 of a file's bytes, or "missing"."""
+    try:
+        return hashlib.sha1(Path(path).read_bytes()).hexdigest()
+    except FileNotFoundError:
+        return "missing"
+
+
+def _digest(items: Dict[str, str]) -> str:
+    return hashlib.sha1(json.dumps(items, sort_keys=True).encode("utf-8")).hexdigest()
+
+
+def story_fingerprint(story_cls: Type[BaseStory], loader: DataLoader) -> Dict[str, str]:
+    """Hashes of a story's inputs, code and export settings."""
+    inputs = {}
+    for pattern in story_cls.datasets:
+        path = loader.latest_path(pattern)
+        # A new release has a new filename, so hash the name with the content
+        inputs[pattern] = f"{path.name}:{file_hash(path)}" if path else "missing"
+    for path in story_cls.input_files:
+        inputs[Path(path).name] = file_hash(path)
+
+    module = Path(sys.modules[story_cls.__module__].__file__)
+    code = {str(path.name): file_hash(path) for path in [module, *SHARED_CODE]}
+
+    return {
+        "inputs": _digest(inputs),
+        "code": _digest(code),
+        "settings": _digest({k: str(v) for k, v in export_settings().items()}),
+    }
+
+
+def story_outputs(slug: str, output_dir: Path) -> Dict[str, str]:
+    """Hash of every fragment a story has written, and of the assets they fetch."""
+    outputs = {}
+    for path in sorted(Path(output_dir).glob(f"{slug}_*")):
+        outputs[path.name] = file_hash(path)
+        for name in referenced_assets(path.read_text(encoding="utf-8")):
+            outputs[f"{GEO_DIR}/{name}"] = file_hash(Path(output_dir) / GEO_DIR / name)
+    return outputs
+
+
+# ── BuildManifest class ────────────────────────────────────────────────────────
+
+
+class BuildManifest:
+    """Fingerprints and outputs of the last successful build of each story.
+
+    Args:
+        path: JSON file to read and save. A missing or unreadable file is an
+            empty manifest, so every story is rebuilt.
+    """
+
+    def __init__(self, path: Path = MANIFEST_PATH) -> None:
+        self.path = Path(path)
+        try:
+            self._stories: Dict[str, Dict] = json.loads(self.path.read_text(encoding="utf-8"))
+        except (FileNotFoundError, ValueError):
+            self._stories = {}
+
+    def is_current(self, slug: str, fingerprint: Dict[str, str], output_dir: Path) -> bool:
+        """Whether the last build of slug used these inputs and its output is intact."""
+        entry = self._stories.get(slug)
+        return (
+            entry is not None
+            and entry["fingerprint"] == fingerprint
+            and entry["outputs"] == story_outputs(slug, output_dir)
+        )
+
+    def record(self, slug: str, fingerprint: Dict[str, str], output_dir: Path) -> None:
+        """Remember a successful build of slug."""
+        self._stories[slug] = {
+            "fingerprint": fingerprint,
+            "outputs": story_outputs(slug, output_dir),
+        }
+
+    def forget(self, slug: str) -> None:
+        """Drop slug, so the next build rebuilds it."""
+        self._stories.pop(slug, None)
+
+    def save(self) -> None:
+        """Write the manifest atomically."""
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.path.with_name(self.path.name + f".{os.getpid()}.tmp")
+        tmp.write_text(json.dumps(self._stories, indent=2, sort_keys=True) + "\n", encoding="utf-8")
+        os.replace(tmp, self.path)
@@ -0,0 +1,134 @@
+"""
+Pre-compressed static assets — gzip and brotli siblings written at build time.
+
+A static host that finds "x.geojson.gz" or "x.geojson.br" next to "x.geojson"
+can send those bytes as they are (nginx gzip_static / brotli_static, Caddy
+precompressed, most CDNs), instead of compressing every response itself or not
+compressing at all. The build compresses each served asset once, at maximum
+level, with the files compressed in parallel threads (zlib and brotli release
+the GIL while they work).
+
+Each directory gets a manifest, precompressed.json, recording every asset's
+SHA-1 and its size raw and compressed, so a deploy step can check what it is
+serving. An asset whose siblings already match its hash is not compressed
+again. A sibling is only kept when it is smaller than the asset, and siblings
+whose asset is gone are removed.
+
+brotli is optional (pip install brotli); without it only .gz siblings are
+written.
+
+Usage:
+    from src.dashboard.precompress import precompress_dir
+    precompress_dir(output_dir / "geo", "*.geojson")
+"""
+
+from __future__ import annotations
+
+import gzip
+import hashlib
+import json
+import os
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+try:
+    import brotli
+except ImportError:  # optional: gzip siblings only
+    brotli = None
+
+# ── Constants ──────────────────────────────────────────────────────────────────
+
+GZIP_LEVEL = 9
+BROTLI_QUALITY = 11
+MANIFEST_NAME = "precompressed.json"
+ENCODINGS = ("gz", "br")
+
+
+# ── Compression ────────────────────────────────────────────────────────────────
+
+
+def encodings() -> tuple[str, ...]:
+    """The sibling suffixes this environment can write."""
+    return ENCODINGS if brotli is not None else ("gz",)
+
+
+def _compress(data: bytes, encoding: str) -> bytes:
+    if encoding == "gz":
+        # mtime=0 keeps the output byte-identical across builds
+        return gzip.compress(data, compresslevel=GZIP_LEVEL, mtime=0)
+    return brotli.compress(data, quality=BROTLI_QUALITY)
+
+
+def _precompress_file(path: Path, previous: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+    """Write path's siblings unless previous shows they are current. Returns its entry."""
+    data = path.read_bytes()
+    digest = hashlib.sha1(data).hexdigest()
+    siblings = {encoding: path.with_name(f"{path.name}.{encoding}") for encoding in ENCODINGS}
+    if previous and previous["sha1"] == digest and all(
+        siblings[encoding].exists() == (encoding in previous) for encoding in encodings()
+    ):
+        return previous
+
+    entry: Dict[str, Any] = {"sha1": digest, "bytes": len(data)}
+    for encoding, sibling in siblings.items():
+        packed = _compress(data, encoding) if encoding in encodings() else None
+        # A stale sibling would be served in place of the new content
+        if packed is None or len(packed) >= len(data):
+            sibling.unlink(missing_ok=True)
+            continue
+        sibling.write_bytes(packed)
+        entry[encoding] = len(packed)
+    return entry
+
+
+def precompress_dir(
+    directory: Path, pattern: str = "*", workers: Optional[int] = None
+) -> Dict[str, Dict[str, Any]]:
+    """Write compressed siblings of every file in directory matching pattern.
+
+    Args:
+        directory: Directory of served assets.
+        pattern: Glob of the assets to compress; siblings and the manifest
+            are never matched.
+        workers: Threads. Defaults to the CPU count.
+
+    Returns:
+        The manifest written: {file name: {"sha1", "bytes", "gz", "br"}}, sizes in
+        bytes, an encoding missing where it is not written.
+    """
+    directory = Path(directory)
+    if not directory.is_dir():
+        return {}
+    manifest_path = directory / MANIFEST_NAME
+    try:
+        previous = json.loads(manifest_path.read_text(encoding="utf-8"))
+    except (FileNotFoundError, ValueError):
+        previous = {}
+
+    suffixes = tuple(f".{encoding}" for encoding in ENCODINGS)
+    paths = sorted(
+        path for path in directory.glob(pattern)
+        if path.is_file() and path.name != MANIFEST_NAME and not path.name.endswith(suffixes)
+    )
+    with ThreadPoolExecutor(max_workers=workers or os.cpu_count() or 1) as pool:
+        entries = list(pool.map(lambda path: _precompress_file(path, previous.get(path.name)), paths))
+    manifest = {path.name: entry for path, entry in zip(paths, entries)}
+
+    for sibling in directory.iterdir():
+        source = sibling.name.rsplit(".", 1)[0]
+        if sibling.name.endswith(suffixes) and source not in manifest:
+            sibling.unlink()
+
+    text = json.dumps(manifest, indent=1, sort_keys=True) + "\n"
+    if not manifest_path.exists() or manifest_path.read_text(encoding="utf-8") != text:
+        tmp = manifest_path.with_name(manifest_path.name + f".{os.getpid()}.tmp")
+        tmp.write_text(text, encoding="utf-8")
+        os.replace(tmp, manifest_path)
+
+    raw = sum(entry["bytes"] for entry in manifest.values())
+    packed = sum(entry.get("gz", entry["bytes"]) for entry in manifest.values())
+    print(f"  Pre-compressed {len(manifest)} files in {directory.name}/ "
+          f"({raw / 1024:,.0f} KB → {packed / 1024:,.0f} KB gzip"
+          + (")" if brotli is not None else ", brotli not installed)"))
+    return manifest
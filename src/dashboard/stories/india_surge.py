@@ -101,6 +101,8 @@ class IndiaSurgeStory(BaseStory):
 
     title = "India's Rising Share"
     slug = "india-surge"
+    datasets = ["df_citizenship_direction"]
+    input_files = [_SKILL_DATA_PATH]
 
     def get_fact_check(self) -> FactCheck:
         return FactCheck(
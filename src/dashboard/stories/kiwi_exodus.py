@@ -52,6 +52,7 @@ class KiwiExodusStory(BaseStory):
 
     title = "The Kiwi Exodus"
     slug = "kiwi-exodus"
+    datasets = ["df_citizenship_direction", "df_direction_age_sex"]
 
     def get_fact_check(self) -> FactCheck:
         return FactCheck(
@@ -9,7 +9,7 @@ Charts:
     top_inflow       — Bar chart: 10 TAs with highest per-capita net inflow
     auckland_map     — Choropleth: Auckland local board areas, net per 1k population
 
-Data: data/raw/subnational_pop_2018_2025.csv
+Data: data/raw/subnational_pop_2018_2025.csv (via DataLoader.load_subnational)
     Stats NZ subnational population components (year ended 30 June 2018-2025)
     Net international migration: sum of annual flows for years ended June 2023, 2024, 2025
     Population denominator: Stats NZ 2025 provisional estimate
@@ -21,21 +21,23 @@ import json
 import re
 import unicodedata
 from pathlib import Path
-from typing import Dict, Optional, Tuple
+from typing import TYPE_CHECKING, Dict, Optional, Tuple
 
 import pandas as pd
 import plotly.graph_objects as go
 
 from src.dashboard.base import BaseStory, FactCheck, PLOTLY_TEMPLATE
 from src.dashboard.export import save_all_charts
+from src.dashboard.subnational import LOCAL_BOARD, SUBNATIONAL_CSV, TA
+
+if TYPE_CHECKING:
+    from src.dashboard.data_loader import DataLoader
 
 # ── Constants ──────────────────────────────────────────────────────────────────
 
 _GEOJSON_PATH = Path(__file__).parent.parent.parent.parent / "dashboard" / "assets" / "nz_ta.geojson"
 _GEOJSON_ALB_PATH = Path(__file__).parent.parent.parent.parent / "dashboard" / "assets" / "auckland_albs.geojson"
-_RAW_DIR = Path(__file__).parent.parent.parent.parent / "data" / "raw"
 
-_SUBNATIONAL_CSV = "subnational_pop_2018_2025.csv"
 _NET_YEARS = [2023, 2024, 2025]
 
 _DIVERGING_SCALE = [
@@ -76,6 +78,7 @@ class RegionalMapStory(BaseStory):
 
     title = "Where They Land"
     slug = "where-they-land"
+    input_files = [SUBNATIONAL_CSV, _GEOJSON_PATH, _GEOJSON_ALB_PATH]
 
     def get_fact_check(self) -> FactCheck:
         return FactCheck(
@@ -115,45 +118,14 @@ class RegionalMapStory(BaseStory):
     # ── Data loading ───────────────────────────────────────────────────────────
 
     @staticmethod
-    def _load_subnational() -> Tuple[Dict[str, float], Dict[str, float]]:
+    def _load_subnational(loader: "DataLoader") -> Tuple[Dict[str, float], Dict[str, float]]:
         """Load net international migration (sum 2023-2025) and 2025 population by TA.
 
         Returns (net_by_ta, pop_by_ta) — both keyed by _norm_ta(area_name).
         """
-        csv_path = _RAW_DIR / _SUBNATIONAL_CSV
-        if not csv_path.exists():
-            raise FileNotFoundError(
-                f"Expected {csv_path} — download from "
-                "stats.govt.nz/information-releases/subnational-population-estimates-at-30-june-2025/"
-            )
-
-        df = pd.read_csv(csv_path)
-
-        _exclude_areas = {
-            "Total New Zealand by territorial authority",
-            "Area outside territorial authority",
-        }
-        df_ta = df[
-            ~df["Area"].str.contains("local board", case=False, na=False)
-            & ~df["Area"].isin(_exclude_areas)
-        ]
-
-        net_series = (
-            df_ta[
-                (df_ta["Measure"] == "Net international migration")
-                & (df_ta["Year"].isin(_NET_YEARS))
-            ]
-            .groupby("Area")["OBS_VALUE"]
-            .sum()
-        )
-
-        pop_series = (
-            df_ta[
-                (df_ta["Measure"] == "Population")
-                & (df_ta["Year"] == 2025)
-            ]
-            .set_index("Area")["OBS_VALUE"]
-        )
+        table = loader.load_subnational()
+        net_series = table.values(TA, "Net international migration", _NET_YEARS)
+        pop_series = table.values(TA, "Population", [2025])
 
         net_by_ta = {_norm_ta(k): float(v) for k, v in net_series.items()}
         pop_by_ta = {_norm_ta(k): float(v) for k, v in pop_series.items()}
@@ -263,31 +235,13 @@ class RegionalMapStory(BaseStory):
         return fig
 
     @staticmethod
-    def _load_albs() -> pd.DataFrame:
+    def _load_albs(loader: "DataLoader") -> pd.DataFrame:
         """Load Auckland local board area net migration and population from subnational CSV."""
-        csv_path = _RAW_DIR / _SUBNATIONAL_CSV
-        df = pd.read_csv(csv_path)
-        alb_df = df[df["Area"].str.contains("local board area", case=False, na=False)]
-
-        net = (
-            alb_df[
-                (alb_df["Measure"] == "Net international migration")
-                & (alb_df["Year"].isin(_NET_YEARS))
-            ]
-            .groupby("Area")["OBS_VALUE"]
-            .sum()
-            .rename("net")
-        )
-        pop = (
-            alb_df[
-                (alb_df["Measure"] == "Population")
-                & (alb_df["Year"] == 2025)
-            ]
-            .set_index("Area")["OBS_VALUE"]
-            .rename("population")
-        )
+        table = loader.load_subnational()
+        net = table.values(LOCAL_BOARD, "Net international migration", _NET_YEARS).rename("net")
+        pop = table.values(LOCAL_BOARD, "Population", [2025]).rename("population")
         merged = pd.concat([net, pop], axis=1).dropna().reset_index()
-        merged.rename(columns={"Area": "area_name"}, inplace=True)
+        merged.rename(columns={"area": "area_name"}, inplace=True)
         merged["value_per1k"] = merged["net"] / merged["population"] * 1000
         merged["display_name"] = merged["area_name"].str.replace(
             r"\s+local board area$", "", regex=True, case=False
@@ -467,9 +421,9 @@ class RegionalMapStory(BaseStory):
     # ── Public interface ───────────────────────────────────────────────────────
 
     def build_figures(self) -> Dict[str, go.Figure]:
-        net_by_ta, pop_by_ta = self._load_subnational()
+        net_by_ta, pop_by_ta = self._load_subnational(self.loader)
         ta_df = self._build_ta_df(net_by_ta, pop_by_ta)
-        alb_df = self._load_albs()
+        alb_df = self._load_albs(self.loader)
         return {
             "map": self._build_map(ta_df),
             "top_inflow": self._build_top_inflow(ta_df),
@@ -91,6 +91,8 @@ class VisaShiftStory(BaseStory):
 
     title = "The Visa Mix Shift"
     slug = "visa-shift"
+    datasets = ["df_direction_visa", "df_clpr_india_visa", "df_clpr_china_visa"]
+    input_files = [_W1_DATA_PATH]
 
     def get_fact_check(self) -> FactCheck:
         return FactCheck(
@@ -0,0 +1,140 @@
+"""
+Subnational population estimates — one parse of the Stats NZ CSV, shared by all.
+
+The CSV (data/raw/subnational_pop_2018_2025.csv) mixes territorial authorities,
+Auckland local board areas and two aggregate rows in one long table. It is
+parsed once into a frame indexed by (level, area, measure, year), with one
+integer value per row, and the parsed frame is cached in data/processed/ under
+the hash of the CSV, so later builds, and the other build in the same run,
+read the pickle instead. Replacing the CSV changes its hash, and the stale
+cache is removed on the next parse.
+
+Levels:
+    ta           territorial authorities (Auckland included, as one TA)
+    local_board  Auckland local board areas
+    total        the national total row
+    outside      area outside territorial authority
+
+Usage:
+    table = loader.load_subnational()          # via DataLoader, memoised
+    net = table.values("ta", "Net international migration", [2023, 2024, 2025])
+    pop = table.values("local_board", "Population", [2025])
+"""
+
+from __future__ import annotations
+
+import hashlib
+import os
+from pathlib import Path
+from typing import Iterable, Optional
+
+import pandas as pd
+
+# ── Constants ──────────────────────────────────────────────────────────────────
+
+_REPO_ROOT = Path(__file__).parent.parent.parent
+SUBNATIONAL_CSV = _REPO_ROOT / "data" / "raw" / "subnational_pop_2018_2025.csv"
+CACHE_DIR = _REPO_ROOT / "data" / "processed"
+
+TA = "ta"
+LOCAL_BOARD = "local_board"
+TOTAL = "total"
+OUTSIDE = "outside"
+
+_TOTAL_AREA = "Total New Zealand by territorial authority"
+_OUTSIDE_AREA = "Area outside territorial authority"
+_COLUMNS = {"Year": "year", "Area": "area", "Measure": "measure", "OBS_VALUE": "value"}
+
+
+# ── Parsing ────────────────────────────────────────────────────────────────────
+
+
+def parse_subnational(csv_path: Path = SUBNATIONAL_CSV) -> pd.DataFrame:
+    """Parse the CSV into a frame indexed by (level, area, measure, year).
+
+    Raises:
+        FileNotFoundError: If the CSV has not been downloaded.
+    """
+    csv_path = Path(csv_path)
+    if not csv_path.exists():
+        raise FileNotFoundError(
+            f"Expected {csv_path} — download from "
+            "stats.govt.nz/information-releases/subnational-population-estimates-at-30-june-2025/"
+        )
+    df = pd.read_csv(
+        csv_path,
+        usecols=list(_COLUMNS),
+        dtype={"Year": "int16", "Area": "string", "Measure": "string", "OBS_VALUE": "int64"},
+    ).rename(columns=_COLUMNS)
+
+    level = pd.Series(TA, index=df.index)
+    level[df["area"].str.lower().str.endswith("local board area")] = LOCAL_BOARD
+    level[df["area"] == _TOTAL_AREA] = TOTAL
+    level[df["area"] == _OUTSIDE_AREA] = OUTSIDE
+    df["level"] = level
+
+    for column in ("level", "area", "measure"):
+        df[column] = df[column].astype("category")
+    return df.set_index(["level", "area", "measure", "year"]).sort_index()[["value"]]
+
+
+# ── SubnationalTable class ─────────────────────────────────────────────────────
+
+
+class SubnationalTable:
+    """The parsed estimates, with lookups by level, measure and year.
+
+    Args:
+        frame: Output of parse_subnational().
+    """
+
+    def __init__(self, frame: pd.DataFrame) -> None:
+        self.frame = frame
+
+    def values(self, level: str, measure: str, years: Iterable[int]) -> pd.Series:
+        """measure summed over years for every area of level, indexed by area name."""
+        years = list(years)
+        rows = self.frame.xs((level, measure), level=("level", "measure"))
+        rows = rows[rows.index.get_level_values("year").isin(years)]
+        series = rows["value"].groupby(level="area", observed=True).sum()
+        series.index = series.index.astype(str)
+        return series
+
+    def areas(self, level: str) -> list[str]:
+        """Names of every area of level."""
+        rows = self.frame.xs(level, level="level")
+        return sorted(rows.index.get_level_values("area").unique().astype(str))
+
+
+# ── Disk cache ─────────────────────────────────────────────────────────────────
+
+
+def load_subnational(
+    csv_path: Path = SUBNATIONAL_CSV,
+    cache_dir: Optional[Path] = CACHE_DIR,
+) -> SubnationalTable:
+    """The parsed CSV, from the cache when it matches the CSV's hash.
+
+    Args:
+        csv_path: Source CSV.
+        cache_dir: Where parsed frames are cached, or None to always parse.
+    """
+    csv_path = Path(csv_path)
+    if cache_dir is None or not csv_path.exists():
+        return SubnationalTable(parse_subnational(csv_path))
+
+    digest = hashlib.sha1(csv_path.read_bytes()).hexdigest()[:12]
+    cache = Path(cache_dir) / f"subnational_{digest}.pkl"
+    if cache.exists():
+        return SubnationalTable(pd.read_pickle(cache))
+
+    frame = parse_subnational(csv_path)
+    cache.parent.mkdir(parents=True, exist_ok=True)
+    tmp = cache.with_name(cache.name + f".{os.getpid()}.tmp")
+    frame.to_pickle(tmp)
+    os.replace(tmp, cache)
+    for stale in cache.parent.glob("subnational_*.pkl"):
+        if stale != cache:
+            stale.unlink(missing_ok=True)
+    print(f"  Parsed {csv_path.name}  ({len(frame):,} rows, cached)")
+    return SubnationalTable(frame)
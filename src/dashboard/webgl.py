@@ -0,0 +1,116 @@
+"""
+WebGL trace selection — swaps large SVG Scatter traces for Scattergl.
+
+SVG draws one DOM node per marker and line segment, so figures with tens of
+thousands of points (the TA-level region breakdown is 67 series x 300+ months)
+stall low-end clients. Scattergl draws the same traces on a single canvas.
+
+A trace is only swapped when Scattergl can express every attribute it sets.
+Anything that needs SVG (stackgroup, fillpattern, spline lines, ...) keeps its
+whole subplot on SVG, so draw order between traces never changes.
+
+Usage:
+    from src.dashboard.webgl import use_webgl
+    fig = use_webgl(fig)
+    fig = use_webgl(fig, threshold=500)
+"""
+
+from __future__ import annotations
+
+from collections import defaultdict
+from typing import Any, Dict, List, Optional, Set
+
+import plotly.graph_objects as go
+
+# ── Constants ──────────────────────────────────────────────────────────────────
+
+# Total Scatter points in a figure above which WebGL is used. Below this SVG is
+# fast enough and renders text and hover slightly more crisply.
+WEBGL_THRESHOLD = 2000
+
+# Scatter attributes Scattergl does not have but which change nothing when
+# dropped: GL traces are always clipped, and orientation only matters to stacks.
+_IGNORABLE = {"cliponaxis", "orientation"}
+
+
+# ── Helpers ────────────────────────────────────────────────────────────────────
+
+
+def _paths(spec: Dict[str, Any], prefix: str = "") -> Set[str]:
+    """Flatten a trace spec to the set of dotted attribute paths it sets."""
+    out: Set[str] = set()
+    for key, value in spec.items():
+        path = prefix + key
+        if isinstance(value, dict):
+            out |= _paths(value, path + ".")
+        else:
+            out.add(path)
+    return out
+
+
+def _point_count(trace: Any) -> int:
+    """Number of points drawn by a Scatter trace."""
+    for attr in ("x", "y"):
+        values = getattr(trace, attr, None)
+        if values is not None:
+            return len(values)
+    return 0
+
+
+def _to_gl(trace: Any) -> Optional[go.Scattergl]:
+    """Return a Scattergl equivalent of trace, or None if styling would change."""
+    if trace.type != "scatter":
+        return None
+    spec = trace.to_plotly_json()
+    spec.pop("type", None)
+    for key in _IGNORABLE:
+        spec.pop(key, None)
+    gl = go.Scattergl(spec, skip_invalid=True)
+    # skip_invalid silently drops anything GL cannot express, including
+    # unsupported values such as line.shape="spline" — any drop means SVG.
+    gl_spec = gl.to_plotly_json()
+    gl_spec.pop("type", None)
+    if _paths(gl_spec) != _paths(spec):
+        return None
+    return gl
+
+
+# ── Public interface ───────────────────────────────────────────────────────────
+
+
+def use_webgl(fig: go.Figure, threshold: int = WEBGL_THRESHOLD) -> go.Figure:
+    """Return fig with eligible Scatter traces drawn as Scattergl.
+
+    Nothing changes when the figure's Scatter traces hold `threshold` points or
+    fewer in total. Above it, each subplot is converted only if every trace on
+    it has an exact Scattergl equivalent.
+
+    Args:
+        fig: Plotly Figure object. Not modified.
+        threshold: Total Scatter point count above which WebGL is used.
+
+    Returns:
+        A new Figure if any trace was converted, otherwise fig itself.
+    """
+    scatter = [t for t in fig.data if t.type == "scatter"]
+    if sum(_point_count(t) for t in scatter) <= threshold:
+        return fig
+
+    by_subplot: Dict[tuple, List[int]] = defaultdict(list)
+    for i, trace in enumerate(fig.data):
+        subplot = (getattr(trace, "xaxis", None), getattr(trace, "yaxis", None))
+        by_subplot[subplot].append(i)
+
+    data = list(fig.data)
+    changed = False
+    for indices in by_subplot.values():
+        converted = [_to_gl(data[i]) for i in indices]
+        if any(gl is None for gl in converted):
+            continue
+        for i, gl in zip(indices, converted):
+            data[i] = gl
+        changed = True
+
+    if not changed:
+        return fig
+    return go.Figure(data=data, layout=fig.layout)
@@ -0,0 +1,199 @@
+"""
+Build the transform cube: every time-series transform of every series, precomputed.
+
+The app's time-series tab offers a fixed set of transforms (moving averages,
+moving sums, cumulative from a base year). They depend only on the series'
+own rows, so they are computed once per release here rather than on every
+request. Cumulative sums are stored from the start of each series, so the
+cumulative transform for any base year is a subtraction.
+
+Cube rows align one-to-one with the rows of the release's DataFrame (as read by
+the app's catalog, RangeIndex), so the app slices them with the index of its
+filtered selection.
+
+Input:  data/interim/df_*_{date}.pkl  (latest release of each app breakdown)
+Output: data/processed/cube/df_*_{date}.parquet
+
+Schema:
+    Month    datetime64[ns]  alignment check against the source frame
+    cum0     float64         running sum of Count from the series start, NaN as 0
+    ma3      float64         3-month moving average
+    ma12     float64         12-month moving average
+    ms3      float64         3-month moving sum
+    ms12     float64         12-month moving sum
+
+Usage:
+    python src/features/transform_cube.py
+"""
+
+from __future__ import annotations
+
+import hashlib
+import sys
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+import pandas as pd
+
+# ── Constants ──────────────────────────────────────────────────────────────────
+
+CUBE_DIR = Path(__file__).parent.parent.parent / "data" / "processed" / "cube"
+
+TRANSFORMS = [
+    "None",
+    "Cumulative from base year",
+    "3-month moving average",
+    "12-month moving average",
+    "3-month moving sum",
+    "12-month moving sum",
+]
+
+# transform -> (cube column, window, rolling aggregation)
+ROLLING: Dict[str, Tuple[str, int, str]] = {
+    "3-month moving average": ("ma3", 3, "mean"),
+    "12-month moving average": ("ma12", 12, "mean"),
+    "3-month moving sum": ("ms3", 3, "sum"),
+    "12-month moving sum": ("ms12", 12, "sum"),
+}
+
+
+# ── Helpers ────────────────────────────────────────────────────────────────────
+
+
+def axis_label(transform: str, base_year=None) -> str:
+    """Y-axis title for a transform."""
+    if transform == "None":
+        return "Count"
+    if transform == "Cumulative from base year":
+        return f"Cumulative count (from {int(base_year)})"
+    return transform
+
+
+def series_columns(df: pd.DataFrame) -> List[str]:
+    """Columns that identify a series: everything except Month and numbers."""
+    return [
+        col for col in df.columns
+        if col != "Month" and not pd.api.types.is_numeric_dtype(df[col])
+    ]
+
+
+def source_hash(path: Path) -> str:
+    """SHA-1 of the source pkl, stored in the cube to detect a stale build."""
+    return hashlib.sha1(Path(path).read_bytes()).hexdigest()
+
+
+def cube_path(data_path: Path) -> Path:
+    """Where the cube of a release lives."""
+    return CUBE_DIR / (Path(data_path).stem + ".parquet")
+
+
+# ── Build ──────────────────────────────────────────────────────────────────────
+
+
+def build_cube(df: pd.DataFrame) -> pd.DataFrame:
+    """Compute every transform column for every series of df, in df's row order.
+
+    Rolling windows run over each series' rows in Month order, the same rows
+    and order the app's inline transform uses, so results are identical.
+    """
+    keys = series_columns(df)
+    ordered = df.sort_values(keys + ["Month"], kind="mergesort")
+    by_series = [ordered[k] for k in keys]
+
+    cube = pd.DataFrame({"Month": ordered["Month"]}, index=ordered.index)
+    cube["cum0"] = ordered["Count"].fillna(0).groupby(by_series, sort=False).cumsum()
+    counts = ordered.groupby(keys, sort=False)["Count"]
+    for column, window, agg in ROLLING.values():
+        cube[column] = counts.transform(
+            lambda s: getattr(s.rolling(window, min_periods=1), agg)()
+        )
+    return cube.sort_index()
+
+
+def write_cube(data_path: Path) -> Path:
+    """Build and save the cube for one release pkl."""
+    df = pd.read_pickle(data_path).reset_index(drop=True)
+    df["Month"] = pd.to_datetime(df["Month"])
+    cube = build_cube(df)
+    cube.attrs["source_sha1"] = source_hash(data_path)
+
+    out = cube_path(data_path)
+    out.parent.mkdir(parents=True, exist_ok=True)
+    tmp = out.with_name(out.name + ".tmp")
+    cube.to_parquet(tmp, index=False, compression="zstd")
+    tmp.replace(out)
+    return out
+
+
+def cube_is_current(data_path: Path) -> bool:
+    """Whether the saved cube of a release was built from the pkl as it is now."""
+    path = cube_path(data_path)
+    if not path.exists():
+        return False
+    # The attrs come back with any column, so read the smallest one
+    saved = pd.read_parquet(path, columns=["Month"]).attrs.get("source_sha1")
+    return saved == source_hash(data_path)
+
+
+def load_cube(data_path: Path, df: pd.DataFrame) -> Optional[pd.DataFrame]:
+    """Return the cube for a release, or None if missing or built from other data."""
+    path = cube_path(data_path)
+    if not path.exists():
+        return None
+    cube = pd.read_parquet(path)
+    if (
+        cube.attrs.get("source_sha1") != source_hash(data_path)
+        or len(cube) != len(df)
+        or not cube["Month"].equals(df["Month"])
+    ):
+        print(f"  Stale cube {path.name} ignored", file=sys.stderr)
+        return None
+    return cube
+
+
+# ── Slice ──────────────────────────────────────────────────────────────────────
+
+
+def cube_transform(
+    cube: pd.DataFrame, df: pd.DataFrame, transform: str, base_year=None
+) -> Tuple[pd.DataFrame, str]:
+    """Apply a transform to labelled rows of a release by slicing its cube.
+
+    Same result as the app's inline transform: df must carry a Label column
+    with one label per series, and an index into the release frame.
+    """
+    df = df.sort_values(["Label", "Month"]).copy()
+    if transform == "Cumulative from base year":
+        df = df[df["Month"].dt.year >= int(base_year)]
+        running = cube["cum0"].to_numpy()[df.index]
+        # Running total just before the base year, per series
+        offset = pd.Series(running - df["Count"].fillna(0).to_numpy(), index=df.index)
+        offset = offset.groupby(df["Label"]).transform("first")
+        df["Count"] = (running - offset).where(df["Count"].notna())
+    elif transform in ROLLING:
+        df["Count"] = cube[ROLLING[transform][0]].to_numpy()[df.index]
+    return df, axis_label(transform, base_year)
+
+
+# ── Entry point ──
+
+
+def main() -> None:
+    """Build cubes for the latest release of every app breakdown, unless current."""
+    sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+    from src.visualization.catalog import DATASET_PATTERNS, latest_release
+
+    for pattern in DATASET_PATTERNS.values():
+        path = latest_release(pattern, settle=0)
+        if path is None:
+            print(f"  No file matching {pattern} — skipped", file=sys.stderr)
+            continue
+        if cube_is_current(path):
+            print(f"  Current cube: {cube_path(path).name}")
+            continue
+        out = write_cube(path)
+        print(f"  Saved cube: {out.name} ({out.stat().st_size / 1024:.0f} KB)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,119 @@
+"""
+Hidden admin view of the Streamlit app: where time and memory go in production.
+
+Shown instead of the dashboard when the page is opened with ?admin=<token> and
+the token matches APP_ADMIN_TOKEN. With APP_ADMIN_TOKEN unset the view does
+not exist. Stage timings need APP_TELEMETRY=1 (src/visualization/telemetry.py);
+cache, memory and dataset figures are always available.
+
+Usage:
+    if is_admin(st.query_params):
+        render_admin(shared_telemetry(), shared_result_cache(), shared_dataset_store())
+        st.stop()
+"""
+
+from __future__ import annotations
+
+import hmac
+import os
+from datetime import datetime
+from typing import Mapping
+
+import pandas as pd
+import streamlit as st
+
+from src.visualization.catalog import DatasetStore
+from src.visualization.result_cache import ResultCache
+from src.visualization.telemetry import Telemetry
+
+# ── Constants ──────────────────────────────────────────────────────────────────
+
+ADMIN_TOKEN = os.environ.get("APP_ADMIN_TOKEN", "")
+SLOWEST_SHOWN = 10
+
+_MIB = 1024 * 1024
+
+
+# ── Access ─────────────────────────────────────────────────────────────────────
+
+
+def is_admin(query_params: Mapping[str, str]) -> bool:
+    """Whether the request carries the admin token."""
+    if not ADMIN_TOKEN:
+        return False
+    return hmac.compare_digest(query_params.get("admin", ""), ADMIN_TOKEN)
+
+
+# ── View ───────────────────────────────────────────────────────────────────────
+
+
+def render_admin(telemetry: Telemetry, results: ResultCache, store: DatasetStore) -> None:
+    """Draw the telemetry, cache, memory and dataset panels."""
+    import psutil  # imported here: only the admin view reads process memory
+
+    st.title("App telemetry")
+
+    # Memory and cache
+    stats = results.stats()
+    col1, col2, col3, col4 = st.columns(4)
+    col1.metric("Resident memory", f"{psutil.Process().memory_info().rss / _MIB:.0f} MiB")
+    col2.metric("Datasets", f"{store.nbytes / _MIB:.0f} MiB")
+    col3.metric(
+        "Result cache",
+        f"{stats['nbytes'] / _MIB:.1f} / {stats['max_bytes'] / _MIB:.0f} MiB",
+    )
+    col4.metric(
+        "Cache hit ratio",
+        "–" if stats["hit_ratio"] is None else f"{stats['hit_ratio']:.0%}",
+    )
+    st.caption(
+        f"{stats['entries']} cached results, {stats['hits']} hits, "
+        f"{stats['misses']} misses, {stats['evictions']} evicted"
+    )
+
+    # Datasets
+    st.subheader("Datasets")
+    datasets = [
+        {
+            "breakdown": d.breakdown,
+            "release": d.release,
+            "rows": len(d.frame),
+            "frame_mib": d.frame.memory_usage(deep=True).sum() / _MIB,
+            "cube_mib": 0.0 if d.cube is None else d.cube.memory_usage(deep=True).sum() / _MIB,
+        }
+        for d in store.datasets.values()
+    ]
+    if datasets:
+        st.dataframe(pd.DataFrame(datasets).round(2), hide_index=True)
+    else:
+        st.write("No dataset loaded yet.")
+
+    if not telemetry.enabled:
+        st.info("Stage timings are off. Set APP_TELEMETRY=1 to record them.")
+        return
+
+    # Stages
+    st.subheader("Stages")
+    stages = telemetry.stage_stats()
+    if stages:
+        st.dataframe(pd.DataFrame(stages).round(1), hide_index=True)
+    else:
+        st.write("No interactions recorded yet.")
+
+    # Slowest interactions
+    st.subheader("Slowest recent interactions")
+    slowest = [
+        {
+            "finished": datetime.fromtimestamp(i.finished).strftime("%H:%M:%S"),
+            "breakdown": i.label,
+            "total_ms": i.seconds * 1000,
+            **{f"{name}_ms": seconds * 1000 for name, seconds in i.stages.items()},
+        }
+        for i in telemetry.slowest(SLOWEST_SHOWN)
+    ]
+    if slowest:
+        st.dataframe(pd.DataFrame(slowest).round(1), hide_index=True)
+
+    if st.button("Reset timings"):
+        telemetry.reset()
+        st.rerun()
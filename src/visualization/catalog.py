@@ -0,0 +1,254 @@
+"""
+Dataset catalog for the Streamlit app, with background hot reload.
+
+Each breakdown maps to a filename pattern in data/interim; the latest matching
+pkl is that breakdown's current release. A watcher thread polls the catalog and,
+when a new release appears, builds the Dataset (frame plus option indexes) off
+the request path and swaps it in with a single reference assignment. Sessions
+mid-rerun keep the frame they already hold; the next rerun sees the new one.
+Swap callbacks then evict caches belonging to the previous release, so memory
+holds one vintage per breakdown.
+
+A pkl is only treated as a release once its mtime is SETTLE_SECONDS old, and a
+release that fails to unpickle (e.g. still being written) is retried on a later
+poll rather than replacing good data.
+
+Usage:
+    store = shared_dataset_store()
+    store.on_swap(lambda old, new: print(old.release, "->", new.release))
+    store.start_watcher()
+    dataset = store.get("Direction, Visa")
+"""
+
+from __future__ import annotations
+
+import sys
+import threading
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from src.features.transform_cube import load_cube
+
+# ── Constants ──────────────────────────────────────────────────────────────────
+
+INTERIM_DIR = Path(__file__).parent.parent.parent / "data" / "interim"
+
+DATASET_PATTERNS: Dict[str, str] = {
+    "Direction, Citizenship": "df_citizenship_direction_*.pkl",
+    "Direction, Age, Sex": "df_direction_age_sex_*.pkl",
+    "Direction, Visa": "df_direction_visa_*.pkl",
+    "Citizenship, Visa": "df_citizenship_visa_*.pkl",
+    "Direction, Region, Citizenship": "df_direction_region_*.pkl",
+}
+
+POLL_SECONDS = 60
+SETTLE_SECONDS = 10  # a pkl modified more recently than this may be mid-write
+
+
+# ── Dataset ────────────────────────────────────────────────────────────────────
+
+
+@dataclass(frozen=True)
+class Dataset:
+    """One release of one breakdown, ready to serve.
+
+    Attributes:
+        breakdown: Key of DATASET_PATTERNS.
+        path: Source pkl.
+        frame: Data with Month parsed to datetime.
+        options: Unique values of every non-numeric, non-Month column, in
+            order of first appearance (as Series.unique() returns them).
+        cube: Precomputed transforms (src/features/transform_cube.py), row-aligned
+            with frame, or None if no current cube was built for this release.
+    """
+
+    breakdown: str
+    path: Path
+    frame: pd.DataFrame
+    options: Dict[str, np.ndarray] = field(default_factory=dict)
+    cube: Optional[pd.DataFrame] = None
+
+    @property
+    def release(self) -> str:
+        """The pkl filename, which carries the release date."""
+        return self.path.name
+
+
+def load_dataset(breakdown: str, path: Path) -> Dataset:
+    """Read a release, build its option indexes and attach its transform cube."""
+    df = pd.read_pickle(path).reset_index(drop=True)  # labels == row positions
+    df["Month"] = pd.to_datetime(df["Month"])
+    options = {
+        col: df[col].unique()
+        for col in df.columns
+        if col != "Month" and not pd.api.types.is_numeric_dtype(df[col])
+    }
+    return Dataset(
+        breakdown=breakdown,
+        path=Path(path),
+        frame=df,
+        options=options,
+        cube=load_cube(path, df),
+    )
+
+
+def latest_release(pattern: str, settle: float = SETTLE_SECONDS) -> Optional[Path]:
+    """Return the newest settled pkl matching pattern in INTERIM_DIR, or None."""
+    cutoff = time.time() - settle
+    files = sorted(INTERIM_DIR.glob(pattern))
+    for path in reversed(files):
+        try:
+            if path.stat().st_mtime <= cutoff:
+                return path
+        except FileNotFoundError:
+            continue  # removed between glob and stat
+    return None
+
+
+# ── DatasetStore class ─────────────────────────────────────────────────────────
+
+
+class DatasetStore:
+    """Holds the current Dataset of every breakdown and reloads new releases.
+
+    Args:
+        patterns: Breakdown name -> filename pattern in INTERIM_DIR.
+        settle: Minimum age in seconds of a pkl before it is loaded.
+    """
+
+    def __init__(
+        self,
+        patterns: Dict[str, str] = DATASET_PATTERNS,
+        settle: float = SETTLE_SECONDS,
+    ) -> None:
+        self.patterns = patterns
+        self.settle = settle
+        self._datasets: Dict[str, Dataset] = {}
+        self._failed: Dict[Path, float] = {}  # path -> mtime that failed to load
+        self._callbacks: List[Callable[[Dataset, Dataset], None]] = []
+        self._lock = threading.Lock()
+        self._watcher: Optional[threading.Thread] = None
+
+    # ── Private helpers ────────────────────────────────────────────────────────
+
+    def _load(self, breakdown: str, path: Path) -> Optional[Dataset]:
+        """Load path, or return None and remember the failure until it changes."""
+        try:
+            mtime = path.stat().st_mtime
+        except FileNotFoundError:
+            return None
+        if self._failed.get(path) == mtime:
+            return None
+        try:
+            return load_dataset(breakdown, path)
+        except Exception as exc:
+            self._failed[path] = mtime
+            print(f"  Could not load {path.name}: {exc}", file=sys.stderr)
+            return None
+
+    def _swap(self, new: Dataset) -> None:
+        """Publish new and run the swap callbacks against the release it replaces."""
+        with self._lock:
+            old = self._datasets.get(new.breakdown)
+            self._datasets[new.breakdown] = new
+        if old is None:
+            return
+        print(f"  Swapped {new.breakdown}: {old.release} -> {new.release}")
+        for callback in self._callbacks:
+            try:
+                callback(old, new)
+            except Exception as exc:
+                print(f"  Swap callback failed: {exc}", file=sys.stderr)
+
+    # ── Public interface ───────────────────────────────────────────────────────
+
+    def get(self, breakdown: str) -> Dataset:
+        """Return the current Dataset for breakdown, loading it on first use.
+
+        On first use a settled release is preferred, but the newest file is
+        accepted if nothing has settled yet, so a fresh checkout still starts.
+        """
+        dataset = self._datasets.get(breakdown)
+        if dataset is not None:
+            return dataset
+        pattern = self.patterns[breakdown]
+        path = latest_release(pattern, self.settle) or latest_release(pattern, 0)
+        if path is None:
+            raise FileNotFoundError(
+                f"No interim data files found matching: {INTERIM_DIR / pattern}"
+            )
+        dataset = load_dataset(breakdown, path)
+        with self._lock:
+            # Another thread may have won the race; keep whichever landed first
+            return self._datasets.setdefault(breakdown, dataset)
+
+    def refresh(self) -> List[str]:
+        """Load and swap in any new settled release. Returns the breakdowns swapped.
+
+        Only breakdowns that have already been served are reloaded; the rest
+        are loaded lazily by get().
+        """
+        swapped = []
+        for breakdown, current in list(self._datasets.items()):
+            path = latest_release(self.patterns[breakdown], self.settle)
+            if path is None or path == current.path:
+                continue
+            dataset = self._load(breakdown, path)
+            if dataset is not None:
+                self._swap(dataset)
+                swapped.append(breakdown)
+        return swapped
+
+    def on_swap(self, callback: Callable[[Dataset, Dataset], None]) -> None:
+        """Call callback(old, new) after each release is swapped in."""
+        self._callbacks.append(callback)
+
+    def start_watcher(self, interval: float = POLL_SECONDS) -> None:
+        """Poll for new releases every interval seconds in a daemon thread."""
+        if self._watcher is not None:
+            return
+
+        def watch() -> None:
+            while True:
+                time.sleep(interval)
+                try:
+                    self.refresh()
+                except Exception as exc:
+                    print(f"  Dataset refresh failed: {exc}", file=sys.stderr)
+
+        self._watcher = threading.Thread(target=watch, name="dataset-watcher", daemon=True)
+        self._watcher.start()
+
+    @property
+    def nbytes(self) -> int:
+        """Memory held by the loaded frames and cubes, in bytes."""
+        return sum(
+            int(d.frame.memory_usage(deep=True).sum())
+            + (int(d.cube.memory_usage(deep=True).sum()) if d.cube is not None else 0)
+            for d in list(self._datasets.values())
+        )
+
+    @property
+    def datasets(self) -> Dict[str, Dataset]:
+        """Snapshot of the currently loaded datasets by breakdown."""
+        return dict(self._datasets)
+
+
+# ── Shared instance ────────────────────────────────────────────────────────────
+
+_shared: Optional[DatasetStore] = None
+_shared_lock = threading.Lock()
+
+
+def shared_dataset_store() -> DatasetStore:
+    """Return the process-wide DatasetStore."""
+    global _shared
+    with _shared_lock:
+        if _shared is None:
+            _shared = DatasetStore()
+        return _shared
@@ -0,0 +1,317 @@
+"""
+Compute pool — runs the app's heavy aggregations in worker processes.
+
+Streamlit runs every session's script in a thread of one process, so the
+pivot tables, treemap groupbys and rolling transforms of concurrent users
+serialise on the GIL. With APP_COMPUTE_WORKERS set, those jobs run in a pool
+of spawned processes instead, and the script thread waits for the result
+with the GIL released.
+
+Datasets are published to the workers once per release through shared
+memory: numeric and datetime columns as raw arrays, text columns as integer
+codes plus a small table of distinct values. A job request carries only the
+row positions of the selection, never the data. Workers rebuild just the
+rows they need.
+
+With APP_COMPUTE_WORKERS unset or 0 the same jobs run inline on the
+script thread, so there is one code path either way. Job results feed the
+figures and exports, which are cached by the app's ResultCache.
+
+Usage:
+    pool = shared_compute_pool()
+    pivot_df = pool.run(pivot_sum, dataset, filtered_df, "Visa")
+"""
+
+from __future__ import annotations
+
+import atexit
+import multiprocessing
+import os
+import sys
+import threading
+import types
+from contextlib import contextmanager
+from dataclasses import dataclass
+from multiprocessing.pool import Pool
+from multiprocessing.shared_memory import SharedMemory
+from typing import Any, Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+from src.features.transform_cube import TRANSFORMS
+
+# ── Constants ──────────────────────────────────────────────────────────────────
+
+COMPUTE_WORKERS = int(os.environ.get("APP_COMPUTE_WORKERS", "0"))
+MAX_ATTACHED = 8  # shared frames a worker keeps mapped; one per live release
+JOB_TIMEOUT = 120  # seconds; a lost worker must not hang the session for good
+
+
+# ── Jobs ───────────────────────────────────────────────────────────────────────
+# Module-level so they pickle by reference. Each takes the selected rows as a
+# DataFrame first, then its own arguments.
+
+
+def apply_transform(df, transform, base_year=None):
+    """Apply a time series transform to the filtered dataframe.
+
+    Operates per-series (grouped by Label column). Returns the transformed
+    dataframe and a y-axis label string.
+    """
+    df = df.sort_values(["Label", "Month"]).copy()
+    if transform == "None":
+        return df, "Count"
+    elif transform == "Cumulative from base year":
+        df = df[df["Month"].dt.year >= int(base_year)]
+        df["Count"] = df.groupby("Label")["Count"].cumsum()
+        return df, f"Cumulative count (from {int(base_year)})"
+    elif transform == "3-month moving average":
+        df["Count"] = df.groupby("Label")["Count"].transform(
+            lambda s: s.rolling(3, min_periods=1).mean()
+        )
+        return df, "3-month moving average"
+    elif transform == "12-month moving average":
+        df["Count"] = df.groupby("Label")["Count"].transform(
+            lambda s: s.rolling(12, min_periods=1).mean()
+        )
+        return df, "12-month moving average"
+    elif transform == "3-month moving sum":
+        df["Count"] = df.groupby("Label")["Count"].transform(
+            lambda s: s.rolling(3, min_periods=1).sum()
+        )
+        return df, "3-month moving sum"
+    elif transform == "12-month moving sum":
+        df["Count"] = df.groupby("Label")["Count"].transform(
+            lambda s: s.rolling(12, min_periods=1).sum()
+        )
+        return df, "12-month moving sum"
+
+
+def add_label(df: pd.DataFrame, label_columns: Sequence[str]) -> pd.DataFrame:
+    """Return a copy of df with a Label column joining label_columns with ", "."""
+    df = df.copy()
+    first, *rest = label_columns
+    df["Label"] = df[first].astype(str).str.cat(
+        [df[col].astype(str) for col in rest], sep=", "
+    )
+    return df
+
+
+def labelled_transform(
+    df: pd.DataFrame, label_columns: Sequence[str], transform: str, base_year=None
+) -> Tuple[pd.DataFrame, str]:
+    """Label each series, then transform it."""
+    return apply_transform(add_label(df, label_columns), transform, base_year)
+
+
+def pivot_sum(df: pd.DataFrame, columns: str) -> pd.DataFrame:
+    """Month x columns table of summed Count, with gaps filled by 0."""
+    return df.pivot_table(
+        index="Month", columns=columns, values="Count", aggfunc="sum"
+    ).fillna(0)
+
+
+def group_sum(df: pd.DataFrame, by) -> pd.DataFrame:
+    """Summed Count per group, with the group keys as columns."""
+    return df.groupby(by, as_index=False)["Count"].sum()
+
+
+# ── Shared-memory datasets ─────────────────────────────────────────────────────
+
+
+@dataclass(frozen=True)
+class SharedColumn:
+    """One column of a shared frame: a segment plus how to read it back."""
+
+    name: str
+    segment: str
+    dtype: str
+    values: Optional[np.ndarray] = None  # distinct values, for coded text columns
+
+
+@dataclass(frozen=True)
+class SharedFrame:
+    """Picklable handle to a DataFrame published in shared memory."""
+
+    key: str
+    length: int
+    columns: Tuple[SharedColumn, ...]
+
+
+def share_frame(key: str, df: pd.DataFrame) -> Tuple[SharedFrame, List[SharedMemory]]:
+    """Copy df into shared memory.
+
+    Returns:
+        The handle to send to workers, and the segments, which the caller must
+        keep open and eventually close() and unlink().
+    """
+    columns, segments = [], []
+    for name in df.columns:
+        series = df[name]
+        values = None
+        if pd.api.types.is_datetime64_dtype(series):
+            array = series.to_numpy(dtype="datetime64[ns]")
+        elif pd.api.types.is_numeric_dtype(series):
+            array = series.to_numpy()
+        else:
+            codes, uniques = pd.factorize(series, use_na_sentinel=False)
+            array = codes.astype(np.int32)
+            values = np.asarray(uniques, dtype=object)
+        segment = SharedMemory(create=True, size=max(array.nbytes, 1))
+        np.ndarray(array.shape, dtype=array.dtype, buffer=segment.buf)[:] = array
+        segments.append(segment)
+        columns.append(SharedColumn(name, segment.name, array.dtype.str, values))
+    return SharedFrame(key, len(df), tuple(columns)), segments
+
+
+# Worker-side: the frames attached so far, by SharedFrame.key
+_attached: Dict[str, Tuple[SharedFrame, List[SharedMemory], Dict[str, np.ndarray]]] = {}
+
+
+def _detach(key: str) -> None:
+    """Drop a worker's mapping of a shared frame, oldest release first."""
+    _, segments, arrays = _attached.pop(key)
+    arrays.clear()  # views into the buffers must go before close()
+    for segment in segments:
+        try:
+            segment.close()
+        except BufferError:
+            pass  # a job result still references it; freed at worker exit
+
+
+def _select(handle: SharedFrame, rows: np.ndarray) -> pd.DataFrame:
+    """Rebuild the given rows of a shared frame in a worker."""
+    if handle.key not in _attached:
+        if len(_attached) >= MAX_ATTACHED:
+            _detach(next(iter(_attached)))
+        segments, arrays = [], {}
+        for col in handle.columns:
+            # Spawned workers share the app's resource tracker, so attaching
+            # here does not make the segment outlive or die with the worker
+            segment = SharedMemory(name=col.segment)
+            segments.append(segment)
+            arrays[col.name] = np.ndarray(
+                (handle.length,), dtype=np.dtype(col.dtype), buffer=segment.buf
+            )
+        _attached[handle.key] = (handle, segments, arrays)
+    _, _, arrays = _attached[handle.key]
+
+    data = {}
+    for col in handle.columns:
+        taken = arrays[col.name][rows]
+        data[col.name] = col.values[taken] if col.values is not None else taken
+    return pd.DataFrame(data, index=rows)
+
+
+def _run_job(job: Callable, handle: SharedFrame, rows: np.ndarray, args: tuple) -> Any:
+    """Worker entry point: select the rows, then run the job on them."""
+    return job(_select(handle, rows), *args)
+
+
+@contextmanager
+def _neutral_main() -> Iterator[None]:
+    """Hide the __main__ module while worker processes start.
+
+    Spawned children re-import the parent's __main__, and under Streamlit that
+    is the app script, which would then run inside every worker.
+    """
+    main = sys.modules["__main__"]
+    sys.modules["__main__"] = types.ModuleType("__main__")
+    try:
+        yield
+    finally:
+        sys.modules["__main__"] = main
+
+
+# ── ComputePool class ──────────────────────────────────────────────────────────
+
+
+class ComputePool:
+    """Runs jobs on dataset selections, in worker processes or inline.
+
+    Args:
+        workers: Worker process count. 0 runs every job inline on the caller.
+    """
+
+    def __init__(self, workers: int = COMPUTE_WORKERS) -> None:
+        self.workers = workers
+        self._pool: Optional[Pool] = None
+        self._shared: Dict[str, Tuple[SharedFrame, List[SharedMemory]]] = {}
+        self._lock = threading.Lock()
+
+    def _start(self) -> Pool:
+        """Start the workers on the first job, not at boot.
+
+        A process served entirely from the warm result cache never starts them.
+        """
+        with self._lock:
+            if self._pool is None:
+                # spawn, not fork: forking a process with Streamlit's threads
+                # running can deadlock the child on a lock held by another
+                # thread. Pool starts every worker up front, so __main__ is
+                # only hidden here.
+                with _neutral_main():
+                    self._pool = multiprocessing.get_context("spawn").Pool(self.workers)
+            return self._pool
+
+    def _handle(self, dataset) -> SharedFrame:
+        """Publish a dataset's frame to shared memory, once per release."""
+        with self._lock:
+            if dataset.release not in self._shared:
+                self._shared[dataset.release] = share_frame(dataset.release, dataset.frame)
+            return self._shared[dataset.release][0]
+
+    def run(self, job: Callable, dataset, selection: pd.DataFrame, *args: Any) -> Any:
+        """Run job(selection, *args) and return its result.
+
+        Args:
+            job: A module-level function of this module (or any picklable one).
+            dataset: The catalog Dataset that selection was filtered from.
+            selection: Rows of dataset.frame. Only their index is sent to the
+                worker, so selection must keep the frame's RangeIndex labels.
+            *args: Passed to job after the selection.
+        """
+        if self.workers <= 0:
+            return job(selection, *args)
+        pool = self._pool or self._start()
+        rows = selection.index.to_numpy()
+        result = pool.apply_async(_run_job, (job, self._handle(dataset), rows, args))
+        return result.get(timeout=JOB_TIMEOUT)
+
+    def release(self, release: str) -> None:
+        """Free the shared memory of a release that is no longer served.
+
+        Workers still mapping it keep their view until they exit; the memory
+        is returned once the last mapping goes.
+        """
+        with self._lock:
+            entry = self._shared.pop(release, None)
+        if entry is None:
+            return
+        for segment in entry[1]:
+            segment.close()
+            segment.unlink()
+
+    def shutdown(self) -> None:
+        """Stop the workers and free every shared segment."""
+        if self._pool is not None:
+            self._pool.terminate()
+        for release in list(self._shared):
+            self.release(release)
+
+
+# ── Shared instance ────────────────────────────────────────────────────────────
+
+_shared: Optional[ComputePool] = None
+_shared_lock = threading.Lock()
+
+
+def shared_compute_pool() -> ComputePool:
+    """Return the process-wide ComputePool, sized by APP_COMPUTE_WORKERS."""
+    global _shared
+    with _shared_lock:
+        if _shared is None:
+            _shared = ComputePool()
+            atexit.register(_shared.shutdown)
+        return _shared
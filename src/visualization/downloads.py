@@ -0,0 +1,140 @@
+"""
+Data download helpers for the Streamlit app.
+
+Serialising a frame is the slowest thing the app does that nobody is looking
+at, so exports are only ever built on request and keyed by a hash of the
+selection that produced them. Full-dataset exports are written to disk once
+per data release and reused from there.
+
+Usage:
+    from src.visualization.downloads import EXPORT_FORMATS, export_bytes
+    data = export_bytes(filtered_df, "Parquet")
+
+Precompute full-dataset exports for the latest release of every breakdown:
+    python src/visualization/downloads.py
+"""
+
+from __future__ import annotations
+
+import gzip
+import hashlib
+import io
+import json
+import os
+import sys
+from pathlib import Path
+from typing import Any
+
+import pandas as pd
+
+if __name__ == "__main__":
+    sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from src.visualization.catalog import DATASET_PATTERNS, latest_release
+
+# ── Constants ──────────────────────────────────────────────────────────────────
+
+EXPORT_FORMATS: dict[str, dict[str, str]] = {
+    "CSV (gzip)": {"suffix": ".csv.gz", "mime": "application/gzip"},
+    "Parquet": {"suffix": ".parquet", "mime": "application/vnd.apache.parquet"},
+}
+
+EXPORT_DIR = Path(__file__).parent.parent.parent / "data" / "processed" / "exports"
+
+
+# ── Helpers ────────────────────────────────────────────────────────────────────
+
+
+def selection_hash(*parts: Any) -> str:
+    """Stable short hash of the widget values that produced a frame."""
+    payload = json.dumps(parts, sort_keys=True, default=str)
+    return hashlib.sha1(payload.encode("utf-8")).hexdigest()[:16]
+
+
+def export_bytes(df: pd.DataFrame, fmt: str) -> bytes:
+    """Serialise df in one of EXPORT_FORMATS.
+
+    Args:
+        df: Frame to export. The index is dropped.
+        fmt: Key of EXPORT_FORMATS.
+
+    Returns:
+        File contents, ready for st.download_button.
+    """
+    if fmt == "CSV (gzip)":
+        # mtime=0 keeps the bytes identical for identical data
+        return gzip.compress(df.to_csv(index=False).encode("utf-8"), mtime=0)
+    if fmt == "Parquet":
+        buffer = io.BytesIO()
+        df.to_parquet(buffer, index=False)
+        return buffer.getvalue()
+    raise ValueError(f"fmt must be one of {list(EXPORT_FORMATS)}, got {fmt!r}")
+
+
+def full_export_path(data_path: str | Path, fmt: str) -> Path:
+    """Where the full export of one release lives, e.g. df_direction_visa_20260518.parquet."""
+    return EXPORT_DIR / (Path(data_path).stem + EXPORT_FORMATS[fmt]["suffix"])
+
+
+def full_export(data_path: str | Path, fmt: str) -> bytes:
+    """Return the full-dataset export for a release, writing it on first use.
+
+    The pkl filename carries the release date, so one file per (release, format)
+    is built for the life of the release rather than once per session.
+    """
+    path = full_export_path(data_path, fmt)
+    if path.exists():
+        return path.read_bytes()
+    df = pd.read_pickle(data_path)
+    data = export_bytes(df, fmt)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    # Write then rename, so a concurrent reader never sees half a file
+    tmp = path.with_name(path.name + f".{os.getpid()}.tmp")
+    tmp.write_bytes(data)
+    os.replace(tmp, path)
+    return data
+
+
+def _source_path(data_path: str | Path) -> Path:
+    """SHA-1 of the pkl main() last exported a release from."""
+    return EXPORT_DIR / (Path(data_path).stem + ".sha1")
+
+
+def remove_full_exports(data_path: str | Path) -> None:
+    """Delete the on-disk full exports of a release once it is superseded."""
+    for fmt in EXPORT_FORMATS:
+        full_export_path(data_path, fmt).unlink(missing_ok=True)
+    _source_path(data_path).unlink(missing_ok=True)
+
+
+# ── Main ───────────────────────────────────────────────────────────────────────
+
+
+def main() -> None:
+    """Precompute full exports for the latest pkl of every app dataset.
+
+    A release whose exports were written from the pkl as it is now is skipped.
+    """
+    for pattern in DATASET_PATTERNS.values():
+        path = latest_release(pattern, settle=0)
+        if path is None:
+            print(f"  No file matching {pattern} — skipped", file=sys.stderr)
+            continue
+        digest = hashlib.sha1(path.read_bytes()).hexdigest()
+        recorded = _source_path(path)
+        if (
+            recorded.exists()
+            and recorded.read_text(encoding="utf-8") == digest
+            and all(full_export_path(path, fmt).exists() for fmt in EXPORT_FORMATS)
+        ):
+            print(f"  Current exports: {path.stem}")
+            continue
+        remove_full_exports(path)
+        for fmt in EXPORT_FORMATS:
+            full_export(path, fmt)
+            print(f"  Saved export: {full_export_path(path, fmt).name}")
+        recorded.write_text(digest, encoding="utf-8")
+
+
+if __name__ == "__main__":
+    main()
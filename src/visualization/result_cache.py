@@ -0,0 +1,253 @@
+"""
+ResultCache — process-wide cache of finished chart results for the Streamlit app.
+
+Streamlit runs every session in the same process, and most visitors land on the
+same default views. Caching the finished figure JSON once for all sessions,
+rather than per session, means a traffic spike is served from memory instead of
+from pandas and plotly.express.
+
+Entries are evicted least-recently-used once either the entry count or the
+total byte size passes its limit. The byte budget comes from
+APP_CACHE_BUDGET_MB, and sizes are measured per value type (string and byte
+payloads by length, DataFrames by their deep memory usage). Hits, misses and
+evictions are counted for monitoring. Concurrent requests for the same key are
+coalesced ("single flight"): the first caller computes, the rest wait for its
+result instead of repeating the work.
+
+The app uses one shared instance per process, seeded at boot from the snapshot
+written by src/visualization/warmup.py.
+
+Usage:
+    cache = shared_result_cache()
+    fig_json = cache.get_or_compute(key, lambda: build_figure().to_json())
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import sys
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future
+from pathlib import Path
+from typing import Any, Callable, Dict, Hashable, Optional
+
+# ── Constants ──────────────────────────────────────────────────────────────────
+
+# Figure JSON runs ~50-500 KB per view, selection exports ~10-500 KB
+RESULT_CACHE_MAX_BYTES = int(os.environ.get("APP_CACHE_BUDGET_MB", "64")) * 1024 * 1024
+RESULT_CACHE_MAX_ENTRIES = 512
+
+SNAPSHOT_PATH = (
+    Path(__file__).parent.parent.parent / "data" / "processed" / "cache" / "result_cache.json"
+)
+
+
+# ── Helpers ────────────────────────────────────────────────────────────────────
+
+
+def sizeof(value: Any) -> int:
+    """Approximate memory held by a cached value, in bytes.
+
+    Exact for str/bytes payloads. DataFrames and Series are measured with
+    memory_usage(deep=True); tuples and lists are summed. Anything else falls
+    back to sys.getsizeof.
+    """
+    if isinstance(value, (str, bytes)):
+        return len(value)
+    if isinstance(value, (tuple, list)):
+        return sum(sizeof(item) for item in value)
+    usage = getattr(value, "memory_usage", None)
+    if callable(usage):
+        total = usage(deep=True)
+        return int(total.sum()) if hasattr(total, "sum") else int(total)
+    return sys.getsizeof(value)
+
+
+# ── ResultCache class ──────────────────────────────────────────────────────────
+
+
+class ResultCache:
+    """Thread-safe LRU cache bounded by entry count and total size.
+
+    Args:
+        max_bytes: Total size above which least-recently-used entries are evicted.
+        max_entries: Entry count above which least-recently-used entries are evicted.
+        sizeof: Returns the size in bytes of a cached value.
+    """
+
+    def __init__(
+        self,
+        max_bytes: int = RESULT_CACHE_MAX_BYTES,
+        max_entries: int = RESULT_CACHE_MAX_ENTRIES,
+        sizeof: Callable[[Any], int] = sizeof,
+    ) -> None:
+        self.max_bytes = max_bytes
+        self.max_entries = max_entries
+        self._sizeof = sizeof
+        self._entries: OrderedDict[Hashable, tuple[Any, int]] = OrderedDict()
+        self._inflight: dict[Hashable, Future] = {}
+        self._nbytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    # ── Private helpers ────────────────────────────────────────────────────────
+
+    def _store(self, key: Hashable, value: Any) -> None:
+        """Insert value and evict down to the limits. Caller holds the lock."""
+        size = self._sizeof(value)
+        if size > self.max_bytes:
+            return  # would evict everything else and still not fit
+        if key in self._entries:
+            self._nbytes -= self._entries.pop(key)[1]
+        self._entries[key] = (value, size)
+        self._nbytes += size
+        while self._nbytes > self.max_bytes or len(self._entries) > self.max_entries:
+            _, (_, evicted_size) = self._entries.popitem(last=False)
+            self._nbytes -= evicted_size
+            self.evictions += 1
+
+    # ── Public interface ───────────────────────────────────────────────────────
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        """Return the cached value for key, or None."""
+        with self._lock:
+            if key not in self._entries:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self._entries.move_to_end(key)
+            return self._entries[key][0]
+
+    def put(self, key: Hashable, value: Any) -> None:
+        """Cache value under key."""
+        with self._lock:
+            self._store(key, value)
+
+    def get_or_compute(self, key: Hashable, compute: Callable[[], Any]) -> Any:
+        """Return the cached value for key, computing it at most once.
+
+        If another thread is already computing key, wait for its result rather
+        than computing it again. An exception in the computing thread is raised
+        in every waiting thread too.
+        """
+        with self._lock:
+            if key in self._entries:
+                self.hits += 1
+                self._entries.move_to_end(key)
+                return self._entries[key][0]
+            self.misses += 1
+            future = self._inflight.get(key)
+            leader = future is None
+            if leader:
+                future = Future()
+                self._inflight[key] = future
+
+        if not leader:
+            return future.result()
+
+        try:
+            value = compute()
+        except BaseException as exc:
+            with self._lock:
+                del self._inflight[key]
+            future.set_exception(exc)
+            raise
+
+        with self._lock:
+            self._store(key, value)
+            del self._inflight[key]
+        future.set_result(value)
+        return value
+
+    def clear(self) -> None:
+        """Drop every cached entry. In-flight computations are unaffected."""
+        with self._lock:
+            self._entries.clear()
+            self._nbytes = 0
+
+    def evict(self, predicate: Callable[[Hashable], bool]) -> int:
+        """Drop every entry whose key satisfies predicate. Returns the count.
+
+        Explicit invalidation, so not counted in evictions.
+        """
+        with self._lock:
+            keys = [key for key in self._entries if predicate(key)]
+            for key in keys:
+                self._nbytes -= self._entries.pop(key)[1]
+        return len(keys)
+
+    def save(self, path: Path = SNAPSHOT_PATH) -> int:
+        """Write every entry to a JSON snapshot, oldest first. Returns the count.
+
+        Keys must be tuples of JSON scalars. Only string values (figure JSON)
+        are written; binary exports are cheap to rebuild and skipped.
+        """
+        with self._lock:
+            entries = [
+                [list(key), value]
+                for key, (value, _) in self._entries.items()
+                if isinstance(value, str)
+            ]
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_name(path.name + f".{os.getpid()}.tmp")
+        tmp.write_text(json.dumps({"entries": entries}), encoding="utf-8")
+        os.replace(tmp, path)
+        return len(entries)
+
+    def load(self, path: Path = SNAPSHOT_PATH) -> int:
+        """Add the entries of a snapshot written by save(). Returns the count."""
+        with open(path, encoding="utf-8") as f:
+            entries = json.load(f)["entries"]
+        with self._lock:
+            for key, value in entries:
+                self._store(tuple(key), value)
+        return len(entries)
+
+    def stats(self) -> Dict[str, Any]:
+        """Counters and occupancy, for monitoring."""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "nbytes": self._nbytes,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_ratio": self.hits / lookups if lookups else None,
+            }
+
+    @property
+    def nbytes(self) -> int:
+        """Total size of cached values, in bytes."""
+        return self._nbytes
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, key: Hashable) -> bool:
+        with self._lock:
+            return key in self._entries
+
+
+# ── Shared instance ────────────────────────────────────────────────────────────
+
+_shared: Optional[ResultCache] = None
+_shared_lock = threading.Lock()
+
+
+def shared_result_cache() -> ResultCache:
+    """Return the process-wide cache, seeded from the warm-up snapshot if present."""
+    global _shared
+    with _shared_lock:
+        if _shared is None:
+            _shared = ResultCache()
+            if SNAPSHOT_PATH.exists():
+                count = _shared.load(SNAPSHOT_PATH)
+                print(f"  Loaded {count} cached results from {SNAPSHOT_PATH.name}")
+        return _shared
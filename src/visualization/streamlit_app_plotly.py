@@ -1,15 +1,49 @@
 import streamlit as st
 import pandas as pd
-import plotly.express as px
 import plotly.graph_objects as go
 from datetime import datetime
-from io import StringIO
+import json
 
-import glob
 import os
+import sys
 
 current_dir = os.path.dirname(__file__)
-interim_dir = os.path.join(current_dir, "../../data/interim")
+
+# Add repo root to path so src.dashboard imports resolve
+repo_root = os.path.abspath(os.path.join(current_dir, "../.."))
+if repo_root not in sys.path:
+    sys.path.insert(0, repo_root)
+
+from src.dashboard.webgl import use_webgl
+from src.visualization.admin import is_admin, render_admin
+from src.visualization.catalog import DATASET_PATTERNS, shared_dataset_store
+from src.features.transform_cube import cube_transform
+from src.visualization.compute import (
+    TRANSFORMS,
+    add_label,
+    group_sum,
+    labelled_transform,
+    pivot_sum,
+    shared_compute_pool,
+)
+from src.visualization.result_cache import shared_result_cache
+from src.visualization.telemetry import shared_telemetry
+from src.visualization.downloads import (
+    EXPORT_FORMATS,
+    export_bytes,
+    full_export,
+    remove_full_exports,
+    selection_hash,
+)
+
+# Stage timings of this rerun, recorded only with APP_TELEMETRY=1
+telemetry = shared_telemetry()
+telemetry.begin()
+
+# Hidden admin view, opened with ?admin=<APP_ADMIN_TOKEN>
+if is_admin(st.query_params):
+    render_admin(telemetry, shared_result_cache(), shared_dataset_store())
+    st.stop()
 
 # Main title for the dashboard
 st.title("New Zealand Migration Trends")
@@ -29,7 +63,6 @@ footer_text = """
 """
 
 
-# Function to create a label for each unique combination
 REGION_COLORS = {
     "Northland Region": "#e6194b",
     "Auckland Region": "#3cb44b",
@@ -132,162 +165,198 @@ AUCKLAND_LOCAL_BOARD_COLORS = {
 }
 
 
-def create_label(row):
-    if breakdown_type == "Direction, Citizenship":
-        return f"{row['Direction']}, {row['Citizenship']}"
-    elif breakdown_type == "Direction, Age, Sex":
-        return f"{row['Direction']}, {row['Sex']}, {row['Age Group']}"
-    elif breakdown_type == "Direction, Visa":
-        return f"{row['Direction']}, {row['Visa']}"
-    elif breakdown_type == "Citizenship, Visa":
-        return f"{row['Visa']}, {row['Citizenship']}"
-    elif breakdown_type == "Direction, Region, Citizenship":
-        return f"{row['Direction']}, {row['Region']}"
+# Columns joined to label each time series, per breakdown
+LABEL_COLUMNS = {
+    "Direction, Citizenship": ["Direction", "Citizenship"],
+    "Direction, Age, Sex": ["Direction", "Sex", "Age Group"],
+    "Direction, Visa": ["Direction", "Visa"],
+    "Citizenship, Visa": ["Visa", "Citizenship"],
+    "Direction, Region, Citizenship": ["Direction", "Region"],
+}
+
+
+@st.cache_resource
+def _dataset_store():
+    """Process-wide datasets, hot-reloaded by a background watcher.
 
+    When a new release is swapped in, everything cached for the release it
+    replaces is dropped, so memory holds one vintage per breakdown.
+    """
+    store = shared_dataset_store()
+
+    def evict_release(old, new):
+        shared_result_cache().evict(lambda key: key[0] == old.release)
+        shared_compute_pool().release(old.release)
+        remove_full_exports(old.path)
 
-def _latest_pkl(pattern):
-    """Return the path of the most recent .pkl file matching pattern."""
-    files = sorted(glob.glob(pattern))
-    if not files:
-        raise FileNotFoundError(f"No interim data files found matching: {pattern}")
-    return files[-1]
+    store.on_swap(evict_release)
+    store.start_watcher()
+    return store
 
 
-def _apply_transform(df, transform, base_year=None):
-    """Apply a time series transform to the filtered dataframe.
+def _selection_export(release, digest, fmt, build):
+    """Serialise a frame, memoised by the hash of the selection behind it.
 
-    Operates per-series (grouped by Label column). Returns the transformed
-    dataframe and a y-axis label string.
+    Held in the shared cache, so exports count against the same memory budget
+    as figures. build returns the frame and is only called on a cache miss.
     """
-    df = df.sort_values(["Label", "Month"]).copy()
-    if transform == "None":
-        return df, "Count"
-    elif transform == "Cumulative from base year":
-        df = df[df["Month"].dt.year >= int(base_year)]
-        df["Count"] = df.groupby("Label")["Count"].cumsum()
-        return df, f"Cumulative count (from {int(base_year)})"
-    elif transform == "3-month moving average":
-        df["Count"] = df.groupby("Label")["Count"].transform(
-            lambda s: s.rolling(3, min_periods=1).mean()
-        )
-        return df, "3-month moving average"
-    elif transform == "12-month moving average":
-        df["Count"] = df.groupby("Label")["Count"].transform(
-            lambda s: s.rolling(12, min_periods=1).mean()
-        )
-        return df, "12-month moving average"
-    elif transform == "3-month moving sum":
-        df["Count"] = df.groupby("Label")["Count"].transform(
-            lambda s: s.rolling(3, min_periods=1).sum()
-        )
-        return df, "3-month moving sum"
-    elif transform == "12-month moving sum":
-        df["Count"] = df.groupby("Label")["Count"].transform(
-            lambda s: s.rolling(12, min_periods=1).sum()
-        )
-        return df, "12-month moving sum"
+    def build_export():
+        frame = build()
+        with telemetry.stage("serialise"):
+            return export_bytes(frame, fmt)
+
+    return shared_result_cache().get_or_compute((release, "export", digest, fmt), build_export)
 
 
-# Function to load datasets
-@st.cache_data  # Use Streamlit's cache to load the data only once
-def load_data(data_path):
-    df = pd.read_pickle(data_path)
-    df["Month"] = pd.to_datetime(df["Month"])
-    return df
+def _full_export(release, data_path, fmt):
+    """Full-dataset export, built once per release and format."""
+    def build_export():
+        with telemetry.stage("serialise"):
+            return full_export(data_path, fmt)
+
+    return shared_result_cache().get_or_compute((release, "full_export", fmt), build_export)
+
+
+def render_figure(fig_json):
+    """Draw a cached figure from its JSON.
+
+    Passed as a Figure rather than the parsed dict: st.plotly_chart rejects a
+    dict with no traces, which an empty selection produces.
+    """
+    st.plotly_chart(go.Figure(json.loads(fig_json)), use_container_width=True)
+
+
+def download_section(key, digest, build, file_name="migration_data"):
+    """Format picker plus a download button that only serialises on request.
+
+    The export is built after the user clicks "Prepare download", and only for
+    the selection (digest) it was prepared for, so ordinary reruns never pay
+    for serialisation.
+    """
+    fmt = st.radio(
+        "Download format:", list(EXPORT_FORMATS), horizontal=True, key=f"{key}_format"
+    )
+    if st.button("Prepare download", key=f"{key}_prepare"):
+        st.session_state[f"{key}_ready"] = digest
+    if st.session_state.get(f"{key}_ready") != digest:
+        return
+    st.download_button(
+        label=f"Download Data as {fmt}",
+        data=build(fmt),
+        file_name=file_name + EXPORT_FORMATS[fmt]["suffix"],
+        mime=EXPORT_FORMATS[fmt]["mime"],
+        key=key,
+    )
 
 
 # Select breakdown type
 breakdown_type = st.selectbox(
     "Select the breakdown to explore:",
-    ["Direction, Citizenship", "Direction, Age, Sex", "Direction, Visa", "Citizenship, Visa", "Direction, Region, Citizenship"],
+    list(DATASET_PATTERNS),
 )
 
-# Resolve the latest interim file for the selected breakdown
-_patterns = {
-    "Direction, Citizenship": os.path.join(interim_dir, "df_citizenship_direction_*.pkl"),
-    "Direction, Age, Sex":    os.path.join(interim_dir, "df_direction_age_sex_*.pkl"),
-    "Direction, Visa":        os.path.join(interim_dir, "df_direction_visa_*.pkl"),
-    "Citizenship, Visa":      os.path.join(interim_dir, "df_citizenship_visa_*.pkl"),
-    "Direction, Region, Citizenship":      os.path.join(interim_dir, "df_direction_region_*.pkl"),
-}
-data_path = _latest_pkl(_patterns[breakdown_type])
-
-# Load the selected dataset
-df = load_data(data_path)
+# Current release of the selected dataset. Held for the whole rerun, so a
+# release swapped in mid-rerun is only seen on the next one.
+with telemetry.stage("load"):
+    dataset = _dataset_store().get(breakdown_type)
+df = dataset.frame  # shared by every session: never modify in place
+options = dataset.options
+data_path = str(dataset.path)
+
+# Finished figures are shared by every session in this process, cached per
+# release; the pkl filename carries its date
+results = shared_result_cache()
+release = dataset.release
+
+# Heavy aggregations run here, or in worker processes if APP_COMPUTE_WORKERS is set
+compute = shared_compute_pool()
+
+with st.expander("Download the full dataset"):
+    download_section(
+        "download_full",
+        selection_hash(data_path),
+        lambda fmt: _full_export(release, data_path, fmt),
+        file_name=os.path.splitext(os.path.basename(data_path))[0],
+    )
 
 # Create tabs
 tab1, tab2, tab3 = st.tabs(["Time Series Plot", "Stacked Area Plots", "Tree Maps"])
 
 # Time Series Plot Tab
 with tab1:
+    telemetry.lap()
     if breakdown_type == "Direction, Citizenship":
         directions = st.multiselect(
             "Select directions:",
-            df["Direction"].unique(),
-            default=df["Direction"].unique()[0],
+            options["Direction"],
+            default=options["Direction"][0],
         )
         citizenship = st.multiselect(
             "Select Citizenship:",
-            df["Citizenship"].unique(),
-            default=df["Citizenship"].unique()[0],
+            options["Citizenship"],
+            default=options["Citizenship"][0],
         )
         filtered_df = df[
             (df["Direction"].isin(directions)) & (df["Citizenship"].isin(citizenship))
         ]
+        selection = [directions, citizenship]
         plot_title = "Permanent and long term migration by Citizenship"
     elif breakdown_type == "Direction, Age, Sex":
         directions = st.multiselect(
             "Select directions:",
-            df["Direction"].unique(),
-            default=df["Direction"].unique()[0],
+            options["Direction"],
+            default=options["Direction"][0],
         )
         sex = st.multiselect(
-            "Select Sex:", df["Sex"].unique(), default=df["Sex"].unique()[0]
+            "Select Sex:", options["Sex"], default=options["Sex"][0]
         )
         age_group = st.multiselect(
             "Select age group:",
-            df["Age Group"].unique(),
-            default=df["Age Group"].unique()[:2],
+            options["Age Group"],
+            default=options["Age Group"][:2],
         )
         filtered_df = df[
             df["Direction"].isin(directions)
             & df["Sex"].isin(sex)
             & df["Age Group"].isin(age_group)
         ]
+        selection = [directions, sex, age_group]
         plot_title = f"Permanent and long term migration by age group"
     elif breakdown_type == "Direction, Visa":
         directions = st.multiselect(
             "Select directions:",
-            df["Direction"].unique(),
-            default=df["Direction"].unique()[0],
+            options["Direction"],
+            default=options["Direction"][0],
         )
         visa = st.multiselect(
             "Select visa type:",
-            df["Visa"].unique(),
-            default=df["Visa"].unique()[:2],
+            options["Visa"],
+            default=options["Visa"][:2],
         )
         filtered_df = df[df["Direction"].isin(directions) & df["Visa"].isin(visa)]
+        selection = [directions, visa]
         plot_title = f"Permanent and long term arrivals by visa type"
     elif breakdown_type == "Citizenship, Visa":
         citizenship = st.multiselect(
             "Select Citizenship:",
-            sorted(df["Citizenship"].unique()),
-            default=sorted(df["Citizenship"].unique())[:3],
+            sorted(options["Citizenship"]),
+            default=sorted(options["Citizenship"])[:3],
         )
         visa = st.multiselect(
             "Select visa type:",
-            [v for v in df["Visa"].unique() if v != "TOTAL"],
-            default=[v for v in df["Visa"].unique() if v not in ("TOTAL", "New Zealand and Australian citizens")][:3],
+            [v for v in options["Visa"] if v != "TOTAL"],
+            default=[v for v in options["Visa"] if v not in ("TOTAL", "New Zealand and Australian citizens")][:3],
         )
         filtered_df = df[
             df["Citizenship"].isin(citizenship)
             & df["Visa"].isin(visa)
         ]
+        selection = [citizenship, visa]
         plot_title = "Migrant arrivals by citizenship and visa type"
     elif breakdown_type == "Direction, Region, Citizenship":
         directions = st.multiselect(
             "Select directions:",
-            df["Direction"].unique(),
+            options["Direction"],
             default=["Arrivals"],
         )
         citizenship_t1 = st.selectbox(
@@ -323,30 +392,24 @@ with tab1:
             "Select area:",
             region_options_t1,
             default=default_t1,
-            key="region_t1",
+            # One selection per level: areas of one level are never options of
+            # another, so a shared key would empty the selection on a switch
+            key=f"region_t1_{level_t1}",
         )
         filtered_df = df[
             df["Direction"].isin(directions)
             & (df["Citizenship"] == citizenship_t1)
             & df["Region"].isin(region)
         ]
+        selection = [directions, citizenship_t1, region]
         plot_title = "Migration by direction and NZ area"
-
-    # Apply the function to create a new column 'Label' for plotting
-    filtered_df["Label"] = filtered_df.apply(create_label, axis=1)
+    telemetry.lap("filter")  # selection widgets and the row filter
 
     # ── Transform controls ──
     st.markdown("---")
     transform = st.selectbox(
         "Transform",
-        [
-            "None",
-            "Cumulative from base year",
-            "3-month moving average",
-            "12-month moving average",
-            "3-month moving sum",
-            "12-month moving sum",
-        ],
+        TRANSFORMS,
         key="transform_select",
     )
     base_year = None
@@ -354,45 +417,72 @@ with tab1:
         base_year = st.number_input(
             "Base year", min_value=2001, max_value=2025, value=2022, step=1
         )
-    filtered_df, y_label = _apply_transform(filtered_df, transform, base_year)
-
-    # Plotting with Plotly
-    fig = px.line(
-        filtered_df,
-        x="Month",
-        y="Count",
-        color="Label",
-        title=plot_title,
-        markers=True,
-    )  # Adding a horizontal line at y=0
-    fig.add_hline(y=0, line_dash="dash", line_color="grey")
-    fig.update_traces(marker=dict(size=4))
-    fig.update_layout(hovermode="closest", yaxis_title=y_label)
-    fig.update_layout(
-        legend=dict(
-            orientation="h",  # Horizontal orientation
-            yanchor="bottom",
-            y=-0.5,  # Adjust this value to move the legend up or down relative to the bottom
-            xanchor="center",
-            x=0.5,  # Centers the legend horizontally
+    selection += [transform, base_year]
+
+    def timeseries_frame():
+        """Label each series in the selection and apply the transform."""
+        if dataset.cube is not None:
+            # Transforms are precomputed per series; only slicing happens here
+            with telemetry.stage("label"):
+                labelled_df = add_label(filtered_df, LABEL_COLUMNS[breakdown_type])
+            with telemetry.stage("transform"):
+                return cube_transform(dataset.cube, labelled_df, transform, base_year)
+        with telemetry.stage("transform"):  # labelling included
+            return compute.run(
+                labelled_transform,
+                dataset,
+                filtered_df,
+                LABEL_COLUMNS[breakdown_type],
+                transform,
+                base_year,
+            )
+
+    @telemetry.stage("figure")
+    def timeseries_figure():
+        import plotly.express as px  # imported here: only cache misses build figures
+
+        frame, y_label = timeseries_frame()
+
+        # Plotting with Plotly
+        fig = px.line(
+            frame,
+            x="Month",
+            y="Count",
+            color="Label",
+            title=plot_title,
+            markers=True,
+        )  # Adding a horizontal line at y=0
+        fig.add_hline(y=0, line_dash="dash", line_color="grey")
+        fig.update_traces(marker=dict(size=4))
+        fig.update_layout(hovermode="closest", yaxis_title=y_label)
+        fig.update_layout(
+            legend=dict(
+                orientation="h",  # Horizontal orientation
+                yanchor="bottom",
+                y=-0.5,  # Adjust this value to move the legend up or down relative to the bottom
+                xanchor="center",
+                x=0.5,  # Centers the legend horizontally
+            )
         )
+        # Large selections (e.g. every TA) draw far faster on a WebGL canvas
+        fig = use_webgl(fig)
+        with telemetry.stage("serialise"):
+            return fig.to_json()
+
+    # Built once per release and selection, shared by every session
+    digest = selection_hash(data_path, "timeseries", selection)
+    fig_json = results.get_or_compute(
+        (release, breakdown_type, "timeseries", digest), timeseries_figure
     )
-
-    st.plotly_chart(fig, use_container_width=True)
+    with telemetry.stage("render"):
+        render_figure(fig_json)
     # Using st.markdown to create a flex container with two text elements, with adjusted font size
     st.markdown(footer_text, unsafe_allow_html=True)
-    # Convert DataFrame to CSV string
-    csv = filtered_df.to_csv(index=False)
-    csv_file = StringIO(csv)
-    csv_filename = "migration_data.csv"
-
-    # Add a download button and specify the method to download the data
-    st.download_button(
-        label="Download Data as CSV",
-        data=csv_file.getvalue(),
-        file_name=csv_filename,
-        mime="text/csv",
-        key="download_timeseries",
+    # Export is built lazily, memoised by a hash of the selection
+    download_section(
+        "download_timeseries",
+        digest,
+        lambda fmt: _selection_export(release, digest, fmt, lambda: timeseries_frame()[0]),
     )
 
 
@@ -401,31 +491,33 @@ with tab2:
     if breakdown_type not in ("Citizenship, Visa",):
         direction = st.selectbox(
             "Select Direction:",
-            df["Direction"].unique(),
+            options["Direction"],
             key="direction_select",
         )
     else:
         direction = "Arrivals"
+    telemetry.lap()
 
     if breakdown_type == "Direction, Citizenship":
         citizenships = st.multiselect(
             "Select Citizenships:",
-            df["Citizenship"].unique(),
-            default=df["Citizenship"].unique()[:2],
+            options["Citizenship"],
+            default=options["Citizenship"][:2],
             key="citizenships",
         )
         filtered_df = df[
             (df["Direction"] == direction) & (df["Citizenship"].isin(citizenships))
         ]
+        selection = [direction, citizenships]
         pivot_columns = "Citizenship"
         plot_title = f"Stacked Area Plot of {direction} by Citizenship"
 
     elif breakdown_type == "Direction, Age, Sex":
-        sex = st.selectbox("Select Sex:", df["Sex"].unique(), key="sex_age_sex")
+        sex = st.selectbox("Select Sex:", options["Sex"], key="sex_age_sex")
         age_groups = st.multiselect(
             "Select Age Groups:",
-            df["Age Group"].unique(),
-            default=df["Age Group"].unique()[:2],
+            options["Age Group"],
+            default=options["Age Group"][:2],
             key="age_groups_age_sex",
         )
         filtered_df = df[
@@ -433,36 +525,39 @@ with tab2:
             & (df["Sex"] == sex)
             & (df["Age Group"].isin(age_groups))
         ]
+        selection = [direction, sex, age_groups]
         pivot_columns = "Age Group"
         plot_title = f"Stacked Area Plot of {direction} by age group ({sex}) "
 
     elif breakdown_type == "Direction, Visa":
         visas = st.multiselect(
             "Select Visa Type:",
-            df["Visa"].unique(),
-            default=df["Visa"].unique()[:2],
+            options["Visa"],
+            default=options["Visa"][:2],
             key="visas_visa",
         )
         filtered_df = df[(df["Direction"] == direction) & (df["Visa"].isin(visas))]
+        selection = [direction, visas]
         pivot_columns = "Visa"
         plot_title = f"Stacked Area Plot of {direction} by Visa type"
     elif breakdown_type == "Citizenship, Visa":
         citizenships_area = st.multiselect(
             "Select Citizenship:",
-            sorted(df["Citizenship"].unique()),
-            default=sorted(df["Citizenship"].unique())[:5],
+            sorted(options["Citizenship"]),
+            default=sorted(options["Citizenship"])[:5],
             key="citizenships_area",
         )
         visas_area = st.multiselect(
             "Select Visa Type:",
-            [v for v in df["Visa"].unique() if v != "TOTAL"],
-            default=[v for v in df["Visa"].unique() if v != "TOTAL"],
+            [v for v in options["Visa"] if v != "TOTAL"],
+            default=[v for v in options["Visa"] if v != "TOTAL"],
             key="visas_area",
         )
         filtered_df = df[
             df["Citizenship"].isin(citizenships_area)
             & df["Visa"].isin(visas_area)
         ]
+        selection = [citizenships_area, visas_area]
         pivot_columns = "Visa"
         plot_title = "Stacked Area: Arrivals by visa type"
     elif breakdown_type == "Direction, Region, Citizenship":
@@ -499,73 +594,78 @@ with tab2:
             "Select areas:",
             region_options_t2,
             default=default_t2,
-            key="regions_area",
+            key=f"regions_area_{level_t2}",  # one selection per level, as in tab 1
         )
         filtered_df = df[
             (df["Direction"] == direction)
             & (df["Citizenship"] == citizenship_t2)
             & df["Region"].isin(regions_area)
         ]
+        selection = [direction, citizenship_t2, regions_area]
         pivot_columns = "Region"
         plot_title = f"Stacked Area: {direction} by NZ area"
+    telemetry.lap("filter")
+
+    @telemetry.stage("figure")
+    def stackarea_figure():
+        import plotly.express as px  # imported here: only cache misses build figures
+
+        # Preparing data for the plot
+        with telemetry.stage("pivot"):
+            pivot_df = compute.run(pivot_sum, dataset, filtered_df, pivot_columns)
+
+        # Plotting with Plotly
+        fig = px.area(pivot_df, facet_col_wrap=2)
+
+        # Define a dictionary mapping breakdown types to legend title texts
+        legend_title_map = {
+            "Direction, Citizenship": "Citizenship",
+            "Direction, Age, Sex": "Age Group",
+            "Direction, Visa": "Visa",
+            "Citizenship, Visa": "Visa",
+            "Direction, Region, Citizenship": "Region",
+        }
 
-    # Preparing data for the plot
-    pivot_df = filtered_df.pivot_table(
-        index="Month", columns=pivot_columns, values="Count", aggfunc="sum"
-    ).fillna(0)
-
-    # Plotting with Plotly
-    fig = px.area(pivot_df, facet_col_wrap=2)
-
-    # Define a dictionary mapping breakdown types to legend title texts
-    legend_title_map = {
-        "Direction, Citizenship": "Citizenship",
-        "Direction, Age, Sex": "Age Group",
-        "Direction, Visa": "Visa",
-        "Citizenship, Visa": "Visa",
-        "Direction, Region, Citizenship": "Region",
-    }
-
-    # Use the breakdown_type to get the corresponding legend title text from the dictionary
-    legend_title_text = legend_title_map.get(
-        breakdown_type, "Category"
-    )  # Default to "Category" if breakdown_type is not in the map
-
-    fig.update_layout(
-        xaxis_title="Month",
-        yaxis_title="Count",
-        title=plot_title,
-        legend_title_text=legend_title_text,
-        hovermode="x unified",
-    )
+        # Use the breakdown_type to get the corresponding legend title text from the dictionary
+        legend_title_text = legend_title_map.get(
+            breakdown_type, "Category"
+        )  # Default to "Category" if breakdown_type is not in the map
+
+        fig.update_layout(
+            xaxis_title="Month",
+            yaxis_title="Count",
+            title=plot_title,
+            legend_title_text=legend_title_text,
+            hovermode="x unified",
+        )
 
-    fig.update_layout(
-        legend=dict(
-            orientation="h",  # Horizontal orientation
-            yanchor="bottom",
-            y=-0.5,  # Adjust this value to move the legend up or down relative to the bottom
-            xanchor="center",
-            x=0.5,  # Centers the legend horizontally
+        fig.update_layout(
+            legend=dict(
+                orientation="h",  # Horizontal orientation
+                yanchor="bottom",
+                y=-0.5,  # Adjust this value to move the legend up or down relative to the bottom
+                xanchor="center",
+                x=0.5,  # Centers the legend horizontally
+            )
         )
-    )
+        fig = use_webgl(fig)
+        with telemetry.stage("serialise"):
+            return fig.to_json()
 
-    st.plotly_chart(fig, use_container_width=True)
+    digest = selection_hash(data_path, "stackarea", selection)
+    fig_json = results.get_or_compute(
+        (release, breakdown_type, "stackarea", digest), stackarea_figure
+    )
+    with telemetry.stage("render"):
+        render_figure(fig_json)
 
     # Using st.markdown to create a flex container with two text elements, with adjusted font size
     st.markdown(footer_text, unsafe_allow_html=True)
 
-    # Convert DataFrame to CSV string
-    csv = filtered_df.to_csv(index=False)
-    csv_file = StringIO(csv)
-    csv_filename = "migration_data.csv"
-
-    # Add a download button and specify the method to download the data
-    st.download_button(
-        label="Download Data as CSV",
-        data=csv_file.getvalue(),
-        file_name=csv_filename,
-        mime="text/csv",
-        key="download_stackarea",
+    download_section(
+        "download_stackarea",
+        digest,
+        lambda fmt: _selection_export(release, digest, fmt, lambda: filtered_df),
     )
 
 
@@ -577,7 +677,7 @@ with tab3:
     if breakdown_type == "Direction, Citizenship":
         # User input widgets
         direction = st.selectbox(
-            "Select Direction:", df["Direction"].unique(), key="direction_treemap"
+            "Select Direction:", options["Direction"], key="direction_treemap"
         )
 
         start_month = st.date_input(
@@ -653,48 +753,51 @@ with tab3:
         if exclude_nz:
             non_countries.append("New Zealand")
 
-        # Filtering DataFrame
-        filtered_df = df[
-            (df["Direction"] == direction)
-            & (df["Month"] >= pd.to_datetime(start_month))
-            & (df["Month"] <= pd.to_datetime(end_month))
-            & (~df["Citizenship"].isin(non_countries))
-        ]
+        selection = [direction, start_month, end_month, exclude_nz]
 
-        # Grouping and calculating percentage
-        grouped_df = filtered_df.groupby(["Direction", "Citizenship"], as_index=False)[
-            "Count"
-        ].sum()
-        total_counts_by_direction = grouped_df.groupby("Direction")["Count"].transform(
-            "sum"
-        )
-        grouped_df["Percentage"] = (
-            grouped_df["Count"] / total_counts_by_direction * 100
-        ).round(1)
-
-        grouped_df["Color"] = grouped_df["Citizenship"].map(color_map)
-
-        # Creating the Treemap
-        fig = go.Figure(
-            go.Treemap(
-                labels=grouped_df["Citizenship"],
-                parents=grouped_df["Direction"],
-                values=grouped_df["Count"],
-                customdata=grouped_df["Percentage"],
-                marker_colors=grouped_df["Color"],
-                texttemplate="<b>%{label}</b><br>Count: %{value}</b><br>Share: %{customdata}%",
-                hovertemplate="<b>%{label}</b><br>Count: %{value}<br>Share: %{customdata}%<extra></extra>",
-                branchvalues="total",
+        def treemap():
+            # Filtering DataFrame
+            filtered_df = df[
+                (df["Direction"] == direction)
+                & (df["Month"] >= pd.to_datetime(start_month))
+                & (df["Month"] <= pd.to_datetime(end_month))
+                & (~df["Citizenship"].isin(non_countries))
+            ]
+
+            # Grouping and calculating percentage
+            with telemetry.stage("group"):
+                grouped_df = compute.run(group_sum, dataset, filtered_df, ["Direction", "Citizenship"])
+            total_counts_by_direction = grouped_df.groupby("Direction")["Count"].transform(
+                "sum"
             )
-        )
+            grouped_df["Percentage"] = (
+                grouped_df["Count"] / total_counts_by_direction * 100
+            ).round(1)
+
+            grouped_df["Color"] = grouped_df["Citizenship"].map(color_map)
+
+            # Creating the Treemap
+            fig = go.Figure(
+                go.Treemap(
+                    labels=grouped_df["Citizenship"],
+                    parents=grouped_df["Direction"],
+                    values=grouped_df["Count"],
+                    customdata=grouped_df["Percentage"],
+                    marker_colors=grouped_df["Color"],
+                    texttemplate="<b>%{label}</b><br>Count: %{value}</b><br>Share: %{customdata}%",
+                    hovertemplate="<b>%{label}</b><br>Count: %{value}<br>Share: %{customdata}%<extra></extra>",
+                    branchvalues="total",
+                )
+            )
+            return fig, grouped_df
 
     elif breakdown_type == "Direction, Age, Sex":
         # User input widgets for Direction, Start month, and End month
         direction = st.selectbox(
-            "Select Direction:", df["Direction"].unique(), key="direction_treemap_age"
+            "Select Direction:", options["Direction"], key="direction_treemap_age"
         )
         sex = st.selectbox(
-            "Select Sex:", df["Sex"].unique(), key="direction_treemap_sex"
+            "Select Sex:", options["Sex"], key="direction_treemap_sex"
         )
         start_month = st.date_input(
             "Start month",
@@ -726,45 +829,48 @@ with tab3:
             "65 Years and Over": "#fb9a99",  # Light red
         }
 
-        # Filtering DataFrame for the selected direction and month range, excluding 'Total All Ages'
-        filtered_df = df[
-            (df["Direction"] == direction)
-            & (df["Sex"] == sex)
-            & (df["Month"] >= pd.to_datetime(start_month))
-            & (df["Month"] <= pd.to_datetime(end_month))
-            & (df["Age Group"] != "Total All Ages")  # Exclude 'Total All Ages'
-        ]
+        selection = [direction, sex, start_month, end_month]
 
-        # Grouping by 'Direction' and 'Age', then calculating the count and percentage
-        grouped_df = filtered_df.groupby(["Direction", "Age Group"], as_index=False)[
-            "Count"
-        ].sum()
-        total_counts_by_direction = grouped_df.groupby("Direction")["Count"].transform(
-            "sum"
-        )
-        grouped_df["Percentage"] = (
-            grouped_df["Count"] / total_counts_by_direction * 100
-        ).round(1)
-        grouped_df["Color"] = grouped_df["Age Group"].map(color_map)
-
-        # Creating the Treemap visualization for Age
-        fig = go.Figure(
-            go.Treemap(
-                labels=grouped_df["Age Group"],
-                parents=grouped_df["Direction"],
-                values=grouped_df["Count"],
-                customdata=grouped_df["Percentage"],
-                marker_colors=grouped_df["Color"],
-                texttemplate="<b>%{label}</b><br>Count: %{value}<br>Share: %{customdata}%",
-                hovertemplate="<b>%{label}</b><br>Count: %{value}<br>Share: %{customdata}%<extra></extra>",
-                branchvalues="total",
+        def treemap():
+            # Filtering DataFrame for the selected direction and month range, excluding 'Total All Ages'
+            filtered_df = df[
+                (df["Direction"] == direction)
+                & (df["Sex"] == sex)
+                & (df["Month"] >= pd.to_datetime(start_month))
+                & (df["Month"] <= pd.to_datetime(end_month))
+                & (df["Age Group"] != "Total All Ages")  # Exclude 'Total All Ages'
+            ]
+
+            # Grouping by 'Direction' and 'Age', then calculating the count and percentage
+            with telemetry.stage("group"):
+                grouped_df = compute.run(group_sum, dataset, filtered_df, ["Direction", "Age Group"])
+            total_counts_by_direction = grouped_df.groupby("Direction")["Count"].transform(
+                "sum"
             )
-        )
+            grouped_df["Percentage"] = (
+                grouped_df["Count"] / total_counts_by_direction * 100
+            ).round(1)
+            grouped_df["Color"] = grouped_df["Age Group"].map(color_map)
+
+            # Creating the Treemap visualization for Age
+            fig = go.Figure(
+                go.Treemap(
+                    labels=grouped_df["Age Group"],
+                    parents=grouped_df["Direction"],
+                    values=grouped_df["Count"],
+                    customdata=grouped_df["Percentage"],
+                    marker_colors=grouped_df["Color"],
+                    texttemplate="<b>%{label}</b><br>Count: %{value}<br>Share: %{customdata}%",
+                    hovertemplate="<b>%{label}</b><br>Count: %{value}<br>Share: %{customdata}%<extra></extra>",
+                    branchvalues="total",
+                )
+            )
+            return fig, grouped_df
 
     elif breakdown_type == "Direction, Visa":
         # User input widgets for Direction, Start month, and End month
         direction = st.selectbox(
-            "Select Direction:", df["Direction"].unique(), key="direction_treemap_visa"
+            "Select Direction:", options["Direction"], key="direction_treemap_visa"
         )
         start_month = st.date_input(
             "Start month",
@@ -790,39 +896,42 @@ with tab3:
             "Other": "#E67E22",  # Pumpkin orange
         }
 
-        # Filtering DataFrame for the selected direction and month range, excluding 'Total All Ages'
-        filtered_df = df[
-            (df["Direction"] == direction)
-            & (df["Month"] >= pd.to_datetime(start_month))
-            & (df["Month"] <= pd.to_datetime(end_month))
-            & (df["Visa"] != "TOTAL")  # Exclude 'Total'
-        ]
+        selection = [direction, start_month, end_month]
 
-        # Grouping by 'Direction' and 'Visa', then calculating the count and percentage
-        grouped_df = filtered_df.groupby(["Direction", "Visa"], as_index=False)[
-            "Count"
-        ].sum()
-        total_counts_by_direction = grouped_df.groupby("Direction")["Count"].transform(
-            "sum"
-        )
-        grouped_df["Percentage"] = (
-            grouped_df["Count"] / total_counts_by_direction * 100
-        ).round(1)
-        grouped_df["Color"] = grouped_df["Visa"].map(color_map)
-
-        # Creating the Treemap visualization for Visa
-        fig = go.Figure(
-            go.Treemap(
-                labels=grouped_df["Visa"],
-                parents=grouped_df["Direction"],
-                values=grouped_df["Count"],
-                customdata=grouped_df["Percentage"],
-                marker_colors=grouped_df["Color"],
-                texttemplate="<b>%{label}</b><br>Count: %{value}<br>Share: %{customdata}%",
-                hovertemplate="<b>%{label}</b><br>Count: %{value}<br>Share: %{customdata}%<extra></extra>",
-                branchvalues="total",
+        def treemap():
+            # Filtering DataFrame for the selected direction and month range, excluding 'Total All Ages'
+            filtered_df = df[
+                (df["Direction"] == direction)
+                & (df["Month"] >= pd.to_datetime(start_month))
+                & (df["Month"] <= pd.to_datetime(end_month))
+                & (df["Visa"] != "TOTAL")  # Exclude 'Total'
+            ]
+
+            # Grouping by 'Direction' and 'Visa', then calculating the count and percentage
+            with telemetry.stage("group"):
+                grouped_df = compute.run(group_sum, dataset, filtered_df, ["Direction", "Visa"])
+            total_counts_by_direction = grouped_df.groupby("Direction")["Count"].transform(
+                "sum"
             )
-        )
+            grouped_df["Percentage"] = (
+                grouped_df["Count"] / total_counts_by_direction * 100
+            ).round(1)
+            grouped_df["Color"] = grouped_df["Visa"].map(color_map)
+
+            # Creating the Treemap visualization for Visa
+            fig = go.Figure(
+                go.Treemap(
+                    labels=grouped_df["Visa"],
+                    parents=grouped_df["Direction"],
+                    values=grouped_df["Count"],
+                    customdata=grouped_df["Percentage"],
+                    marker_colors=grouped_df["Color"],
+                    texttemplate="<b>%{label}</b><br>Count: %{value}<br>Share: %{customdata}%",
+                    hovertemplate="<b>%{label}</b><br>Count: %{value}<br>Share: %{customdata}%<extra></extra>",
+                    branchvalues="total",
+                )
+            )
+            return fig, grouped_df
 
     elif breakdown_type == "Citizenship, Visa":
         visa_color_map = {
@@ -850,49 +959,54 @@ with tab3:
             min_value=min_date,
             max_value=max_date,
         )
-        filtered_df = df[
-            (df["Month"] >= pd.to_datetime(start_month))
-            & (df["Month"] <= pd.to_datetime(end_month))
-            & (df["Visa"] != "TOTAL")
-            & (df["Citizenship"] != "Total All Countries of Last Permanent Residence")
-        ]
-        grouped_df = filtered_df.groupby(["Visa", "Citizenship"], as_index=False)["Count"].sum()
+        selection = [start_month, end_month]
 
-        # Two-level treemap: Visa (parent) → Citizenship (leaf)
-        visa_agg = grouped_df.groupby("Visa", as_index=False)["Count"].sum()
-        visa_agg["Percentage"] = (visa_agg["Count"] / visa_agg["Count"].sum() * 100).round(1)
+        def treemap():
+            filtered_df = df[
+                (df["Month"] >= pd.to_datetime(start_month))
+                & (df["Month"] <= pd.to_datetime(end_month))
+                & (df["Visa"] != "TOTAL")
+                & (df["Citizenship"] != "Total All Countries of Last Permanent Residence")
+            ]
+            with telemetry.stage("group"):
+                grouped_df = compute.run(group_sum, dataset, filtered_df, ["Visa", "Citizenship"])
 
-        leaf_pct_denom = grouped_df.groupby("Visa")["Count"].transform("sum")
-        grouped_df["Percentage"] = (grouped_df["Count"] / leaf_pct_denom * 100).round(1)
+            # Two-level treemap: Visa (parent) → Citizenship (leaf)
+            visa_agg = grouped_df.groupby("Visa", as_index=False)["Count"].sum()
+            visa_agg["Percentage"] = (visa_agg["Count"] / visa_agg["Count"].sum() * 100).round(1)
 
-        ids = list(visa_agg["Visa"]) + [
-            f"{r['Visa']}|{r['Citizenship']}" for _, r in grouped_df.iterrows()
-        ]
-        labels = list(visa_agg["Visa"]) + list(grouped_df["Citizenship"])
-        parents = [""] * len(visa_agg) + list(grouped_df["Visa"])
-        values = list(visa_agg["Count"]) + list(grouped_df["Count"])
-        customdata = list(visa_agg["Percentage"]) + list(grouped_df["Percentage"])
-        colors = [visa_color_map.get(v, "#aaaaaa") for v in visa_agg["Visa"]] + [
-            visa_color_map.get(r["Visa"], "#aaaaaa") for _, r in grouped_df.iterrows()
-        ]
+            leaf_pct_denom = grouped_df.groupby("Visa")["Count"].transform("sum")
+            grouped_df["Percentage"] = (grouped_df["Count"] / leaf_pct_denom * 100).round(1)
 
-        fig = go.Figure(
-            go.Treemap(
-                ids=ids,
-                labels=labels,
-                parents=parents,
-                values=values,
-                customdata=customdata,
-                marker_colors=colors,
-                texttemplate="<b>%{label}</b><br>Count: %{value}<br>Share: %{customdata}%",
-                hovertemplate="<b>%{label}</b><br>Count: %{value}<br>Share: %{customdata}%<extra></extra>",
-                branchvalues="total",
+            ids = list(visa_agg["Visa"]) + [
+                f"{r['Visa']}|{r['Citizenship']}" for _, r in grouped_df.iterrows()
+            ]
+            labels = list(visa_agg["Visa"]) + list(grouped_df["Citizenship"])
+            parents = [""] * len(visa_agg) + list(grouped_df["Visa"])
+            values = list(visa_agg["Count"]) + list(grouped_df["Count"])
+            customdata = list(visa_agg["Percentage"]) + list(grouped_df["Percentage"])
+            colors = [visa_color_map.get(v, "#aaaaaa") for v in visa_agg["Visa"]] + [
+                visa_color_map.get(r["Visa"], "#aaaaaa") for _, r in grouped_df.iterrows()
+            ]
+
+            fig = go.Figure(
+                go.Treemap(
+                    ids=ids,
+                    labels=labels,
+                    parents=parents,
+                    values=values,
+                    customdata=customdata,
+                    marker_colors=colors,
+                    texttemplate="<b>%{label}</b><br>Count: %{value}<br>Share: %{customdata}%",
+                    hovertemplate="<b>%{label}</b><br>Count: %{value}<br>Share: %{customdata}%<extra></extra>",
+                    branchvalues="total",
+                )
             )
-        )
+            return fig, grouped_df
 
     elif breakdown_type == "Direction, Region, Citizenship":
         direction = st.selectbox(
-            "Select Direction:", df["Direction"].unique(), key="direction_treemap_region"
+            "Select Direction:", options["Direction"], key="direction_treemap_region"
         )
         citizenship_t3 = st.selectbox(
             "Citizenship:",
@@ -919,120 +1033,132 @@ with tab3:
             min_value=min_date,
             max_value=max_date,
         )
-        if level_t3 == "Regional Councils":
-            filtered_df = df[
-                (df["Direction"] == direction)
-                & (df["Citizenship"] == citizenship_t3)
-                & (df["Month"] >= pd.to_datetime(start_month))
-                & (df["Month"] <= pd.to_datetime(end_month))
-                & (df["Region"].isin(REGIONAL_COUNCILS))
-            ]
-            grouped_df = filtered_df.groupby(["Direction", "Region"], as_index=False)["Count"].sum()
-            total_by_dir = grouped_df.groupby("Direction")["Count"].transform("sum")
-            grouped_df["Percentage"] = (grouped_df["Count"] / total_by_dir * 100).round(1)
-            grouped_df["Color"] = grouped_df["Region"].map(REGION_COLORS)
-            fig = go.Figure(
-                go.Treemap(
-                    labels=grouped_df["Region"],
-                    parents=grouped_df["Direction"],
-                    values=grouped_df["Count"],
-                    customdata=grouped_df["Percentage"],
-                    marker_colors=grouped_df["Color"],
-                    texttemplate="<b>%{label}</b><br>Count: %{value}<br>Share: %{customdata}%",
-                    hovertemplate="<b>%{label}</b><br>Count: %{value}<br>Share: %{customdata}%<extra></extra>",
-                    branchvalues="total",
+        selection = [direction, citizenship_t3, level_t3, start_month, end_month]
+
+        def treemap():
+            if level_t3 == "Regional Councils":
+                filtered_df = df[
+                    (df["Direction"] == direction)
+                    & (df["Citizenship"] == citizenship_t3)
+                    & (df["Month"] >= pd.to_datetime(start_month))
+                    & (df["Month"] <= pd.to_datetime(end_month))
+                    & (df["Region"].isin(REGIONAL_COUNCILS))
+                ]
+                with telemetry.stage("group"):
+                    grouped_df = compute.run(group_sum, dataset, filtered_df, ["Direction", "Region"])
+                total_by_dir = grouped_df.groupby("Direction")["Count"].transform("sum")
+                grouped_df["Percentage"] = (grouped_df["Count"] / total_by_dir * 100).round(1)
+                grouped_df["Color"] = grouped_df["Region"].map(REGION_COLORS)
+                fig = go.Figure(
+                    go.Treemap(
+                        labels=grouped_df["Region"],
+                        parents=grouped_df["Direction"],
+                        values=grouped_df["Count"],
+                        customdata=grouped_df["Percentage"],
+                        marker_colors=grouped_df["Color"],
+                        texttemplate="<b>%{label}</b><br>Count: %{value}<br>Share: %{customdata}%",
+                        hovertemplate="<b>%{label}</b><br>Count: %{value}<br>Share: %{customdata}%<extra></extra>",
+                        branchvalues="total",
+                    )
                 )
-            )
-        elif level_t3 == "Territorial Authorities":
-            filtered_df = df[
-                (df["Direction"] == direction)
-                & (df["Citizenship"] == citizenship_t3)
-                & (df["Month"] >= pd.to_datetime(start_month))
-                & (df["Month"] <= pd.to_datetime(end_month))
-                & (df["Region"].isin(ALL_TERRITORIAL_AUTHORITIES))
-            ]
-            leaf_df = filtered_df.groupby("Region", as_index=False)["Count"].sum()
-            leaf_df["ParentRegion"] = leaf_df["Region"].map(TA_TO_REGION)
-            leaf_df = leaf_df[leaf_df["ParentRegion"].notna()].copy()
-            region_agg = leaf_df.groupby("ParentRegion", as_index=False)["Count"].sum()
-            region_agg.rename(columns={"ParentRegion": "Region"}, inplace=True)
-            leaf_df["Percentage"] = (
-                leaf_df["Count"]
-                / leaf_df.groupby("ParentRegion")["Count"].transform("sum")
-                * 100
-            ).round(1)
-            region_agg["Percentage"] = (region_agg["Count"] / region_agg["Count"].sum() * 100).round(1)
-            ids = list(region_agg["Region"]) + [
-                f"{r['ParentRegion']}|{r['Region']}" for _, r in leaf_df.iterrows()
-            ]
-            labels = list(region_agg["Region"]) + list(leaf_df["Region"])
-            parents = [""] * len(region_agg) + list(leaf_df["ParentRegion"])
-            values = list(region_agg["Count"]) + list(leaf_df["Count"])
-            customdata = list(region_agg["Percentage"]) + list(leaf_df["Percentage"])
-            colors = [REGION_COLORS.get(r, "#aaaaaa") for r in region_agg["Region"]] + [
-                REGION_COLORS.get(r, "#aaaaaa") for r in leaf_df["ParentRegion"]
-            ]
-            grouped_df = leaf_df.rename(columns={"Region": "TA", "ParentRegion": "Region"})
-            fig = go.Figure(
-                go.Treemap(
-                    ids=ids,
-                    labels=labels,
-                    parents=parents,
-                    values=values,
-                    customdata=customdata,
-                    marker_colors=colors,
-                    texttemplate="<b>%{label}</b><br>Count: %{value}<br>Share: %{customdata}%",
-                    hovertemplate="<b>%{label}</b><br>Count: %{value}<br>Share: %{customdata}%<extra></extra>",
-                    branchvalues="total",
+            elif level_t3 == "Territorial Authorities":
+                filtered_df = df[
+                    (df["Direction"] == direction)
+                    & (df["Citizenship"] == citizenship_t3)
+                    & (df["Month"] >= pd.to_datetime(start_month))
+                    & (df["Month"] <= pd.to_datetime(end_month))
+                    & (df["Region"].isin(ALL_TERRITORIAL_AUTHORITIES))
+                ]
+                with telemetry.stage("group"):
+                    leaf_df = compute.run(group_sum, dataset, filtered_df, "Region")
+                leaf_df["ParentRegion"] = leaf_df["Region"].map(TA_TO_REGION)
+                leaf_df = leaf_df[leaf_df["ParentRegion"].notna()].copy()
+                region_agg = leaf_df.groupby("ParentRegion", as_index=False)["Count"].sum()
+                region_agg.rename(columns={"ParentRegion": "Region"}, inplace=True)
+                leaf_df["Percentage"] = (
+                    leaf_df["Count"]
+                    / leaf_df.groupby("ParentRegion")["Count"].transform("sum")
+                    * 100
+                ).round(1)
+                region_agg["Percentage"] = (region_agg["Count"] / region_agg["Count"].sum() * 100).round(1)
+                ids = list(region_agg["Region"]) + [
+                    f"{r['ParentRegion']}|{r['Region']}" for _, r in leaf_df.iterrows()
+                ]
+                labels = list(region_agg["Region"]) + list(leaf_df["Region"])
+                parents = [""] * len(region_agg) + list(leaf_df["ParentRegion"])
+                values = list(region_agg["Count"]) + list(leaf_df["Count"])
+                customdata = list(region_agg["Percentage"]) + list(leaf_df["Percentage"])
+                colors = [REGION_COLORS.get(r, "#aaaaaa") for r in region_agg["Region"]] + [
+                    REGION_COLORS.get(r, "#aaaaaa") for r in leaf_df["ParentRegion"]
+                ]
+                grouped_df = leaf_df.rename(columns={"Region": "TA", "ParentRegion": "Region"})
+                fig = go.Figure(
+                    go.Treemap(
+                        ids=ids,
+                        labels=labels,
+                        parents=parents,
+                        values=values,
+                        customdata=customdata,
+                        marker_colors=colors,
+                        texttemplate="<b>%{label}</b><br>Count: %{value}<br>Share: %{customdata}%",
+                        hovertemplate="<b>%{label}</b><br>Count: %{value}<br>Share: %{customdata}%<extra></extra>",
+                        branchvalues="total",
+                    )
                 )
-            )
-        else:  # Auckland Local Boards
-            filtered_df = df[
-                (df["Direction"] == direction)
-                & (df["Citizenship"] == citizenship_t3)
-                & (df["Month"] >= pd.to_datetime(start_month))
-                & (df["Month"] <= pd.to_datetime(end_month))
-                & (df["Region"].isin(AUCKLAND_LOCAL_BOARDS))
-            ]
-            grouped_df = filtered_df.groupby("Region", as_index=False)["Count"].sum()
-            total = grouped_df["Count"].sum()
-            grouped_df["Percentage"] = (grouped_df["Count"] / total * 100).round(1)
-            ids = ["Auckland Region"] + list(grouped_df["Region"])
-            labels = ["Auckland Region"] + list(grouped_df["Region"])
-            parents = [""] + ["Auckland Region"] * len(grouped_df)
-            values = [total] + list(grouped_df["Count"])
-            customdata = [100.0] + list(grouped_df["Percentage"])
-            colors = [REGION_COLORS.get("Auckland Region", "#3cb44b")] + [
-                AUCKLAND_LOCAL_BOARD_COLORS.get(r, "#aaaaaa") for r in grouped_df["Region"]
-            ]
-            fig = go.Figure(
-                go.Treemap(
-                    ids=ids,
-                    labels=labels,
-                    parents=parents,
-                    values=values,
-                    customdata=customdata,
-                    marker_colors=colors,
-                    texttemplate="<b>%{label}</b><br>Count: %{value}<br>Share: %{customdata}%",
-                    hovertemplate="<b>%{label}</b><br>Count: %{value}<br>Share: %{customdata}%<extra></extra>",
-                    branchvalues="total",
+            else:  # Auckland Local Boards
+                filtered_df = df[
+                    (df["Direction"] == direction)
+                    & (df["Citizenship"] == citizenship_t3)
+                    & (df["Month"] >= pd.to_datetime(start_month))
+                    & (df["Month"] <= pd.to_datetime(end_month))
+                    & (df["Region"].isin(AUCKLAND_LOCAL_BOARDS))
+                ]
+                with telemetry.stage("group"):
+                    grouped_df = compute.run(group_sum, dataset, filtered_df, "Region")
+                total = grouped_df["Count"].sum()
+                grouped_df["Percentage"] = (grouped_df["Count"] / total * 100).round(1)
+                ids = ["Auckland Region"] + list(grouped_df["Region"])
+                labels = ["Auckland Region"] + list(grouped_df["Region"])
+                parents = [""] + ["Auckland Region"] * len(grouped_df)
+                values = [total] + list(grouped_df["Count"])
+                customdata = [100.0] + list(grouped_df["Percentage"])
+                colors = [REGION_COLORS.get("Auckland Region", "#3cb44b")] + [
+                    AUCKLAND_LOCAL_BOARD_COLORS.get(r, "#aaaaaa") for r in grouped_df["Region"]
+                ]
+                fig = go.Figure(
+                    go.Treemap(
+                        ids=ids,
+                        labels=labels,
+                        parents=parents,
+                        values=values,
+                        customdata=customdata,
+                        marker_colors=colors,
+                        texttemplate="<b>%{label}</b><br>Count: %{value}<br>Share: %{customdata}%",
+                        hovertemplate="<b>%{label}</b><br>Count: %{value}<br>Share: %{customdata}%<extra></extra>",
+                        branchvalues="total",
+                    )
                 )
-            )
-
-    fig.update_layout(margin=dict(t=0, l=0, r=0, b=0))
-    st.plotly_chart(fig, use_container_width=True)
+            return fig, grouped_df
+
+    @telemetry.stage("figure")
+    def treemap_figure():
+        fig, _ = treemap()
+        fig.update_layout(margin=dict(t=0, l=0, r=0, b=0))
+        with telemetry.stage("serialise"):
+            return fig.to_json()
+
+    digest = selection_hash(data_path, "treemap", selection)
+    fig_json = results.get_or_compute(
+        (release, breakdown_type, "treemap", digest), treemap_figure
+    )
+    with telemetry.stage("render"):
+        render_figure(fig_json)
     # Using st.markdown to create a flex container with two text elements, with adjusted font size
     st.markdown(footer_text, unsafe_allow_html=True)
-    # Convert DataFrame to CSV string
-    csv = grouped_df.to_csv(index=False)
-    csv_file = StringIO(csv)
-    csv_filename = "migration_data.csv"
-
-    # Add a download button and specify the method to download the data
-    st.download_button(
-        label="Download Data as CSV",
-        data=csv_file.getvalue(),
-        file_name=csv_filename,
-        mime="text/csv",
-        key="download_treemap",
+    download_section(
+        "download_treemap",
+        digest,
+        lambda fmt: _selection_export(release, digest, fmt, lambda: treemap()[1]),
     )
+
+telemetry.end(breakdown_type)
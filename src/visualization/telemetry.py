@@ -0,0 +1,241 @@
+"""
+Telemetry — per-stage timings of the Streamlit app's reruns.
+
+Each rerun is one interaction. Stages inside it (load, filter, label,
+transform, pivot, figure, serialise, ...) are timed with stage(), which works
+as a context manager or a decorator. Stages may nest; each records its own
+time with the time of nested stages subtracted, so the stages of an
+interaction add up to no more than its total. For long straight-line stretches
+of a script, lap() records the time since the previous lap instead.
+
+Per stage, the count, total and worst time are kept, plus a window of recent
+durations for percentiles. The most recent interactions are kept with their
+stage breakdown, so the slowest of them can be inspected.
+
+Enabled with APP_TELEMETRY=1. When disabled, stage() returns one shared no-op
+object and begin(), lap() and end() return at once, so instrumented code pays a method
+call and nothing more.
+
+Usage:
+    telemetry = shared_telemetry()
+    telemetry.begin()
+    with telemetry.stage("transform"):
+        ...
+    telemetry.lap()
+    ...  # widgets and filtering
+    telemetry.lap("filter")
+    telemetry.end("Direction, Visa")
+"""
+
+from __future__ import annotations
+
+import os
+import threading
+import time
+from collections import deque
+from contextlib import ContextDecorator
+from dataclasses import dataclass, field
+from typing import Any, Deque, Dict, List, Optional
+
+# ── Constants ──────────────────────────────────────────────────────────────────
+
+TELEMETRY_ENABLED = os.environ.get("APP_TELEMETRY", "0") == "1"
+STAGE_WINDOW = 500  # recent durations kept per stage, for percentiles
+INTERACTION_HISTORY = 200  # recent interactions kept, for the slowest list
+
+
+# ── Records ────────────────────────────────────────────────────────────────────
+
+
+@dataclass
+class StageStats:
+    """Running totals of one stage, in seconds."""
+
+    count: int = 0
+    total: float = 0.0
+    worst: float = 0.0
+    recent: Deque[float] = field(default_factory=lambda: deque(maxlen=STAGE_WINDOW))
+
+    def add(self, seconds: float) -> None:
+        self.count += 1
+        self.total += seconds
+        self.worst = max(self.worst, seconds)
+        self.recent.append(seconds)
+
+
+@dataclass
+class Interaction:
+    """One rerun: when it ended, what it showed and where its time went."""
+
+    finished: float
+    label: str
+    seconds: float
+    stages: Dict[str, float]
+
+
+def _percentile(values: List[float], q: float) -> float:
+    """Nearest-rank percentile of a non-empty list."""
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+# ── Stage timers ───────────────────────────────────────────────────────────────
+
+
+class _NoOpStage(ContextDecorator):
+    """Stage timer used when telemetry is disabled."""
+
+    def __enter__(self) -> "_NoOpStage":
+        return self
+
+    def __exit__(self, *exc: Any) -> bool:
+        return False
+
+
+_NO_OP = _NoOpStage()
+
+
+class _Stage(ContextDecorator):
+    """Times one stage and reports its self time to the owning Telemetry."""
+
+    def __init__(self, telemetry: "Telemetry", name: str) -> None:
+        self._telemetry = telemetry
+        self._name = name
+
+    def __enter__(self) -> "_Stage":
+        # [start, time spent in nested stages]; a stack, so the object is reusable
+        self._telemetry._frames().append([time.perf_counter(), 0.0])
+        return self
+
+    def __exit__(self, *exc: Any) -> bool:
+        frames = self._telemetry._frames()
+        start, nested = frames.pop()
+        elapsed = time.perf_counter() - start
+        if frames:
+            frames[-1][1] += elapsed
+        self._telemetry._record(self._name, elapsed - nested)
+        return False
+
+
+# ── Telemetry class ────────────────────────────────────────────────────────────
+
+
+class Telemetry:
+    """Collects stage and interaction timings from every session thread.
+
+    Args:
+        enabled: Whether to time anything at all.
+    """
+
+    def __init__(self, enabled: bool = TELEMETRY_ENABLED) -> None:
+        self.enabled = enabled
+        self._stages: Dict[str, StageStats] = {}
+        self._interactions: Deque[Interaction] = deque(maxlen=INTERACTION_HISTORY)
+        self._local = threading.local()  # Streamlit runs each rerun in one thread
+        self._lock = threading.Lock()
+
+    # ── Private helpers ────────────────────────────────────────────────────────
+
+    def _frames(self) -> List[List[float]]:
+        """This thread's stack of open stages."""
+        frames = getattr(self._local, "frames", None)
+        if frames is None:
+            frames = self._local.frames = []
+        return frames
+
+    def _record(self, name: str, seconds: float) -> None:
+        """Add a stage's self time to the totals and to this thread's interaction."""
+        with self._lock:
+            self._stages.setdefault(name, StageStats()).add(seconds)
+        current = getattr(self._local, "current", None)
+        if current is not None:
+            current[name] = current.get(name, 0.0) + seconds
+
+    # ── Public interface ───────────────────────────────────────────────────────
+
+    def stage(self, name: str) -> ContextDecorator:
+        """Time the enclosed block (or decorated function) as stage name."""
+        if not self.enabled:
+            return _NO_OP
+        return _Stage(self, name)
+
+    def begin(self) -> None:
+        """Start an interaction on this thread, discarding any unfinished one."""
+        if not self.enabled:
+            return
+        self._local.started = self._local.lapped = time.perf_counter()
+        self._local.current = {}
+        self._local.frames = []
+
+    def lap(self, name: Optional[str] = None) -> None:
+        """Record the time since the last lap (or begin()) as stage name.
+
+        With no name the lap clock is only restarted. Must not be called
+        inside an open stage, or the lap and the stage would both count the
+        same time.
+        """
+        if not self.enabled:
+            return
+        now = time.perf_counter()
+        lapped = getattr(self._local, "lapped", now)
+        self._local.lapped = now
+        if name is not None:
+            self._record(name, now - lapped)
+
+    def end(self, label: str) -> None:
+        """Finish this thread's interaction and add it to the history."""
+        if not self.enabled:
+            return
+        current = getattr(self._local, "current", None)
+        if current is None:
+            return
+        seconds = time.perf_counter() - self._local.started
+        self._local.current = None
+        with self._lock:
+            self._interactions.append(Interaction(time.time(), label, seconds, current))
+
+    def stage_stats(self) -> List[Dict[str, Any]]:
+        """One row per stage, in milliseconds, slowest total first."""
+        with self._lock:
+            stages = {name: (s.count, s.total, s.worst, list(s.recent))
+                      for name, s in self._stages.items()}
+        rows = [
+            {
+                "stage": name,
+                "count": count,
+                "total_ms": total * 1000,
+                "mean_ms": total / count * 1000,
+                "p50_ms": _percentile(recent, 0.50) * 1000,
+                "p95_ms": _percentile(recent, 0.95) * 1000,
+                "max_ms": worst * 1000,
+            }
+            for name, (count, total, worst, recent) in stages.items()
+        ]
+        return sorted(rows, key=lambda row: row["total_ms"], reverse=True)
+
+    def slowest(self, n: int = 10) -> List[Interaction]:
+        """The n slowest of the recent interactions, slowest first."""
+        with self._lock:
+            interactions = list(self._interactions)
+        return sorted(interactions, key=lambda i: i.seconds, reverse=True)[:n]
+
+    def reset(self) -> None:
+        """Forget every recorded stage and interaction."""
+        with self._lock:
+            self._stages.clear()
+            self._interactions.clear()
+
+
+# ── Shared instance ────────────────────────────────────────────────────────────
+
+_shared: Optional[Telemetry] = None
+_shared_lock = threading.Lock()
+
+
+def shared_telemetry() -> Telemetry:
+    """Return the process-wide Telemetry, enabled by APP_TELEMETRY=1."""
+    global _shared
+    with _shared_lock:
+        if _shared is None:
+            _shared = Telemetry()
+        return _shared
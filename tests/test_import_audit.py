@@ -0,0 +1,40 @@
+"""
+Import-time regression test: every entry point within its recorded budget.
+
+Runs scripts/import_audit.py's check: each target's median import time
+against scripts/import_audit_baseline.json plus the tolerance, and no
+deferred module imported at startup. Refresh the baseline with
+`python scripts/import_audit.py --save-baseline` when the hardware changes.
+
+Usage:
+    python -m unittest discover tests
+    python -m pytest tests
+"""
+
+from __future__ import annotations
+
+import json
+import sys
+import unittest
+from pathlib import Path
+
+_REPO_ROOT = Path(__file__).parent.parent
+sys.path.insert(0, str(_REPO_ROOT / "scripts"))
+
+import import_audit  # noqa: E402
+
+
+class ImportBudgetTest(unittest.TestCase):
+    def test_targets_within_budget(self):
+        baseline = json.loads(import_audit._BASELINE_PATH.read_text(encoding="utf-8"))
+        report = import_audit.run(quiet=True)
+        problems = import_audit.compare(report, import_audit.budgets(baseline))
+        self.assertEqual(problems, [], "\n".join(problems))
+
+    def test_every_target_has_a_baseline(self):
+        baseline = json.loads(import_audit._BASELINE_PATH.read_text(encoding="utf-8"))
+        self.assertEqual(sorted(baseline["targets"]), sorted(import_audit.TARGETS))
+
+
+if __name__ == "__main__":
+    unittest.main()